@@ -0,0 +1,515 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from result_cache import code_fingerprint, request_key
+from seam_repair import (
+    CLEAN_THRESHOLD,
+    ENGINES,
+    KERNELS,
+    MeshSeams,
+    analyze_seams,
+    load_seams,
+    repair_texture_file,
+    repair_texture_seams,
+    repair_udim_textures,
+)
+from texture_io import UDIM_TOKEN, find_udim_textures, open_texture_memmap, udim_path
+
+
+MESH_SUFFIXES = (".obj", ".ply", ".glb", ".npz")
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff", ".bmp", ".webp")
+# Uncompressed arrays go through the memory-mapped tiled path (repair_texture_file).
+MMAP_SUFFIXES = (".npy", ".raw", ".bin")
+MASK_TOKENS = ("seam_mask", "seammask")
+# name.1001.png, name.1002.png, ... are collapsed into one name.<UDIM>.png job
+_UDIM_STEM = re.compile(r"[._](1\d{3})$")
+HASH_SUFFIX = ".seamhash"
+# repair parameters that also apply to analyze_seams
+_ANALYZE_PARAMS = ("texture_kind", "sample_step_px", "mask_threshold", "only_masked_seams", "v_flip")
+
+# Texture-set naming -> texture_kind, used when scanning a directory.
+_KIND_TOKENS = {
+    **dict.fromkeys(("normal", "normalgl", "normaldx", "nrm", "n"), "normal"),
+    **dict.fromkeys(
+        ("roughness", "rough", "metallic", "metalness", "metal", "ao", "occlusion", "orm", "height", "specular", "gloss"),
+        "data",
+    ),
+}
+
+
+@dataclass
+class Job:
+    mesh: str
+    texture: str
+    output: str
+    mask: str | None = None
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def _is_udim(path: str | Path | None) -> bool:
+    return path is not None and UDIM_TOKEN in Path(path).name
+
+
+def _collapse_udim(paths: list[Path]) -> list[Path]:
+    out: list[Path] = []
+    for p in paths:
+        m = _UDIM_STEM.search(p.stem)
+        if m:
+            p = p.with_name(p.stem[: m.start(1)] + UDIM_TOKEN + p.suffix)
+        if p not in out:
+            out.append(p)
+    return out
+
+
+def _guess_kind(name: str) -> str:
+    for token in re.split(r"[_\-. ]+", name.lower()):
+        if token in _KIND_TOKENS:
+            return _KIND_TOKENS[token]
+    return "basecolor"
+
+
+def _default_output(texture: Path, root: Path, out_dir: Path | None) -> Path:
+    if out_dir is None:
+        return texture.with_name(f"{texture.stem}_repaired{texture.suffix}")
+    try:
+        rel = texture.relative_to(root)
+    except ValueError:
+        rel = Path(texture.name)
+    return out_dir / rel
+
+
+def scan_directory(root: Path, out_dir: Path | None, defaults: dict[str, Any]) -> list[Job]:
+    """
+    Pair every mesh with the textures next to it whose name starts with the mesh stem,
+    e.g. chair.obj + chair_basecolor.png / chair_roughness.png (+ chair_seam_mask.png).
+    texture_kind is guessed from the texture name unless set in defaults.
+    """
+    jobs: list[Job] = []
+    for mesh in sorted(p for p in root.rglob("*") if p.suffix.lower() in MESH_SUFFIXES):
+        if out_dir is not None and out_dir.resolve() in mesh.resolve().parents:
+            continue
+        siblings = sorted(
+            p
+            for p in mesh.parent.iterdir()
+            if p.is_file()
+            and p.suffix.lower() in IMAGE_SUFFIXES + MMAP_SUFFIXES
+            and p.stem.lower().startswith(mesh.stem.lower())
+            and not p.stem.endswith("_repaired")
+        )
+        siblings = _collapse_udim(siblings)
+        masks = [p for p in siblings if any(t in p.stem.lower() for t in MASK_TOKENS)]
+        for tex in siblings:
+            if tex in masks:
+                continue
+            params = dict(defaults)
+            params.setdefault("texture_kind", _guess_kind(tex.stem[len(mesh.stem) :]))
+            jobs.append(
+                Job(
+                    mesh=str(mesh),
+                    texture=str(tex),
+                    output=str(_default_output(tex, root, out_dir)),
+                    mask=str(masks[0]) if masks else None,
+                    params=params,
+                )
+            )
+    return jobs
+
+
+def load_manifest(path: Path, out_dir: Path | None, defaults: dict[str, Any]) -> list[Job]:
+    """
+    JSON manifest: {"defaults": {...}, "jobs": [{"mesh", "texture", "output"?, "mask"?, "params"?}]}.
+    Relative paths are resolved against the manifest's directory.
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    base = path.parent
+    merged = {**data.get("defaults", {}), **defaults}
+    jobs: list[Job] = []
+    for i, item in enumerate(data.get("jobs", [])):
+        if "mesh" not in item or "texture" not in item:
+            raise ValueError(f"manifest 第 {i} 项缺少 mesh / texture。")
+        tex = base / item["texture"]
+        output = base / item["output"] if item.get("output") else _default_output(tex, base, out_dir)
+        jobs.append(
+            Job(
+                mesh=str(base / item["mesh"]),
+                texture=str(tex),
+                output=str(output),
+                mask=str(base / item["mask"]) if item.get("mask") else None,
+                params={**merged, **item.get("params", {})},
+            )
+        )
+    return jobs
+
+
+def _expand(path: str | None) -> list[str | Path | None]:
+    if not _is_udim(path):
+        return [path]
+    return list(find_udim_textures(path).values())
+
+
+def input_digest(job: Job, code: str) -> str:
+    return request_key([job.mesh, *_expand(job.texture), *_expand(job.mask)], job.params, code)
+
+
+def _hash_path(output: str) -> Path:
+    return Path(output.replace(UDIM_TOKEN, "UDIM") + HASH_SUFFIX)
+
+
+def _output_exists(job: Job) -> bool:
+    if not _is_udim(job.output):
+        return Path(job.output).exists()
+    tiles = find_udim_textures(job.texture)
+    return bool(tiles) and all(udim_path(job.output, t).exists() for t in tiles)
+
+
+# Worker-local topology cache: jobs are grouped by mesh, so a worker builds each
+# mesh's seams once and reuses them for every texture of that mesh.
+_SEAMS_CACHE: dict[tuple[str, int, int, str], MeshSeams] = {}
+_SEAMS_CACHE_SIZE = 4
+# processes for parsing text OBJs (--obj-workers; only without a job process pool)
+_OBJ_WORKERS = 1
+
+
+def _get_seams(mesh: str, mesh_format: str) -> tuple[MeshSeams, bool]:
+    st = os.stat(mesh)
+    key = (str(Path(mesh).resolve()), st.st_mtime_ns, st.st_size, mesh_format)
+    seams = _SEAMS_CACHE.get(key)
+    if seams is not None:
+        return seams, True
+    with open(mesh, "rb") as f:
+        seams = load_seams(f, mesh_format, workers=_OBJ_WORKERS)
+    if len(_SEAMS_CACHE) >= _SEAMS_CACHE_SIZE:
+        _SEAMS_CACHE.pop(next(iter(_SEAMS_CACHE)))
+    _SEAMS_CACHE[key] = seams
+    return seams, False
+
+
+def _save_image(img: Image.Image, out: Path, keep_alpha: bool) -> None:
+    if not keep_alpha:
+        img = img.convert("RGB")
+    tmp = out.with_name(out.name + ".tmp")
+    img.save(tmp, format=Image.registered_extensions().get(out.suffix.lower(), "PNG"))
+    os.replace(tmp, out)
+
+
+def _numpy_only(params: dict[str, Any]) -> dict[str, Any]:
+    """params without engine / kernel (UDIM and memmap jobs always run the NumPy path)."""
+    params = dict(params)
+    if params.pop("engine", "numpy") not in ENGINES:
+        raise ValueError("engine 必须是 " + " | ".join(ENGINES))
+    if params.pop("kernel", "numpy") not in KERNELS:
+        raise ValueError("kernel 必须是 " + " | ".join(KERNELS))
+    return params
+
+
+def _repair_udim(job: Job, seams: MeshSeams, timing: dict[str, Any]) -> None:
+    """UDIM set: repair the tiles touched by seams, copy the rest unchanged."""
+    if not _is_udim(job.output):
+        raise ValueError(f"UDIM 贴图的输出路径也需要包含 {UDIM_TOKEN}：{job.output}")
+    if job.mask is not None and not _is_udim(job.mask):
+        raise ValueError(f"UDIM 贴图的 mask 路径也需要包含 {UDIM_TOKEN}：{job.mask}")
+    tiles = find_udim_textures(job.texture)
+    if not tiles:
+        raise ValueError(f"找不到 UDIM 贴图：{job.texture}")
+    masks = find_udim_textures(job.mask) if job.mask else None
+    Path(job.output).parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    params = _numpy_only(job.params)
+    udim_stats: dict[str, Any] = {}
+    repaired = repair_udim_textures(None, tiles, masks, seams=seams, stats=udim_stats, **params)
+    timing["repair_s"] = time.perf_counter() - t0
+    timing["udim_tiles"] = len(tiles)
+    timing["udim_repaired"] = len(repaired)
+    timing["udim_dropped_seams"] = udim_stats.get("dropped_seams", 0)
+    timing["udim_missing_tiles"] = udim_stats.get("missing_tiles", [])
+
+    t0 = time.perf_counter()
+    for t, path in tiles.items():
+        out = udim_path(job.output, t)
+        if t not in repaired:
+            if out.resolve() != path.resolve():
+                shutil.copyfile(path, out)
+            continue
+        with Image.open(path) as src:
+            keep_alpha = "A" in src.mode
+        _save_image(repaired[t], out, keep_alpha)
+    timing["save_s"] = time.perf_counter() - t0
+
+
+def _repair_one(job: Job, seams: MeshSeams, timing: dict[str, Any]) -> None:
+    if _is_udim(job.texture):
+        _repair_udim(job, seams, timing)
+        return
+    params = dict(job.params)
+    mask_img = Image.open(job.mask) if job.mask else None
+    out = Path(job.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    if Path(job.texture).suffix.lower() in MMAP_SUFFIXES:
+        params = _numpy_only(params)
+        raw_shape = params.pop("raw_shape", None)
+        t0 = time.perf_counter()
+        stats = repair_texture_file(
+            None,
+            job.texture,
+            job.output,
+            mask_img,
+            raw_shape=tuple(raw_shape) if raw_shape else None,
+            seams=seams,
+            **params,
+        )
+        timing["repair_s"] = time.perf_counter() - t0
+        timing["pixels_written"] = stats["pixels_written"]
+        return
+
+    t0 = time.perf_counter()
+    src = Image.open(job.texture)
+    src.load()
+    timing["load_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    out_img = repair_texture_seams(None, src, mask_img, seams=seams, **params)
+    timing["repair_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _save_image(out_img, out, "A" in src.mode)
+    timing["save_s"] = time.perf_counter() - t0
+
+
+def _analyze_one(job: Job, seams: MeshSeams, timing: dict[str, Any], clean_threshold: float) -> bool:
+    """analyze_seams for one texture; the summary goes into timing. Returns clean."""
+    if _is_udim(job.texture):
+        raise ValueError("接缝分析暂不支持 UDIM 贴图。")
+    t0 = time.perf_counter()
+    mask_img = Image.open(job.mask) if job.mask else None
+    if Path(job.texture).suffix.lower() in MMAP_SUFFIXES:
+        raw_shape = job.params.get("raw_shape")
+        tex: Any = open_texture_memmap(job.texture, raw_shape=tuple(raw_shape) if raw_shape else None)
+    else:
+        tex = Image.open(job.texture)
+    params = {k: job.params[k] for k in _ANALYZE_PARAMS if k in job.params}
+    report = analyze_seams(None, tex, mask_img, seams=seams, clean_threshold=clean_threshold, worst=0, **params)
+    timing["analyze_s"] = time.perf_counter() - t0
+    timing["seam_error_mean"] = report["mean_error"]
+    timing["seam_error_p95"] = report["p95_error"]
+    timing["seam_error_max"] = report["max_error"]
+    timing["dirty_seams"] = report["dirty_seams"]
+    timing["suggested_band_px"] = report["suggested_band_px"]
+    timing["clean"] = report["clean"]
+    return bool(report["clean"])
+
+
+def _copy_clean(job: Job) -> None:
+    """Output of a texture that needs no repair: the input, copied."""
+    out = Path(job.output)
+    if out.resolve() != Path(job.texture).resolve():
+        out.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(job.texture, out)
+
+
+def run_jobs(
+    jobs: list[Job],
+    code: str,
+    force: bool,
+    analyze: bool = False,
+    skip_clean: bool = False,
+    clean_threshold: float = CLEAN_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """
+    Run a group of jobs (normally all sharing one mesh) in the current process.
+    analyze: only measure the seams (nothing is written); skip_clean: measure first
+    and copy textures without seams above clean_threshold instead of repairing them.
+    """
+    results: list[dict[str, Any]] = []
+    for job in jobs:
+        t_start = time.perf_counter()
+        timing: dict[str, Any] = {
+            "mesh": job.mesh,
+            "texture": job.texture,
+            "output": job.output,
+            "status": "ok",
+            "seams_cached": False,
+        }
+        try:
+            t0 = time.perf_counter()
+            digest = input_digest(job, code)
+            timing["hash_s"] = time.perf_counter() - t0
+            hash_file = _hash_path(job.output)
+            if analyze:
+                seams, cached = _get_seams(job.mesh, str(job.params.get("mesh_format", "auto")))
+                timing["seams_cached"] = cached
+                timing["seams"] = seams.table.count
+                _analyze_one(job, seams, timing, clean_threshold)
+            elif (
+                not force
+                and _output_exists(job)
+                and hash_file.exists()
+                and hash_file.read_text(encoding="ascii").strip() == digest
+            ):
+                timing["status"] = "skipped"
+            else:
+                t0 = time.perf_counter()
+                seams, cached = _get_seams(job.mesh, str(job.params.get("mesh_format", "auto")))
+                timing["seams_s"] = time.perf_counter() - t0
+                timing["seams_cached"] = cached
+                timing["seams"] = seams.table.count
+                params = {k: v for k, v in job.params.items() if k != "mesh_format"}
+                if skip_clean and not _is_udim(job.texture) and _analyze_one(job, seams, timing, clean_threshold):
+                    _copy_clean(job)
+                    timing["status"] = "clean"
+                else:
+                    _repair_one(Job(job.mesh, job.texture, job.output, job.mask, params), seams, timing)
+                hash_file.write_text(digest + "\n", encoding="ascii")
+        except Exception as e:
+            timing["status"] = "error"
+            timing["error"] = f"{type(e).__name__}: {e}"
+        timing["total_s"] = time.perf_counter() - t_start
+        results.append(timing)
+    return results
+
+
+def _group_by_mesh(jobs: list[Job], workers: int) -> list[list[Job]]:
+    """
+    One task per mesh so topology is built once; meshes with more textures than a
+    worker's fair share are split so the pool stays busy.
+    """
+    groups: dict[str, list[Job]] = {}
+    for job in jobs:
+        groups.setdefault(str(Path(job.mesh).resolve()), []).append(job)
+    share = max(1, -(-len(jobs) // max(1, workers)))
+    tasks: list[list[Job]] = []
+    for group in groups.values():
+        n = -(-len(group) // share)
+        size = -(-len(group) // n)
+        tasks.extend(group[i : i + size] for i in range(0, len(group), size))
+    return sorted(tasks, key=len, reverse=True)
+
+
+def write_report(path: Path, results: list[dict[str, Any]], summary: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        keys: list[str] = []
+        for r in results:
+            keys.extend(k for k in r if k not in keys)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=keys)
+            w.writeheader()
+            w.writerows(results)
+    else:
+        path.write_text(json.dumps({**summary, "assets": results}, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _parse_value(s: str) -> Any:
+    low = s.lower()
+    if low in ("true", "false"):
+        return low == "true"
+    for cast in (int, float):
+        try:
+            return cast(s)
+        except ValueError:
+            pass
+    return s
+
+
+def main(argv: list[str] | None = None) -> int:
+    global _OBJ_WORKERS
+    ap = argparse.ArgumentParser(description="离线批量修缝：manifest（JSON）或资产目录 -> 进程池批处理")
+    ap.add_argument("source", help="manifest.json 或资产目录")
+    ap.add_argument("--out", default="", help="输出目录（默认写在贴图旁边，文件名加 _repaired）")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数（1 = 不开进程池）")
+    ap.add_argument("--obj-workers", type=int, default=1, help="解析文本 OBJ 的进程数（仅 --workers 1 时生效，默认 1）")
+    ap.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="覆盖所有任务的 repair_texture_seams 参数（可重复）",
+    )
+    ap.add_argument("--force", action="store_true", help="忽略输入哈希，全部重跑")
+    ap.add_argument("--report", default="", help="逐资产耗时报告（.json / .csv），默认 <输出目录>/seam_batch_report.json")
+    ap.add_argument("--dry-run", action="store_true", help="只列出任务")
+    ap.add_argument("--analyze", action="store_true", help="只分析接缝断裂程度（写报告，不输出贴图）")
+    ap.add_argument("--skip-clean", action="store_true", help="先分析，没有明显接缝的贴图直接复制，不做修复")
+    ap.add_argument(
+        "--clean-threshold",
+        type=float,
+        default=CLEAN_THRESHOLD,
+        help=f"判定为干净的接缝平均误差上限（8-bit 色阶，法线为角度），默认 {CLEAN_THRESHOLD}",
+    )
+    args = ap.parse_args(argv)
+
+    overrides: dict[str, Any] = {}
+    for kv in args.set:
+        key, _, value = kv.partition("=")
+        overrides[key.strip()] = _parse_value(value.strip())
+
+    source = Path(args.source)
+    out_dir = Path(args.out) if args.out else None
+    if source.is_dir():
+        jobs = scan_directory(source, out_dir, overrides)
+    else:
+        jobs = load_manifest(source, out_dir, overrides)
+    print(f"{len(jobs)} jobs")
+    if args.dry_run:
+        for job in jobs:
+            print(json.dumps(asdict(job), ensure_ascii=False))
+        return 0
+
+    code = code_fingerprint()
+    workers = max(1, min(int(args.workers), len(jobs) or 1))
+    tasks = _group_by_mesh(jobs, workers)
+    t0 = time.perf_counter()
+    results: list[dict[str, Any]] = []
+    triage = {"analyze": args.analyze, "skip_clean": args.skip_clean, "clean_threshold": args.clean_threshold}
+    if workers == 1:
+        _OBJ_WORKERS = max(1, int(args.obj_workers))
+        for task in tasks:
+            results.extend(run_jobs(task, code, args.force, **triage))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_jobs, task, code, args.force, **triage) for task in tasks]
+            for fut in futures:
+                results.extend(fut.result())
+    wall = time.perf_counter() - t0
+
+    order = {(j.texture, j.output): i for i, j in enumerate(jobs)}
+    results.sort(key=lambda r: order[(r["texture"], r["output"])])
+    counts = {s: sum(r["status"] == s for r in results) for s in ("ok", "skipped", "clean", "error")}
+    for r in results:
+        if args.analyze:
+            line = f"[{r['status']}] {r['texture']} {r['total_s']:.2f}s"
+            if "clean" in r:
+                line += (
+                    f" clean={r['clean']} mean={r['seam_error_mean']} p95={r['seam_error_p95']}"
+                    f" band_px={r['suggested_band_px']}"
+                )
+        else:
+            line = f"[{r['status']}] {r['texture']} -> {r['output']} {r['total_s']:.2f}s"
+        print(line + (f" {r['error']}" if "error" in r else ""))
+    print(
+        f"ok={counts['ok']} skipped={counts['skipped']} clean={counts['clean']} error={counts['error']}"
+        f" wall={wall:.2f}s workers={workers}"
+    )
+
+    report = Path(args.report) if args.report else (out_dir or Path.cwd()) / "seam_batch_report.json"
+    write_report(report, results, {"workers": workers, "wall_s": wall, **counts})
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
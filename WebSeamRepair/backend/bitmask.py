@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+
+# Source rows converted / thresholded per step in PackedMask.from_image.
+_STRIP_ROWS = 256
+
+
+def _nearest_index(n_out: int, n_in: int) -> np.ndarray:
+    """Source index of every output index for Image.resize(NEAREST) of n_in -> n_out."""
+    scale = n_in / n_out
+    # Pillow walks the texel centres by repeated addition; a running sum reproduces its
+    # rounding at exact .0 boundaries, (i + 0.5) * scale does not
+    pos = np.cumsum(np.concatenate([[scale * 0.5], np.full(n_out - 1, scale)]))
+    return np.minimum(pos.astype(np.int64), n_in - 1)
+
+
+class PackedMask:
+    """
+    HxW boolean mask stored as np.packbits rows (1 bit per texel, 8x smaller than a
+    bool array). Supports what the seam passes need: point tests (mask[ys, xs]),
+    row / column occupancy and square-window dilation, all on the packed bytes.
+    """
+
+    __slots__ = ("bits", "width")
+
+    def __init__(self, bits: np.ndarray, width: int) -> None:
+        self.bits = bits  # (H, ceil(W / 8)) uint8, big bit order, pad bits are 0
+        self.width = int(width)
+
+    @classmethod
+    def from_bool(cls, mask: np.ndarray) -> PackedMask:
+        return cls(np.packbits(np.asarray(mask, dtype=bool), axis=1), mask.shape[1])
+
+    @classmethod
+    def zeros(cls, h: int, w: int) -> PackedMask:
+        return cls(np.zeros((int(h), (int(w) + 7) // 8), dtype=np.uint8), w)
+
+    @classmethod
+    def from_image(cls, img: Image.Image, w: int, h: int, threshold: int = 16) -> PackedMask:
+        """
+        Texels whose grey level is >= threshold, with img scaled to w x h by nearest
+        neighbour. Same result as img.convert("L").resize((w, h), NEAREST) >= threshold,
+        but only a strip of source rows is converted at a time and no full-size grey or
+        bool image is made.
+        """
+        sw, sh = img.size
+        ys = _nearest_index(h, sh)
+        xs = _nearest_index(w, sw)
+        out = cls.zeros(h, w)
+        for r0 in range(0, h, _STRIP_ROWS):
+            rows = ys[r0 : r0 + _STRIP_ROWS]
+            y0, y1 = int(rows[0]), int(rows[-1]) + 1
+            strip = img.crop((0, y0, sw, y1))
+            if strip.mode != "L":
+                strip = strip.convert("L")
+            grey = np.asarray(strip)
+            out.bits[r0 : r0 + rows.size] = np.packbits(grey[rows - y0][:, xs] >= np.uint8(threshold), axis=1)
+        return out
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.bits.shape[0], self.width
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    def __getitem__(self, key: tuple[Any, Any]) -> np.ndarray:
+        """Point test: mask[ys, xs] for integer indices / index arrays (no slices)."""
+        ys, xs = key
+        xs = np.asarray(xs)
+        shift = (7 - (xs & 7)).astype(np.uint8)
+        return ((self.bits[ys, xs >> 3] >> shift) & 1).astype(bool)
+
+    def any(self) -> bool:
+        return bool(self.bits.any())
+
+    def row_any(self) -> np.ndarray:
+        """(H,) bool: rows with a set texel."""
+        return self.bits.any(axis=1)
+
+    def col_any(self, rows: np.ndarray | slice = slice(None)) -> np.ndarray:
+        """(W,) bool: columns with a set texel in the given rows."""
+        packed = np.bitwise_or.reduce(self.bits[rows], axis=0)
+        return np.unpackbits(packed, count=self.width).astype(bool)
+
+    def unpack(self, rows: np.ndarray | slice = slice(None)) -> np.ndarray:
+        return np.unpackbits(self.bits[rows], axis=1, count=self.width).astype(bool)
+
+    def set_block(self, y: int, x: int, block: np.ndarray) -> None:
+        """Overwrite the texels under a bool block placed at (y, x)."""
+        bh, bw = block.shape
+        b0, b1 = x >> 3, (x + bw + 7) >> 3
+        cur = np.unpackbits(self.bits[y : y + bh, b0:b1], axis=1)
+        cur[:, x - 8 * b0 : x - 8 * b0 + bw] = block
+        self.bits[y : y + bh, b0:b1] = np.packbits(cur, axis=1)
+
+    def dilate(self, radius: int) -> PackedMask:
+        """
+        (2r+1) square-window dilation, separable with doubling shifts as
+        _binary_dilate_fast: rows shift whole packed rows, columns shift bits.
+        """
+        if radius <= 0:
+            return self
+        b = self.bits.copy()
+        for axis in (0, 1):
+            cover = 0
+            while cover < radius:
+                # at most cover + 1: a run clipped by the image border only spans [0, cover]
+                step = min(cover + 1, radius - cover)
+                if axis == 0:
+                    out = b.copy()
+                    out[step:] |= b[:-step]
+                    out[:-step] |= b[step:]
+                    b = out
+                else:
+                    out = b.copy()
+                    _or_shifted_cols(out, b, step)
+                    _or_shifted_cols(out, b, -step)
+                    b = out
+                    if self.width % 8:
+                        b[:, -1] &= np.uint8((0xFF << (8 - self.width % 8)) & 0xFF)
+                cover += step
+        return PackedMask(b, self.width)
+
+
+def _or_shifted_cols(out: np.ndarray, b: np.ndarray, s: int) -> None:
+    """out |= packed rows of b moved s texels towards higher columns (s < 0: lower)."""
+    nb = b.shape[1]
+    q, r = divmod(abs(s), 8)
+    if q >= nb:
+        return
+    if s > 0:
+        src, dst = b[:, : nb - q], out[:, q:]
+        dst |= src >> r
+        if r:
+            dst[:, 1:] |= src[:, :-1] << (8 - r)
+    else:
+        src, dst = b[:, q:], out[:, : nb - q]
+        dst |= src << r
+        if r:
+            dst[:, :-1] |= src[:, 1:] >> (8 - r)
@@ -1,24 +1,171 @@
 from __future__ import annotations
 
 import io
+import json
+import os
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable
 
-from fastapi import FastAPI, File, Form, UploadFile
+from fastapi import BackgroundTasks, FastAPI, File, Form, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from PIL import Image
+from starlette.concurrency import run_in_threadpool
 
-from seam_repair import repair_texture_seams
-from vendor import ensure_three_vendor
+from result_cache import ResultCache, code_fingerprint, request_key
+from seam_repair import (
+    KERNELS,
+    ROI_HALO_PX,
+    RepairState,
+    accumulate_seams,
+    finish_repair,
+    finish_repair_delta,
+    preview_texture,
+    roi_halo_px,
+    scale_pixel_params,
+)
+from sessions import SessionStore
+from vendor import ensure_three_vendor, missing_three_vendor
+from worker_pool import ComputePool
 
 
 APP_DIR = Path(__file__).resolve().parent
 FRONTEND_DIR = (APP_DIR.parent / "frontend").resolve()
 STATIC_DIR = FRONTEND_DIR / "static"
 
+# Per-request limits (env overridable). Uploads are spooled to disk by Starlette and
+# consumed from the spool file, so these bound work per request, not upload buffering.
+MAX_REQUEST_BYTES = int(float(os.environ.get("SEAM_MAX_REQUEST_MB", "1024")) * 1024 * 1024)
+MAX_TEXTURE_PIXELS = int(os.environ.get("SEAM_MAX_PIXELS", str(16384 * 16384)))
+
+# Result cache for repeated identical requests (memory LRU + optional directory).
+# SEAM_CACHE_MB=0 disables it.
+CACHE_BYTES = int(float(os.environ.get("SEAM_CACHE_MB", "256")) * 1024 * 1024)
+CACHE_DIR = os.environ.get("SEAM_CACHE_DIR") or None
+CACHE_DISK_BYTES = int(float(os.environ.get("SEAM_CACHE_DISK_MB", "2048")) * 1024 * 1024)
+RESULT_CACHE = ResultCache(CACHE_BYTES, CACHE_DIR, CACHE_DISK_BYTES) if CACHE_BYTES > 0 else None
+CODE_VERSION = code_fingerprint()
+
+# Accumulated seam samples per session, so finishing-only parameter changes skip
+# resampling. SEAM_SESSION_MB=0 disables sessions.
+SESSION_BYTES = int(float(os.environ.get("SEAM_SESSION_MB", "512")) * 1024 * 1024)
+SESSION_TTL_S = float(os.environ.get("SEAM_SESSION_TTL_S", "1800"))
+SESSIONS = SessionStore(SESSION_BYTES, SESSION_TTL_S) if SESSION_BYTES > 0 else None
+
+# Missing / corrupt vendor files are fetched in a background thread after startup, never
+# at import. SEAM_VENDOR_FETCH=0 disables it (offline deployments: run `python vendor.py`
+# at build time instead).
+VENDOR_FETCH = os.environ.get("SEAM_VENDOR_FETCH", "1") != "0"
+
+# SEAM_COMPUTE_WORKERS=N runs accumulation / finishing in N pre-started worker processes
+# (see serve.py); textures are handed over through shared memory. 0 = compute in-process.
+COMPUTE_WORKERS = int(os.environ.get("SEAM_COMPUTE_WORKERS", "0"))
+POOL: ComputePool | None = None
+
+# SEAM_KERNEL=numba runs the splat loop compiled (needs `pip install numba`; falls back
+# to NumPy without it).
+KERNEL = os.environ.get("SEAM_KERNEL", "numpy")
+if KERNEL not in KERNELS:
+    raise ValueError("SEAM_KERNEL 必须是 " + " | ".join(KERNELS))
+
+# PIL's decompression-bomb guard would reject 16K atlases; _open_upload_image enforces
+# MAX_TEXTURE_PIXELS from the header instead, before anything is decoded.
+Image.MAX_IMAGE_PIXELS = None
+
+
+# output=png: full RGBA PNG; output=delta: only changed pixels (seam_repair.encode_texture_delta,
+# apply with seam_repair.apply_texture_delta).
+OUTPUT_MEDIA_TYPES = {"png": "image/png", "delta": "application/x-seam-delta"}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class SessionNotFound(LookupError):
+    pass
+
+
+def _upload_size(f: UploadFile) -> int:
+    if f.size is not None:
+        return int(f.size)
+    f.file.seek(0, io.SEEK_END)
+    n = f.file.tell()
+    f.file.seek(0)
+    return int(n)
+
+
+def _open_upload_image(f: UploadFile, what: str) -> Image.Image:
+    """Open an uploaded image straight from its spool file (lazy: only the header is read here)."""
+    f.file.seek(0)
+    img = Image.open(f.file)
+    w, h = img.size
+    if w * h > MAX_TEXTURE_PIXELS:
+        raise UploadTooLarge(f"{what} 像素数超出限制：{w}x{h} > {MAX_TEXTURE_PIXELS}")
+    return img
 
-app = FastAPI(title="WebSeamRepair", version="0.1.0")
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _result_response(data: bytes, etag: str, cache_status: str, session_id: str, output: str) -> Response:
+    return Response(
+        content=data,
+        media_type=OUTPUT_MEDIA_TYPES[output],
+        headers={
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+            "X-Seam-Cache": cache_status,
+            "X-Seam-Session": session_id,
+        },
+    )
+
+
+def _finish_params(
+    feather_px: int, alpha_method: str, alpha_edge_aware: bool, guided_eps: float, poisson_iters: int
+) -> dict:
+    return dict(
+        feather_px=int(feather_px),
+        alpha_method=str(alpha_method),
+        alpha_edge_aware=bool(alpha_edge_aware),
+        guided_eps=float(guided_eps),
+        poisson_iters=int(poisson_iters),
+    )
+
+
+def _fetch_vendor() -> None:
+    try:
+        ensure_three_vendor(STATIC_DIR)
+    except Exception:
+        # Vendor download failure should NOT break API usage (frontend falls back to CDN).
+        pass
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    global POOL
+    # Only a local hash check runs here; downloads never delay readiness.
+    if VENDOR_FETCH and STATIC_DIR.exists() and missing_three_vendor(STATIC_DIR):
+        threading.Thread(target=_fetch_vendor, name="vendor-fetch", daemon=True).start()
+    if COMPUTE_WORKERS > 0:
+        POOL = await run_in_threadpool(ComputePool, COMPUTE_WORKERS)
+    try:
+        yield
+    finally:
+        if POOL is not None:
+            POOL.shutdown()
+            POOL = None
+
+
+app = FastAPI(title="WebSeamRepair", version="0.1.0", lifespan=_lifespan)
 
 # 允许主项目前端（如 localhost:3000）跨域调用
 app.add_middleware(
@@ -30,29 +177,114 @@ app.add_middleware(
 )
 
 
-# Try to cache vendor scripts so browser doesn't need CDN.
-try:
-    if STATIC_DIR.exists():
-        ensure_three_vendor(STATIC_DIR)
-except Exception:
-    # Vendor download failure should NOT break API usage.
-    pass
-
-
 @app.get("/api/health")
 def health() -> dict:
     return {"ok": True}
 
 
+def _result_key(session_id: str, finish: dict, output: str) -> str:
+    return request_key([], {"session": session_id, "output": output, **finish}, CODE_VERSION)
+
+
+def _finish_session(
+    session_id: str,
+    finish: dict,
+    accumulate: Callable[[], RepairState] | None,
+    output: str,
+) -> tuple[bytes, str]:
+    """
+    Encoded result (PNG or texture delta) for a session + finishing parameters, via the
+    result cache; the session's accumulated samples are reused when present (accumulated
+    otherwise, if accumulate is given). Returns (data, "hit" | "session" | "miss").
+    """
+    key = _result_key(session_id, finish, output)
+    cached = RESULT_CACHE.get(key) if RESULT_CACHE is not None else None
+    if cached is not None:
+        return cached, "hit"
+
+    state = SESSIONS.get(session_id) if SESSIONS is not None else None
+    status = "session"
+    if state is None:
+        if accumulate is None:
+            raise SessionNotFound(f"session 不存在或已过期：{session_id}")
+        state = accumulate()
+        status = "miss"
+        if SESSIONS is not None:
+            SESSIONS.put(session_id, state)
+
+    if POOL is not None:
+        data = POOL.finish(state, finish, output)
+    elif output == "delta":
+        data = finish_repair_delta(state, **finish)
+    else:
+        buf = io.BytesIO()
+        finish_repair(state, **finish).save(buf, format="PNG")
+        data = buf.getvalue()
+    if RESULT_CACHE is not None:
+        RESULT_CACHE.put(key, data)
+    return data, status
+
+
+def _repair_response(
+    request: Request,
+    session_id: str,
+    finish: dict,
+    accumulate: Callable[[], RepairState] | None,
+    output: str,
+) -> Response:
+    if output not in OUTPUT_MEDIA_TYPES:
+        raise ValueError("output 必须是 " + " | ".join(OUTPUT_MEDIA_TYPES))
+    etag = f'"{_result_key(session_id, finish, output)}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "X-Seam-Session": session_id})
+    data, status = _finish_session(session_id, finish, accumulate, output)
+    return _result_response(data, etag, status, session_id, output)
+
+
+async def _respond(
+    request: Request,
+    session_id: str,
+    finish: dict,
+    accumulate: Callable[[], RepairState] | None,
+    output: str,
+) -> Response:
+    # compute (in-process or waiting on the pool) runs off the event loop, so
+    # /api/health and other requests are served during a repair
+    return await run_in_threadpool(_repair_response, request, session_id, finish, accumulate, output)
+
+
+def _accumulate(obj_file: BinaryIO, texture_img: Image.Image, mask_img: Image.Image | None, params: dict) -> RepairState:
+    obj_file.seek(0)
+    if POOL is not None:
+        return POOL.accumulate(obj_file, texture_img, mask_img, **params)
+    return accumulate_seams(obj_file, texture_img, mask_img, **params)
+
+
+def _refine_in_background(
+    session_id: str, finish: dict, accumulate: Callable[[], RepairState], output: str
+) -> None:
+    """After a preview: compute the full-resolution result so the follow-up call is a cache hit."""
+    try:
+        _finish_session(session_id, finish, accumulate, output)
+    except Exception:
+        # Best effort: the follow-up request computes (and reports) it anyway.
+        pass
+
+
 @app.post("/api/repair")
 async def api_repair(
-    obj: UploadFile = File(..., description="OBJ 模型（含 vt UV）"),
+    request: Request,
+    background_tasks: BackgroundTasks,
+    obj: UploadFile = File(..., description="模型（含 UV）：OBJ / binary PLY / GLB / NPZ"),
     texture: UploadFile = File(..., description="要修复的贴图（BaseColor 等）"),
     seam_mask: UploadFile | None = File(None, description="SP 导出的 seam 黑白 mask（可选）"),
     texture_kind: str = Form("basecolor"),
     band_px: int = Form(8),
     feather_px: int = Form(6),
     sample_step_px: float = Form(2.0),
+    sampling: str = Form("splat"),
+    density: str = Form("fixed"),
+    sample_budget: int = Form(0),
     mode: str = Form("average"),
     only_masked_seams: bool = Form(True),
     alpha_method: str = Form("distance"),
@@ -60,39 +292,99 @@ async def api_repair(
     guided_eps: float = Form(1e-4),
     color_match: str = Form("meanvar"),
     poisson_iters: int = Form(0),
+    engine: str = Form("numpy"),
+    mesh_format: str = Form("auto"),
+    preview: int = Form(0),
+    refine: bool = Form(True),
+    output: str = Form("png"),
+    roi: str = Form("", description='只修这个 UV 区域（JSON）：[[u0,v0,u1,v1],...] 或 [[u,v],...] 多边形'),
 ) -> Response:
     try:
-        obj_bytes = await obj.read()
-        tex_bytes = await texture.read()
-        mask_bytes = await seam_mask.read() if seam_mask is not None else None
+        uploads = [f for f in (obj, texture, seam_mask) if f is not None]
+        total = sum(_upload_size(f) for f in uploads)
+        if total > MAX_REQUEST_BYTES:
+            raise UploadTooLarge(f"上传文件总大小超出限制：{total} > {MAX_REQUEST_BYTES} 字节")
 
-        tex_img = Image.open(io.BytesIO(tex_bytes))
-        mask_img = Image.open(io.BytesIO(mask_bytes)) if mask_bytes else None
+        tex_img = _open_upload_image(texture, "贴图")
+        mask_img = _open_upload_image(seam_mask, "seam mask") if seam_mask is not None else None
 
-        out_img = repair_texture_seams(
-            obj_file=io.BytesIO(obj_bytes),
-            texture_img=tex_img,
-            seam_mask_img=mask_img,
+        # Parameters up to accumulation define the session; the rest only re-finish it.
+        upstream = dict(
             texture_kind=str(texture_kind),
             band_px=int(band_px),
-            feather_px=int(feather_px),
             sample_step_px=float(sample_step_px),
+            sampling=str(sampling),
+            density=str(density),
+            sample_budget=int(sample_budget),
             mode=str(mode),
             only_masked_seams=bool(only_masked_seams),
-            alpha_method=str(alpha_method),
-            alpha_edge_aware=bool(alpha_edge_aware),
-            guided_eps=float(guided_eps),
             color_match=str(color_match),
-            poisson_iters=int(poisson_iters),
+            engine=str(engine),
+            kernel=KERNEL,
+            mesh_format=str(mesh_format),
+            roi=json.loads(roi) if roi.strip() else None,
         )
+        finish = _finish_params(feather_px, alpha_method, alpha_edge_aware, guided_eps, poisson_iters)
+        if upstream["roi"] is not None:
+            # sessions may be re-finished with other feather values: keep at least the default halo
+            halo = roi_halo_px(finish["feather_px"], finish["alpha_edge_aware"], upstream["texture_kind"])
+            upstream["roi_halo_px"] = max(ROI_HALO_PX, halo)
+        inputs = request_key([f.file if f is not None else None for f in (obj, texture, seam_mask)], {}, CODE_VERSION)
+        session_id = request_key([], {"inputs": inputs, **upstream}, CODE_VERSION)
 
-        buf = io.BytesIO()
-        out_img.save(buf, format="PNG")
-        return Response(content=buf.getvalue(), media_type="image/png")
+        def accumulate() -> RepairState:
+            return _accumulate(obj.file, tex_img, mask_img, upstream)
+
+        if preview > 0:
+            small, scale = preview_texture(tex_img, int(preview))
+            if scale < 1.0:
+                p_upstream = scale_pixel_params(upstream, scale)
+                p_finish = scale_pixel_params(finish, scale)
+                p_session = request_key([], {"inputs": inputs, "preview": int(preview), **p_upstream}, CODE_VERSION)
+
+                def accumulate_preview() -> RepairState:
+                    return _accumulate(obj.file, small, mask_img, p_upstream)
+
+                resp = await _respond(request, p_session, p_finish, accumulate_preview, str(output))
+                resp.headers["X-Seam-Preview"] = f"{small.size[0]}x{small.size[1]}"
+                resp.headers["X-Seam-Full-Session"] = session_id
+                if refine:
+                    background_tasks.add_task(_refine_in_background, session_id, finish, accumulate, str(output))
+                return resp
+
+        return await _respond(request, session_id, finish, accumulate, str(output))
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"ok": False, "error": str(e)})
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
+
+
+@app.post("/api/repair/session/{session_id}")
+async def api_repair_session(
+    request: Request,
+    session_id: str,
+    feather_px: int = Form(6),
+    alpha_method: str = Form("distance"),
+    alpha_edge_aware: bool = Form(True),
+    guided_eps: float = Form(1e-4),
+    poisson_iters: int = Form(0),
+    output: str = Form("png"),
+) -> Response:
+    """Re-finish a previous /api/repair (X-Seam-Session) with new feather / blend parameters."""
+    try:
+        finish = _finish_params(feather_px, alpha_method, alpha_edge_aware, guided_eps, poisson_iters)
+        return await _respond(request, session_id, finish, None, str(output))
+    except SessionNotFound as e:
+        return JSONResponse(status_code=404, content={"ok": False, "error": str(e)})
     except Exception as e:
         return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
 
 
+@app.delete("/api/repair/session/{session_id}")
+def api_drop_session(session_id: str) -> dict:
+    return {"ok": SESSIONS is not None and SESSIONS.discard(session_id)}
+
+
 # ---------- frontend ----------
 
 
@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import json
+import mmap
+import multiprocessing as mp
+import os
+import struct
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+
+MESH_FORMATS = ("auto", "obj", "ply", "glb", "npz")
+
+
+@dataclass(frozen=True)
+class MeshData:
+    """
+    Triangle mesh as flat arrays (what seam detection actually needs).
+    UV convention follows OBJ: v=0 is the bottom of the image.
+    """
+
+    positions: np.ndarray  # (N, 3) float
+    uvs: np.ndarray  # (M, 2) float
+    tri_v: np.ndarray  # (T, 3) int, position indices (0-based)
+    tri_vt: np.ndarray  # (T, 3) int, uv indices (0-based, -1 if missing)
+
+
+def sniff_mesh_format(file: BinaryIO) -> str:
+    """Detect obj | ply | glb | npz from magic bytes; the stream position is restored."""
+    pos = file.tell()
+    head = file.read(4)
+    file.seek(pos)
+    if head == b"glTF":
+        return "glb"
+    if head[:3] == b"ply":
+        return "ply"
+    if head == b"PK\x03\x04":
+        return "npz"
+    return "obj"
+
+
+def _file_buffer(file: BinaryIO) -> memoryview | bytes | mmap.mmap:
+    """
+    Whole-file buffer with as few copies as possible:
+    BytesIO -> its own buffer, real files -> read-only mmap, anything else -> read().
+    """
+    getbuffer = getattr(file, "getbuffer", None)
+    if getbuffer is not None:
+        return getbuffer()
+    try:
+        file.flush()
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        file.seek(0)
+        return file.read()
+
+
+def _check_mesh(positions: np.ndarray, uvs: np.ndarray, tri_v: np.ndarray, tri_vt: np.ndarray) -> MeshData:
+    if uvs.shape[0] == 0:
+        raise ValueError("模型缺少 UV 数据，无法进行 seam-aware 修复。")
+    if tri_v.shape[0] == 0:
+        raise ValueError("模型未解析到任何三角面。")
+    if int(tri_v.max()) >= positions.shape[0] or int(tri_v.min()) < 0:
+        raise ValueError("模型面索引越界（position）。")
+    # -1 marks a face corner without vt (OBJ); the seam builder reports those
+    if int(tri_vt.max()) >= uvs.shape[0] or int(tri_vt.min()) < -1:
+        raise ValueError("模型面索引越界（uv）。")
+    return MeshData(positions=positions, uvs=uvs, tri_v=tri_v, tri_vt=tri_vt)
+
+
+def _fields_view(rec: np.ndarray, names: tuple[str, ...]) -> np.ndarray:
+    """
+    (N, k) array of structured fields. Adjacent same-typed fields (the usual x,y,z / s,t
+    layout) come back as a strided view into the record buffer; otherwise they are stacked.
+    """
+    fields = rec.dtype.fields or {}
+    dts = [fields[n][0] for n in names]
+    offs = [fields[n][1] for n in names]
+    if all(d == dts[0] for d in dts) and all(offs[i + 1] - offs[i] == dts[0].itemsize for i in range(len(offs) - 1)):
+        return np.ndarray(
+            shape=(rec.shape[0], len(names)),
+            dtype=dts[0],
+            buffer=rec,
+            offset=offs[0],
+            strides=(rec.dtype.itemsize, dts[0].itemsize),
+        )
+    return np.stack([rec[n] for n in names], axis=1)
+
+
+# ---------- PLY ----------
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2",
+    "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4",
+    "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4",
+    "double": "f8", "float64": "f8",
+}
+
+_PLY_UV_NAMES = (("s", "t"), ("u", "v"), ("texture_u", "texture_v"), ("texture_s", "texture_t"))
+
+
+def _load_ply(buf) -> MeshData:
+    """
+    Binary PLY (little/big endian) with per-vertex UVs. Vertex data is viewed in place
+    with np.frombuffer; all-triangle face lists take the same zero-copy path.
+    """
+    mv = memoryview(buf)
+    end = bytes(mv[: min(len(mv), 1 << 16)]).find(b"end_header")
+    if end < 0:
+        raise ValueError("PLY 头部缺少 end_header。")
+    nl = bytes(mv[end : end + 16]).find(b"\n")
+    body_off = end + nl + 1
+    header = bytes(mv[:end]).decode("ascii", errors="ignore").splitlines()
+
+    fmt = ""
+    elements: list[tuple[str, int, list[tuple[str, ...]]]] = []
+    for line in header:
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "format":
+            fmt = parts[1]
+        elif parts[0] == "element":
+            elements.append((parts[1], int(parts[2]), []))
+        elif parts[0] == "property" and elements:
+            elements[-1][2].append(tuple(parts[1:]))
+    if fmt not in ("binary_little_endian", "binary_big_endian"):
+        raise ValueError("仅支持 binary PLY（binary_little_endian / binary_big_endian）。")
+    bo = "<" if fmt == "binary_little_endian" else ">"
+
+    positions = uvs = tri = None
+    off = body_off
+    for name, count, props in elements:
+        if positions is not None and tri is not None:
+            break  # trailing elements are irrelevant
+        if any(p[0] == "list" for p in props):
+            if name != "face":
+                raise ValueError(f"PLY 元素 {name} 含 list 属性，暂不支持。")
+            tri, off = _ply_faces(mv, off, count, props, bo)
+            continue
+        dtype = np.dtype([(p[1], bo + _PLY_TYPES[p[0]]) for p in props])
+        arr = np.frombuffer(mv, dtype=dtype, count=count, offset=off)
+        off += dtype.itemsize * count
+        if name == "vertex":
+            names = dtype.names or ()
+            positions = _fields_view(arr, ("x", "y", "z"))
+            for su, sv in _PLY_UV_NAMES:
+                if su in names and sv in names:
+                    uvs = _fields_view(arr, (su, sv))
+                    break
+    if positions is None or tri is None:
+        raise ValueError("PLY 缺少 vertex 或 face 元素。")
+    if uvs is None:
+        raise ValueError("PLY 缺少逐顶点 UV（s/t 或 u/v 属性），无法进行 seam-aware 修复。")
+    return _check_mesh(positions, uvs, tri, tri)
+
+
+def _ply_faces(mv: memoryview, off: int, count: int, props: list[tuple[str, ...]], bo: str) -> tuple[np.ndarray, int]:
+    idx_i = next((i for i, p in enumerate(props) if p[0] == "list" and p[3] in ("vertex_indices", "vertex_index")), -1)
+    if idx_i < 0:
+        raise ValueError("PLY face 缺少 vertex_indices 属性。")
+    # Fast path: every list is a triangle and no other list props -> fixed-size records.
+    if all(p[0] != "list" or i == idx_i for i, p in enumerate(props)):
+        fields = []
+        for i, p in enumerate(props):
+            if i == idx_i:
+                fields += [("n", bo + _PLY_TYPES[p[1]]), ("idx", bo + _PLY_TYPES[p[2]], (3,))]
+            else:
+                fields.append((p[1], bo + _PLY_TYPES[p[0]]))
+        dtype = np.dtype(fields)
+        if off + dtype.itemsize * count <= len(mv):
+            rec = np.frombuffer(mv, dtype=dtype, count=count, offset=off)
+            if np.all(rec["n"] == 3):
+                return rec["idx"].astype(np.int64), off + dtype.itemsize * count
+
+    # General polygons: walk the records, fan-triangulate.
+    tris: list[tuple[int, int, int]] = []
+    for _ in range(count):
+        poly: list[int] = []
+        for i, p in enumerate(props):
+            if p[0] == "list":
+                cnt_t = np.dtype(bo + _PLY_TYPES[p[1]])
+                item_t = np.dtype(bo + _PLY_TYPES[p[2]])
+                n = int(np.frombuffer(mv, dtype=cnt_t, count=1, offset=off)[0])
+                off += cnt_t.itemsize
+                vals = np.frombuffer(mv, dtype=item_t, count=n, offset=off)
+                off += item_t.itemsize * n
+                if i == idx_i:
+                    poly = [int(x) for x in vals]
+            else:
+                off += np.dtype(_PLY_TYPES[p[0]]).itemsize
+        for k in range(1, len(poly) - 1):
+            tris.append((poly[0], poly[k], poly[k + 1]))
+    return np.asarray(tris, dtype=np.int64).reshape(-1, 3), off
+
+
+# ---------- GLB ----------
+
+_GLTF_COMPONENT = {5120: "i1", 5121: "u1", 5122: "i2", 5123: "u2", 5125: "u4", 5126: "f4"}
+_GLTF_NCOMP = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+
+def _gltf_accessor(doc: dict, bin_mv: memoryview, index: int) -> np.ndarray:
+    """Strided zero-copy view of a glTF accessor inside the BIN chunk."""
+    acc = doc["accessors"][index]
+    if "sparse" in acc:
+        raise ValueError("GLB 稀疏 accessor 暂不支持。")
+    ct = np.dtype("<" + _GLTF_COMPONENT[acc["componentType"]])
+    ncomp = _GLTF_NCOMP[acc["type"]]
+    count = int(acc["count"])
+    view = doc["bufferViews"][acc["bufferView"]]
+    if int(view.get("buffer", 0)) != 0:
+        raise ValueError("GLB 仅支持内嵌的单个 buffer。")
+    start = int(view.get("byteOffset", 0)) + int(acc.get("byteOffset", 0))
+    elem = ct.itemsize * ncomp
+    stride = int(view.get("byteStride", 0)) or elem
+    if count == 0:
+        return np.zeros((0, ncomp), dtype=ct)
+    if start + stride * (count - 1) + elem > len(bin_mv):
+        raise ValueError("GLB accessor 越界。")
+    base = np.frombuffer(bin_mv, dtype=np.uint8, count=stride * (count - 1) + elem, offset=start)
+    arr = np.ndarray(shape=(count, ncomp), dtype=ct, buffer=base, strides=(stride, ct.itemsize))
+    if acc.get("normalized") and ct.kind in "iu":
+        arr = arr.astype(np.float32) / float(np.iinfo(ct).max)
+    return arr
+
+
+def _load_glb(buf) -> MeshData:
+    """
+    GLB (binary glTF 2.0): POSITION, TEXCOORD_0 and indices of every triangle primitive.
+    Node transforms are ignored (seams only need topology). glTF's top-left UV origin is
+    converted to the OBJ convention (v = 1 - v).
+    """
+    mv = memoryview(buf)
+    magic, version, _length = struct.unpack_from("<4sII", mv, 0)
+    if magic != b"glTF" or version != 2:
+        raise ValueError("仅支持 glTF 2.0 GLB。")
+    off = 12
+    doc: dict | None = None
+    bin_mv = memoryview(b"")
+    while off + 8 <= len(mv):
+        clen, ctype = struct.unpack_from("<II", mv, off)
+        chunk = mv[off + 8 : off + 8 + clen]
+        if ctype == 0x4E4F534A:  # JSON
+            doc = json.loads(bytes(chunk).decode("utf-8"))
+        elif ctype == 0x004E4942:  # BIN
+            bin_mv = chunk
+        off += 8 + clen
+    if doc is None:
+        raise ValueError("GLB 缺少 JSON chunk。")
+    for ext in doc.get("extensionsRequired", []):
+        raise ValueError(f"GLB 使用了不支持的扩展：{ext}")
+
+    pos_parts: list[np.ndarray] = []
+    uv_parts: list[np.ndarray] = []
+    tri_parts: list[np.ndarray] = []
+    base = 0
+    for mesh in doc.get("meshes", []):
+        for prim in mesh.get("primitives", []):
+            if int(prim.get("mode", 4)) != 4:
+                continue  # only TRIANGLES
+            attrs = prim.get("attributes", {})
+            if "POSITION" not in attrs or "TEXCOORD_0" not in attrs:
+                continue
+            pos = _gltf_accessor(doc, bin_mv, attrs["POSITION"])
+            uv = _gltf_accessor(doc, bin_mv, attrs["TEXCOORD_0"])
+            if "indices" in prim:
+                idx = _gltf_accessor(doc, bin_mv, prim["indices"]).reshape(-1)
+            else:
+                idx = np.arange(pos.shape[0], dtype=np.int64)
+            tri = idx[: idx.size - idx.size % 3].reshape(-1, 3).astype(np.int64) + base
+            uv = np.stack([uv[:, 0], 1.0 - uv[:, 1]], axis=1)
+            pos_parts.append(pos)
+            uv_parts.append(uv)
+            tri_parts.append(tri)
+            base += pos.shape[0]
+    if not tri_parts:
+        raise ValueError("GLB 中没有带 POSITION + TEXCOORD_0 的三角形 primitive。")
+    if len(pos_parts) == 1:
+        positions, uvs, tri = pos_parts[0], uv_parts[0], tri_parts[0]
+    else:
+        positions = np.concatenate(pos_parts)
+        uvs = np.concatenate(uv_parts)
+        tri = np.concatenate(tri_parts)
+    return _check_mesh(positions, uvs, tri, tri)
+
+
+# ---------- OBJ ----------
+
+_OBJ_CHUNK_BYTES = (4 << 20, 64 << 20)
+
+
+@dataclass(frozen=True)
+class _ObjChunk:
+    """
+    Typed arrays of one line-aligned piece of an OBJ. Face corners keep their raw OBJ
+    indices plus the v / vt counts seen before their line inside the chunk, so relative
+    (negative) indices can be resolved once the chunks are laid end to end.
+    """
+
+    positions: np.ndarray  # (N, 3) float32
+    uvs: np.ndarray  # (M, 2) float32
+    corner_v: np.ndarray  # (K,) int64, raw (1-based / negative)
+    corner_vt: np.ndarray  # (K,) int64, raw (0 = none)
+    corner_nv: np.ndarray  # (K,) int64
+    corner_nvt: np.ndarray  # (K,) int64
+    face_size: np.ndarray  # (F,) int64, corners per face (>= 3)
+
+
+def _parse_obj_chunk(data: bytes) -> _ObjChunk:
+    """
+    Parse v / vt / f lines of a chunk that starts and ends on line boundaries.
+    Face elements can be: v, v/vt, v//vn, v/vt/vn; other lines are ignored.
+    """
+    lines = [ln.strip() for ln in data.splitlines()]
+    is_v = [ln[:2] == b"v " for ln in lines]
+    is_vt = [ln[:3] == b"vt " for ln in lines]
+    is_f = [ln[:2] == b"f " for ln in lines]
+
+    vp = [ln.split()[1:4] for ln, k in zip(lines, is_v) if k]
+    if any(len(p) < 3 for p in vp):
+        raise ValueError("OBJ 顶点（v）需要 x y z 三个分量。")
+    positions = np.array(vp, dtype=np.float64).astype(np.float32).reshape(-1, 3)
+    # vt u [v [w]]: a missing v is 0
+    tp = [(ln.split()[1:3] + [b"0"])[:2] for ln, k in zip(lines, is_vt) if k]
+    uvs = np.array(tp, dtype=np.float64).astype(np.float32).reshape(-1, 2)
+
+    # v / vt lines up to and including each line
+    nv = np.cumsum(is_v, dtype=np.int64)
+    nvt = np.cumsum(is_vt, dtype=np.int64)
+    face_tokens = []
+    face_line = []
+    for i, k in enumerate(is_f):
+        if k:
+            tokens = lines[i].split()[1:]
+            if len(tokens) >= 3:
+                face_tokens.append(tokens)
+                face_line.append(i)
+    face_size = np.array([len(t) for t in face_tokens], dtype=np.int64)
+    parts = [t.split(b"/") for t in chain.from_iterable(face_tokens)]
+    corner_v = np.array([p[0] for p in parts], dtype=np.int64)
+    corner_vt = np.array([p[1] if len(p) >= 2 and p[1] else b"0" for p in parts], dtype=np.int64)
+    rows = np.repeat(np.array(face_line, dtype=np.int64), face_size)
+    return _ObjChunk(
+        positions=positions,
+        uvs=uvs,
+        corner_v=corner_v,
+        corner_vt=corner_vt,
+        corner_nv=nv[rows],
+        corner_nvt=nvt[rows],
+        face_size=face_size,
+    )
+
+
+def _merge_obj_chunks(chunks: list[_ObjChunk]) -> MeshData:
+    """Concatenate chunks in file order, resolve relative indices and fan-triangulate."""
+    if not chunks:
+        raise ValueError("OBJ 缺少 vt（UV）数据，无法进行 seam-aware 修复。")
+    v_off = np.cumsum([0] + [c.positions.shape[0] for c in chunks])[:-1]
+    vt_off = np.cumsum([0] + [c.uvs.shape[0] for c in chunks])[:-1]
+    positions = np.concatenate([c.positions for c in chunks])
+    uvs = np.concatenate([c.uvs for c in chunks])
+    raw_v = np.concatenate([c.corner_v for c in chunks])
+    raw_vt = np.concatenate([c.corner_vt for c in chunks])
+    seen_v = np.concatenate([c.corner_nv + o for c, o in zip(chunks, v_off)])
+    seen_vt = np.concatenate([c.corner_nvt + o for c, o in zip(chunks, vt_off)])
+    face_size = np.concatenate([c.face_size for c in chunks])
+    if uvs.shape[0] == 0:
+        raise ValueError("OBJ 缺少 vt（UV）数据，无法进行 seam-aware 修复。")
+    if face_size.size == 0:
+        raise ValueError("OBJ 未解析到任何面（f）。")
+
+    # OBJ is 1-based, negative means relative to the vertices read so far
+    corner_v = np.where(raw_v < 0, seen_v + raw_v, raw_v - 1)
+    corner_vt = np.where(raw_vt < 0, seen_vt + raw_vt, raw_vt - 1)
+    corner_vt[raw_vt == 0] = -1
+
+    # fan triangulation: (0, i, i + 1) for i in 1 .. size - 2, faces kept in file order
+    n_tri = face_size - 2
+    first = np.cumsum(face_size) - face_size
+    start = np.repeat(first, n_tri)
+    i = np.arange(int(n_tri.sum()), dtype=np.int64) - np.repeat(np.cumsum(n_tri) - n_tri, n_tri) + 1
+    corners = np.stack([start, start + i, start + i + 1], axis=1)
+    return _check_mesh(positions, uvs, corner_v[corners], corner_vt[corners])
+
+
+def _obj_pieces(file: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    """Line-aligned pieces of about chunk_bytes; a trailing partial line carries over."""
+    tail = b""
+    while True:
+        block = file.read(chunk_bytes)
+        if not block:
+            break
+        data = tail + block
+        cut = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+        if cut == 0:
+            tail = data
+            continue
+        tail = data[cut:]
+        yield data[:cut]
+    if tail:
+        yield tail
+
+
+def _stream_size(file: BinaryIO) -> int | None:
+    try:
+        start = file.tell()
+        size = file.seek(0, os.SEEK_END) - start
+        file.seek(start)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return size
+
+
+def load_obj(file: BinaryIO, *, workers: int = 1) -> MeshData:
+    """
+    Parse a text OBJ (v, vt, f; polygons are fan-triangulated) into MeshData.
+    The stream is cut into line-aligned chunks that are parsed into typed arrays and
+    merged in file order. Opt-in: workers > 1 parses the chunks in a process pool
+    started for this call (capped at the core count), worth it for OBJs of ~64MB+
+    when nothing else is using the cores; the default parses in-process.
+    """
+    size = _stream_size(file)
+    workers = max(1, min(int(workers), os.cpu_count() or 1))
+    lo, hi = _OBJ_CHUNK_BYTES
+    # a few chunks per worker keeps the pool busy while the parent reads ahead
+    chunk_bytes = int(min(max((size or 0) // (workers * 4), lo), hi))
+    if size is not None and size <= chunk_bytes:
+        workers = 1  # one chunk: a pool would only add start-up time
+    if workers == 1:
+        return _merge_obj_chunks([_parse_obj_chunk(p) for p in _obj_pieces(file, chunk_bytes)])
+
+    ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+        pending: list[Future] = []
+        chunks: list[_ObjChunk] = []
+        for piece in _obj_pieces(file, chunk_bytes):
+            pending.append(ex.submit(_parse_obj_chunk, piece))
+            # bound the unparsed text held in memory to ~2 chunks per worker
+            while len(pending) > 2 * workers:
+                chunks.append(pending.pop(0).result())
+        chunks.extend(f.result() for f in pending)
+    return _merge_obj_chunks(chunks)
+
+
+# ---------- NPZ ----------
+
+
+def _load_npz(file: BinaryIO) -> MeshData:
+    """
+    Raw arrays: positions (N,3), uvs (M,2) and either indices (T,3), indexing both,
+    or position_indices + uv_indices (T,3 each).
+    """
+    with np.load(file, allow_pickle=False) as z:
+        keys = set(z.files)
+        if not {"positions", "uvs"} <= keys:
+            raise ValueError("NPZ 需要包含 positions 与 uvs 数组。")
+        positions = z["positions"].reshape(-1, 3)
+        uvs = z["uvs"].reshape(-1, 2)
+        if "indices" in keys:
+            tri_v = z["indices"].reshape(-1, 3).astype(np.int64, copy=False)
+            tri_vt = tri_v
+        elif {"position_indices", "uv_indices"} <= keys:
+            tri_v = z["position_indices"].reshape(-1, 3).astype(np.int64, copy=False)
+            tri_vt = z["uv_indices"].reshape(-1, 3).astype(np.int64, copy=False)
+        else:
+            raise ValueError("NPZ 需要 indices，或 position_indices + uv_indices。")
+    return _check_mesh(positions, uvs, tri_v, tri_vt)
+
+
+def load_binary_mesh(file: BinaryIO, fmt: str) -> MeshData:
+    """Load a ply | glb | npz mesh stream into MeshData."""
+    if fmt == "npz":
+        return _load_npz(file)
+    buf = _file_buffer(file)
+    if fmt == "ply":
+        return _load_ply(buf)
+    if fmt == "glb":
+        return _load_glb(buf)
+    raise ValueError("mesh_format 必须是 " + " | ".join(MESH_FORMATS))
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from seam_repair import _binary_dilate, _binary_dilate_fast, repair_texture_seams
+
+
+# Cube faces: (origin, u axis, v axis). Adjacent faces share edge positions but not
+# vertex indices, so every face border becomes a UV seam after canonicalization.
+_CUBE_FACES = [
+    ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+    ((0, 0, 0), (0, 0, 1), (0, 1, 0)),
+    ((0, 1, 0), (0, 0, 1), (1, 0, 0)),
+    ((0, 0, 0), (1, 0, 0), (0, 0, 1)),
+    ((0, 0, 1), (1, 0, 0), (0, 1, 0)),
+    ((0, 0, 0), (0, 1, 0), (1, 0, 0)),
+]
+
+
+def make_cube_obj(n: int = 4, margin: float = 0.04) -> bytes:
+    """Subdivided cube (n x n quads per face), one UV chart per face in a 3x2 atlas."""
+    lines: list[str] = []
+    faces: list[str] = []
+    v_base = 0
+    for fi, (o, ua, va) in enumerate(_CUBE_FACES):
+        o_, ua_, va_ = np.array(o, float), np.array(ua, float), np.array(va, float)
+        cx, cy = fi % 3, fi // 3
+        cw = (1.0 - 4.0 * margin) / 3.0
+        ch = (1.0 - 3.0 * margin) / 2.0
+        u0 = margin + cx * (cw + margin)
+        v0 = margin + cy * (ch + margin)
+        for j in range(n + 1):
+            for i in range(n + 1):
+                p = o_ + ua_ * (i / n) + va_ * (j / n)
+                lines.append(f"v {p[0]:.6f} {p[1]:.6f} {p[2]:.6f}")
+                # odd faces get a transposed chart so seams join differently oriented UVs
+                s, t = (i / n, j / n) if fi % 2 == 0 else (j / n, i / n)
+                lines.append(f"vt {u0 + s * cw:.6f} {v0 + t * ch:.6f}")
+        for j in range(n):
+            for i in range(n):
+                a = v_base + j * (n + 1) + i + 1
+                b, c, d = a + 1, a + n + 2, a + n + 1
+                faces.append(f"f {a}/{a} {b}/{b} {c}/{c} {d}/{d}")
+        v_base += (n + 1) * (n + 1)
+    return ("\n".join(lines + faces) + "\n").encode("utf-8")
+
+
+def make_cylinder_obj(n_around: int = 24, n_height: int = 6, skew: float = 0.15) -> bytes:
+    """Open cylinder unwrapped into one skewed chart; the u=0/u=1 wrap is the seam."""
+    lines: list[str] = []
+    faces: list[str] = []
+    for j in range(n_height + 1):
+        for i in range(n_around + 1):
+            ang = 2.0 * np.pi * (i % n_around) / n_around
+            z = j / n_height
+            lines.append(f"v {np.cos(ang):.6f} {np.sin(ang):.6f} {z:.6f}")
+            u = 0.05 + 0.8 * i / n_around + skew * z
+            lines.append(f"vt {u:.6f} {0.1 + 0.8 * z:.6f}")
+    for j in range(n_height):
+        for i in range(n_around):
+            a = j * (n_around + 1) + i + 1
+            b, c, d = a + 1, a + n_around + 2, a + n_around + 1
+            faces.append(f"f {a}/{a} {b}/{b} {c}/{c}")
+            faces.append(f"f {a}/{a} {c}/{c} {d}/{d}")
+    return ("\n".join(lines + faces) + "\n").encode("utf-8")
+
+
+def make_texture(size: int, seed: int = 0) -> Image.Image:
+    """Blocky per-region colours + gradient + noise, so seams have real discontinuities."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32) / float(size)
+    cells = 5
+    palette = rng.uniform(20, 235, size=(cells, cells, 3)).astype(np.float32)
+    ci = np.minimum((yy * cells).astype(int), cells - 1)
+    cj = np.minimum((xx * cells).astype(int), cells - 1)
+    rgb = palette[ci, cj] + 30.0 * np.stack([xx, yy, xx * yy], axis=-1)
+    rgb += rng.normal(0.0, 6.0, size=rgb.shape)
+    alpha = np.full((size, size, 1), 255.0, dtype=np.float32)
+    arr = np.clip(np.concatenate([rgb, alpha], axis=-1), 0, 255).astype(np.uint8)
+    return Image.fromarray(arr, mode="RGBA")
+
+
+def make_mask(size: int) -> Image.Image:
+    """Seam mask covering the left half of the atlas."""
+    arr = np.zeros((size, size), dtype=np.uint8)
+    arr[:, : size // 2] = 255
+    return Image.fromarray(arr, mode="L")
+
+
+def make_edge_mask(size: int) -> Image.Image:
+    """One-texel seam mask line on the right image border (where the cylinder wrap ends)."""
+    arr = np.zeros((size, size), dtype=np.uint8)
+    arr[:, -1] = 255
+    return Image.fromarray(arr, mode="L")
+
+
+@dataclass
+class Case:
+    name: str
+    obj: bytes
+    texture: Image.Image
+    mask: Image.Image | None = None
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def default_cases(size: int = 192) -> list[Case]:
+    cube = make_cube_obj(4)
+    cyl = make_cylinder_obj()
+    tex = make_texture(size, seed=1)
+    base = dict(band_px=6, feather_px=4, sample_step_px=1.0, only_masked_seams=False)
+    return [
+        Case("cube_basecolor_average", cube, tex, params=dict(base)),
+        Case("cube_data_a_to_b", cube, tex, params=dict(base, texture_kind="data", mode="a_to_b")),
+        Case("cube_data_b_to_a", cube, tex, params=dict(base, texture_kind="data", mode="b_to_a", color_match="none")),
+        Case("cube_normal", cube, tex, params=dict(base, texture_kind="normal")),
+        Case("cube_meanvar_edge", cube, tex, params=dict(base, color_match="meanvar_edge")),
+        Case("cube_wacc_noguide", cube, tex, params=dict(base, alpha_method="wacc", alpha_edge_aware=False)),
+        Case("cube_poisson", cube, tex, params=dict(base, poisson_iters=20)),
+        Case("cube_masked", cube, tex, make_mask(size), params=dict(base, only_masked_seams=True)),
+        Case("cylinder_step2", cyl, tex, params=dict(base, band_px=8, sample_step_px=2.0, feather_px=6)),
+        Case("cylinder_no_feather", cyl, tex, params=dict(base, feather_px=0)),
+        # dilating a mask clipped by the image border (band_px is the dilation radius)
+        Case("cylinder_masked_edge", cyl, tex, make_edge_mask(size), params=dict(base, band_px=8, only_masked_seams=True)),
+    ]
+
+
+def check_dilate(trials: int = 8, seed: int = 0) -> int:
+    """Mismatches of _binary_dilate_fast vs _binary_dilate over random masks, radius 0..20."""
+    rng = np.random.default_rng(seed)
+    bad = 0
+    for radius in range(21):
+        for _ in range(trials):
+            h, w = rng.integers(1, 60, size=2)
+            mask = rng.random((h, w)) < rng.choice([0.005, 0.02, 0.1])
+            if not np.array_equal(_binary_dilate_fast(mask, radius), _binary_dilate(mask, radius)):
+                print(f"[FAIL] _binary_dilate_fast radius={radius} shape={mask.shape}")
+                bad += 1
+    return bad
+
+
+def compare_images(src: Image.Image, ref: Image.Image, cand: Image.Image) -> dict[str, float]:
+    """
+    Per-pixel error of cand vs ref (0..255 units, RGBA) and the changed-pixel footprint
+    (pixels that differ from src) of each output.
+    """
+    s = np.asarray(src.convert("RGBA"), dtype=np.int16)
+    r = np.asarray(ref, dtype=np.int16)
+    c = np.asarray(cand, dtype=np.int16)
+    if r.shape != c.shape:
+        raise ValueError(f"输出尺寸不一致：{r.shape} vs {c.shape}")
+    err = np.abs(r - c).max(axis=-1)
+    fp_ref = np.any(r != s, axis=-1)
+    fp_cand = np.any(c != s, axis=-1)
+    union = fp_ref | fp_cand
+    n_ref = int(fp_ref.sum())
+    return {
+        "max_err": float(err.max()),
+        "mean_err": float(err.mean()),
+        "mean_err_footprint": float(err[union].mean()) if np.any(union) else 0.0,
+        "footprint_ref": n_ref,
+        "footprint_cand": int(fp_cand.sum()),
+        "footprint_diff": float((fp_ref ^ fp_cand).sum()) / float(max(n_ref, 1)),
+    }
+
+
+def run_case(case: Case, candidate: dict[str, Any]) -> dict[str, float]:
+    def run(overrides: dict[str, Any]) -> tuple[Image.Image, float]:
+        t0 = time.perf_counter()
+        out = repair_texture_seams(
+            obj_file=io.BytesIO(case.obj),
+            texture_img=case.texture,
+            seam_mask_img=case.mask,
+            **{**case.params, **overrides},
+        )
+        return out, time.perf_counter() - t0
+
+    ref, t_ref = run({"engine": "reference"})
+    cand, t_cand = run(candidate)
+    res = compare_images(case.texture, ref, cand)
+    res["t_ref"] = t_ref
+    res["t_cand"] = t_cand
+    return res
+
+
+def _parse_value(s: str) -> Any:
+    low = s.lower()
+    if low in ("true", "false"):
+        return low == "true"
+    for cast in (int, float):
+        try:
+            return cast(s)
+        except ValueError:
+            pass
+    return s
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="对比 reference 引擎与候选配置的修缝输出（golden regression）")
+    ap.add_argument(
+        "--candidate",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="候选配置的 repair_texture_seams 参数（可重复），默认 engine=numpy",
+    )
+    ap.add_argument("--size", type=int, default=192, help="生成贴图边长（像素）")
+    ap.add_argument("--max-err", type=float, default=2.0, help="允许的单像素最大误差（0..255）")
+    ap.add_argument("--mean-err", type=float, default=0.05, help="允许的全图平均误差（0..255）")
+    ap.add_argument("--footprint-err", type=float, default=0.01, help="允许的改动区域差异比例")
+    ap.add_argument("--only", default="", help="只跑名字包含该子串的 case")
+    args = ap.parse_args(argv)
+
+    candidate: dict[str, Any] = {"engine": "numpy"}
+    for kv in args.candidate:
+        key, _, value = kv.partition("=")
+        candidate[key.strip()] = _parse_value(value.strip())
+
+    failed = check_dilate()
+    if not failed:
+        print("[ok] _binary_dilate_fast == _binary_dilate (radius 0..20)")
+    print(f"candidate: {candidate}")
+    for case in default_cases(args.size):
+        if args.only and args.only not in case.name:
+            continue
+        r = run_case(case, candidate)
+        ok = (
+            r["max_err"] <= args.max_err
+            and r["mean_err"] <= args.mean_err
+            and r["footprint_diff"] <= args.footprint_err
+        )
+        failed += 0 if ok else 1
+        print(
+            f"[{'ok' if ok else 'FAIL'}] {case.name:<24} max={r['max_err']:.0f} mean={r['mean_err']:.4f} "
+            f"mean@fp={r['mean_err_footprint']:.3f} fp={r['footprint_ref']}/{r['footprint_cand']} "
+            f"fpdiff={r['footprint_diff']:.4f} ref={r['t_ref']:.2f}s cand={r['t_cand']:.2f}s"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO
+
+
+_BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def hash_file(h: Any, file: BinaryIO | str | Path) -> None:
+    """Feed a path or a binary stream (read from the start, position restored) into h."""
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as f:
+            hash_file(h, f)
+        return
+    pos = file.tell()
+    file.seek(0)
+    while chunk := file.read(1 << 20):
+        h.update(chunk)
+    file.seek(pos)
+
+
+def _pipeline_sources(root: str = "seam_repair") -> list[str]:
+    """
+    Backend files reachable from root through imports, including imports inside
+    functions (seam_kernels is loaded lazily), so new pipeline modules are never missed.
+    """
+    seen: set[str] = set()
+    todo = [root]
+    while todo:
+        name = todo.pop()
+        path = _BACKEND_DIR / f"{name}.py"
+        if name in seen or not path.is_file():
+            continue
+        seen.add(name)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                todo.extend(a.name.split(".")[0] for a in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                todo.append(node.module.split(".")[0])
+    return sorted(f"{name}.py" for name in seen)
+
+
+def code_fingerprint() -> str:
+    """Hash of the repair code: results cached on disk are only valid for the same code."""
+    h = hashlib.sha256()
+    # seam_repair plus every backend module it imports (bitmask, seam_kernels, ...)
+    for name in _pipeline_sources():
+        hash_file(h, _BACKEND_DIR / name)
+    return h.hexdigest()
+
+
+def request_key(files: list[BinaryIO | str | Path | None], params: dict[str, Any], code: str) -> str:
+    """Content hash of one repair request (input files + parameters + code version)."""
+    h = hashlib.sha256()
+    h.update(code.encode("ascii"))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    for f in files:
+        h.update(b"\0")
+        if f is not None:
+            h.update(b"\1")
+            hash_file(h, f)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded cache of encoded results: an in-memory LRU, backed by an optional
+    directory (files named by key, oldest evicted first when over disk_bytes).
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str | Path | None = None, disk_bytes: int = 0) -> None:
+        self.max_bytes = int(max_bytes)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = int(disk_bytes)
+        self._mem: OrderedDict[str, bytes] = OrderedDict()
+        self._mem_size = 0
+        self._lock = threading.Lock()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / key[:2] / f"{key}.bin"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_size -= len(old)
+        self._mem[key] = data
+        self._mem_size += len(data)
+        while self._mem_size > self.max_bytes:
+            _k, v = self._mem.popitem(last=False)
+            self._mem_size -= len(v)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                return data
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        if self.disk_dir is None or len(data) > self.disk_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        assert self.disk_dir is not None
+        entries = []
+        total = 0
+        for p in self.disk_dir.glob("*/*.bin"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _mtime, size, p in entries:
+            if total <= self.disk_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
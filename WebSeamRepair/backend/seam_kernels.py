@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+from bitmask import PackedMask
+
+try:  # optional: kernel="numba" falls back to the NumPy path without it
+    import numba
+except ImportError:
+    numba = None
+
+
+# Inner splat loop of the numpy engine (bilinear gather on both seam sides, colour
+# match, 4-tap splat). "numpy" is the vectorized code in seam_repair itself.
+KERNELS = ("numpy", "numba")
+
+_MODES = {"average": 0, "a_to_b": 1, "b_to_a": 2}
+
+
+def numba_available() -> bool:
+    return numba is not None
+
+
+if numba is not None:
+    from numba.extending import overload
+
+    def _texel(work, lut, y, x, k):
+        pass
+
+    @overload(_texel)
+    def _texel_impl(work, lut, y, x, k):
+        # uint8 source texels go through the working-space LUT (as _WorkTexels does)
+        if isinstance(work.dtype, numba.types.Integer):
+            return lambda work, lut, y, x, k: lut[work[y, x, k]]
+        return lambda work, lut, y, x, k: work[y, x, k]
+
+    @numba.njit(cache=True)
+    def _gather(work, lut, x, y, k):
+        # _sample_bilinear_vec for one texel channel
+        h, w = work.shape[0], work.shape[1]
+        x = min(max(x, 0.0), float(w - 1))
+        y = min(max(y, 0.0), float(h - 1))
+        x0 = int(np.floor(x))
+        y0 = int(np.floor(y))
+        x1 = min(x0 + 1, w - 1)
+        y1 = min(y0 + 1, h - 1)
+        tx = x - x0
+        ty = y - y0
+        c0 = _texel(work, lut, y0, x0, k) * (1.0 - tx) + _texel(work, lut, y0, x1, k) * tx
+        c1 = _texel(work, lut, y1, x0, k) * (1.0 - tx) + _texel(work, lut, y1, x1, k) * tx
+        return np.float32(c0 * (1.0 - ty) + c1 * ty)
+
+    @numba.njit(cache=True)
+    def _taps(mask, h, w, x, y, wgt, c0, c1, c2, slot, n, out_idx, out_w, out_wcol):
+        # _splat_bilinear_vec for one sample: 4 taps into slots slot, slot + n, ...
+        # mask: PackedMask bits, (0, 0) = no mask
+        x = min(max(x, 0.0), float(w - 1))
+        y = min(max(y, 0.0), float(h - 1))
+        x0 = int(np.floor(x))
+        y0 = int(np.floor(y))
+        x1 = min(x0 + 1, w - 1)
+        y1 = min(y0 + 1, h - 1)
+        tx = x - x0
+        ty = y - y0
+        for t in range(4):
+            yy = y0 if t < 2 else y1
+            xx = x0 if t % 2 == 0 else x1
+            fx = (1.0 - tx) if t % 2 == 0 else tx
+            fy = (1.0 - ty) if t < 2 else ty
+            ws = fx * fy * wgt
+            j = slot + t * n
+            if ws > 0.0 and (mask.shape[0] == 0 or (mask[yy, xx >> 3] >> (7 - (xx & 7))) & 1):
+                w32 = np.float32(ws)
+                out_idx[j] = yy * w + xx
+                out_w[j] = w32
+                out_wcol[j, 0] = c0 * w32
+                out_wcol[j, 1] = c1 * w32
+                out_wcol[j, 2] = c2 * w32
+
+    @numba.njit(parallel=True, cache=True)
+    def _depth_taps(
+        work, lut, mask, sid, edge_a, edge_b, dir_a, dir_b, sx, sy, d, ww, seam_band,
+        mode, v_flip, mean_a, mean_b, mscale, out_idx, out_w, out_wcol,
+    ):
+        # Every sample owns its 8 slots (side, tap), so the parallel loop never writes
+        # shared memory; the slots are summed afterwards in the NumPy path's order.
+        h, w = work.shape[0], work.shape[1]
+        n = sid.size
+        df = np.float32(d)
+        for i in numba.prange(n):
+            for j in range(8):
+                out_w[j * n + i] = 0.0
+            s = sid[i]
+            wgt = ww
+            if seam_band.size:
+                if d >= seam_band[s]:
+                    continue
+                wgt = (seam_band[s] - d) / np.float64(seam_band[s])
+            xa = np.float64(edge_a[i, 0] + dir_a[i, 0] * df / sx) * float(w - 1)
+            va = np.float64(edge_a[i, 1] + dir_a[i, 1] * df / sy)
+            ya = ((1.0 - va) if v_flip else va) * float(h - 1)
+            xb = np.float64(edge_b[i, 0] + dir_b[i, 0] * df / sx) * float(w - 1)
+            vb = np.float64(edge_b[i, 1] + dir_b[i, 1] * df / sy)
+            yb = ((1.0 - vb) if v_flip else vb) * float(h - 1)
+            a_in = xa >= 0.0 and xa <= float(w - 1) and ya >= 0.0 and ya <= float(h - 1)
+            b_in = xb >= 0.0 and xb <= float(w - 1) and yb >= 0.0 and yb <= float(h - 1)
+            if not (a_in or b_in):
+                continue
+            a0, a1, a2 = _gather(work, lut, xa, ya, 0), _gather(work, lut, xa, ya, 1), _gather(work, lut, xa, ya, 2)
+            b0, b1, b2 = _gather(work, lut, xb, yb, 0), _gather(work, lut, xb, yb, 1), _gather(work, lut, xb, yb, 2)
+            if mscale.size:
+                b0 = (b0 - mean_b[s, 0]) * mscale[s, 0] + mean_a[s, 0]
+                b1 = (b1 - mean_b[s, 1]) * mscale[s, 1] + mean_a[s, 1]
+                b2 = (b2 - mean_b[s, 2]) * mscale[s, 2] + mean_a[s, 2]
+            if mode == 0:
+                half = np.float32(0.5)
+                c0, c1, c2 = (a0 + b0) * half, (a1 + b1) * half, (a2 + b2) * half
+                if a_in:
+                    _taps(mask, h, w, xa, ya, wgt, c0, c1, c2, i, n, out_idx, out_w, out_wcol)
+                if b_in:
+                    _taps(mask, h, w, xb, yb, wgt, c0, c1, c2, 4 * n + i, n, out_idx, out_w, out_wcol)
+            elif mode == 1:
+                if b_in:
+                    _taps(mask, h, w, xb, yb, wgt, a0, a1, a2, 4 * n + i, n, out_idx, out_w, out_wcol)
+            elif a_in:
+                _taps(mask, h, w, xa, ya, wgt, b0, b1, b2, i, n, out_idx, out_w, out_wcol)
+
+    @numba.njit(cache=True)
+    def _scatter(acc, wacc, w, oy, ox, out_idx, out_w, out_wcol):
+        # acc / wacc cover the texels from (oy, ox) on; taps outside them are dropped
+        wh, ww = wacc.shape
+        for j in range(out_idx.size):
+            if out_w[j] > 0.0:
+                y = out_idx[j] // w - oy
+                x = out_idx[j] % w - ox
+                if y < 0 or y >= wh or x < 0 or x >= ww:
+                    continue
+                wacc[y, x] += out_w[j]
+                for k in range(3):
+                    acc[y, x, k] += out_wcol[j, k]
+
+
+def _numba_splat(
+    work: np.ndarray,
+    acc: np.ndarray,
+    wacc: np.ndarray,
+    mask: PackedMask | None,
+    samples: tuple[np.ndarray, ...],
+    scale_px: np.ndarray,
+    *,
+    band_px: int,
+    seam_band: np.ndarray | None,
+    mode: str,
+    v_flip: bool,
+    match: tuple[np.ndarray, np.ndarray, np.ndarray] | None,
+    lut: np.ndarray | None = None,
+    origin: tuple[int, int] = (0, 0),
+) -> None:
+    """
+    work is the HxWx3 float32 working image, or uint8 HxWxC texels converted through
+    lut. acc / wacc may be a window of the image starting at texel origin = (y, x).
+    """
+    sid, edge_a, edge_b, da, db = samples
+    n = sid.size
+    if n == 0:
+        return
+    out_idx = np.zeros(8 * n, dtype=np.int64)
+    out_w = np.zeros(8 * n, dtype=np.float32)
+    out_wcol = np.zeros((8 * n, 3), dtype=np.float32)
+    none_f = np.zeros((0, 3), dtype=np.float32)
+    mean_a, mean_b, mscale = match if match is not None else (none_f, none_f, none_f)
+    band = seam_band if seam_band is not None else np.zeros(0, dtype=np.int64)
+    m = mask.bits if mask is not None else np.zeros((0, 0), dtype=np.uint8)
+    table = lut if lut is not None else np.zeros(0, dtype=np.float32)
+    depth = band_px if seam_band is None else int(seam_band[sid].max())
+    for d in range(depth):
+        _depth_taps(
+            work, table, m, sid, edge_a, edge_b, da, db, np.float32(scale_px[0]), np.float32(scale_px[1]), d,
+            (band_px - d) / float(band_px), band, _MODES[mode], v_flip, mean_a, mean_b, mscale,
+            out_idx, out_w, out_wcol,
+        )
+        _scatter(acc, wacc, work.shape[1], origin[0], origin[1], out_idx, out_w, out_wcol)
+
+
+def splat_kernel(kernel: str) -> Callable[..., None] | None:
+    """
+    Splat loop for one batch of edge samples written straight into acc / wacc arrays
+    (full-size or a window), or None for the NumPy path ("numpy", or "numba" without Numba).
+    """
+    if kernel not in KERNELS:
+        raise ValueError("kernel 必须是 " + " | ".join(KERNELS))
+    if kernel == "numba" and numba is not None:
+        return _numba_splat
+    return None
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import struct
+import warnings
+import zlib
 from dataclasses import dataclass
-from typing import BinaryIO
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Mapping, Sequence
 
 import numpy as np
 from PIL import Image
 
+from bitmask import PackedMask
+from mesh_io import MESH_FORMATS, MeshData, load_binary_mesh, load_obj, sniff_mesh_format
+from texture_io import open_output_memmap, open_texture_memmap, rgba_array
+
 
 @dataclass(frozen=True)
 class Tri:
@@ -27,6 +35,34 @@ class SeamPair:
     b: SeamSide
 
 
+@dataclass(frozen=True)
+class _SeamTable:
+    """Struct-of-arrays view of list[SeamPair]; every field is Sx2 float32."""
+
+    a0: np.ndarray
+    a1: np.ndarray
+    a2: np.ndarray
+    b0: np.ndarray
+    b1: np.ndarray
+    b2: np.ndarray
+
+    @property
+    def count(self) -> int:
+        return int(self.a0.shape[0])
+
+    def take(self, idx: np.ndarray) -> _SeamTable:
+        return _SeamTable(*(f[idx] for f in (self.a0, self.a1, self.a2, self.b0, self.b1, self.b2)))
+
+    def pairs(self) -> list[SeamPair]:
+        return [
+            SeamPair(
+                a=SeamSide(uv0=self.a0[i], uv1=self.a1[i], uv2=self.a2[i]),
+                b=SeamSide(uv0=self.b0[i], uv1=self.b1[i], uv2=self.b2[i]),
+            )
+            for i in range(self.count)
+        ]
+
+
 def _srgb_to_linear(x: np.ndarray) -> np.ndarray:
     x = np.clip(x, 0.0, 1.0).astype(np.float32)
     a = 0.055
@@ -53,6 +89,43 @@ def _normal_vec_to_rgb(v: np.ndarray) -> np.ndarray:
     return np.clip(v * 0.5 + 0.5, 0.0, 1.0).astype(np.float32)
 
 
+class _WorkTexels:
+    """
+    Lazy working-space view of a uint8 HxWxC texture (C >= 3, e.g. a np.memmap):
+    texels are converted (sRGB->linear / data / normal vector) only where indexed.
+    """
+
+    def __init__(self, src: np.ndarray, texture_kind: str) -> None:
+        self.src = src
+        self.shape = (int(src.shape[0]), int(src.shape[1]), 3)
+        levels = np.arange(256, dtype=np.float32) / 255.0
+        if texture_kind == "basecolor":
+            self._lut: np.ndarray | None = _srgb_to_linear(levels)
+        elif texture_kind == "data":
+            self._lut = levels
+        elif texture_kind == "normal":
+            self._lut = None
+        else:
+            raise ValueError("texture_kind 必须是 basecolor | data | normal")
+
+    def __getitem__(self, key) -> np.ndarray:
+        rgb = np.asarray(self.src[key])[..., :3]
+        if self._lut is not None:
+            return self._lut[rgb]
+        return _normal_rgb_to_vec(rgb.astype(np.float32) / 255.0)
+
+
+def _work_to_u8(work: np.ndarray, texture_kind: str) -> np.ndarray:
+    """Working-space RGB -> uint8 RGB of the texture's own encoding."""
+    if texture_kind == "basecolor":
+        out = _linear_to_srgb(work)
+    elif texture_kind == "data":
+        out = work
+    else:  # normal
+        out = _normal_vec_to_rgb(work)
+    return np.clip(out * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+
 class _RunningStatsVec3:
     def __init__(self) -> None:
         self.n = 0
@@ -97,63 +170,6 @@ def _canonicalize_positions(verts: list[np.ndarray], eps: float = 1e-5) -> list[
     return canon
 
 
-def _parse_obj(file: BinaryIO) -> tuple[list[np.ndarray], list[np.ndarray], list[Tri]]:
-    """
-    Minimal OBJ parser.
-    Supports: v, vt, f (tri or polygon; polygon is fan-triangulated).
-    Face elements can be: v, v/vt, v//vn, v/vt/vn.
-    """
-    verts: list[np.ndarray] = []
-    uvs: list[np.ndarray] = []
-    tris: list[Tri] = []
-
-    def parse_face_token(tok: str) -> tuple[int, int]:
-        parts = tok.split("/")
-        v_i = int(parts[0])
-        vt_i = int(parts[1]) if len(parts) >= 2 and parts[1] != "" else 0
-
-        # OBJ is 1-based, negative means relative to end
-        if v_i < 0:
-            v_i = len(verts) + 1 + v_i
-        if vt_i < 0:
-            vt_i = len(uvs) + 1 + vt_i
-
-        v_idx0 = v_i - 1
-        vt_idx0 = vt_i - 1 if vt_i != 0 else -1
-        return v_idx0, vt_idx0
-
-    for raw in file.read().decode("utf-8", errors="ignore").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("v "):
-            _, x, y, z, *rest = line.split()
-            verts.append(np.array([float(x), float(y), float(z)], dtype=np.float32))
-        elif line.startswith("vt "):
-            parts = line.split()
-            # vt u v [w]
-            u = float(parts[1])
-            v = float(parts[2]) if len(parts) > 2 else 0.0
-            uvs.append(np.array([u, v], dtype=np.float32))
-        elif line.startswith("f "):
-            tokens = line.split()[1:]
-            if len(tokens) < 3:
-                continue
-            vv: list[tuple[int, int]] = [parse_face_token(t) for t in tokens]
-            # fan triangulation: (0,i,i+1)
-            for i in range(1, len(vv) - 1):
-                v0, vt0 = vv[0]
-                v1, vt1 = vv[i]
-                v2, vt2 = vv[i + 1]
-                tris.append(Tri(v=(v0, v1, v2), vt=(vt0, vt1, vt2)))
-
-    if not uvs:
-        raise ValueError("OBJ 缺少 vt（UV）数据，无法进行 seam-aware 修复。")
-    if not tris:
-        raise ValueError("OBJ 未解析到任何面（f）。")
-    return verts, uvs, tris
-
-
 def _uv_equal(a: np.ndarray, b: np.ndarray, eps: float = 1e-6) -> bool:
     return float(np.max(np.abs(a - b))) <= eps
 
@@ -243,10 +259,514 @@ def _build_seam_pairs(verts: list[np.ndarray], uvs: list[np.ndarray], tris: list
     return seam_pairs
 
 
-def _mask_from_image(mask_img: Image.Image, w: int, h: int, threshold: int = 16) -> np.ndarray:
-    m = mask_img.convert("L").resize((w, h), Image.NEAREST)
-    arr = np.asarray(m, dtype=np.uint8)
-    return arr >= np.uint8(threshold)
+def _mesh_to_lists(mesh: MeshData) -> tuple[list[np.ndarray], list[np.ndarray], list[Tri]]:
+    """MeshData -> the list form used by the reference seam builder."""
+    verts = list(np.asarray(mesh.positions, dtype=np.float32))
+    uvs = list(np.asarray(mesh.uvs, dtype=np.float32))
+    tris = [Tri(v=tuple(v), vt=tuple(vt)) for v, vt in zip(mesh.tri_v.tolist(), mesh.tri_vt.tolist())]
+    return verts, uvs, tris
+
+
+def load_mesh(file: BinaryIO, mesh_format: str = "auto", *, workers: int = 1) -> MeshData:
+    """
+    Load a mesh for seam detection: obj | ply | glb | npz ("auto" sniffs magic bytes).
+    Binary formats are read into arrays directly; text OBJs are parsed in chunks by
+    `workers` processes (default 1 = in-process, see mesh_io.load_obj).
+    """
+    fmt = sniff_mesh_format(file) if mesh_format == "auto" else mesh_format
+    if fmt == "obj":
+        return load_obj(file, workers=workers)
+    if fmt not in MESH_FORMATS:
+        raise ValueError("mesh_format 必须是 " + " | ".join(MESH_FORMATS))
+    return load_binary_mesh(file, fmt)
+
+
+def _canonicalize_positions_vec(positions: np.ndarray, eps: float = 1e-5) -> np.ndarray:
+    """Vectorized _canonicalize_positions (same ids: numbered by first appearance)."""
+    scale = 1.0 / float(eps)
+    keys = np.rint(np.asarray(positions, dtype=np.float32).astype(np.float64) * scale).astype(np.int64)
+    _, first, inv = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    rank = np.empty_like(first)
+    rank[np.argsort(first)] = np.arange(first.size)
+    return rank[inv.reshape(-1)]
+
+
+def _build_seam_table(mesh: MeshData) -> _SeamTable:
+    """
+    Vectorized _build_seam_pairs: same seams, same endpoint orientation and same order
+    (edges by first occurrence), without per-triangle Python work.
+    """
+    return _seam_edges(mesh)[0]
+
+
+def _seam_edges(mesh: MeshData) -> tuple[_SeamTable, np.ndarray, np.ndarray]:
+    """
+    _build_seam_table plus triangle ids: (table, seam_tris (S x 2, triangle of side A / B
+    of every row), joined (E x 2, triangle pairs across shared edges with continuous UVs)).
+    """
+    tri_v = np.asarray(mesh.tri_v, dtype=np.int64)
+    tri_vt = np.asarray(mesh.tri_vt, dtype=np.int64)
+    uvs = np.asarray(mesh.uvs, dtype=np.float32)
+    canon = _canonicalize_positions_vec(mesh.positions)
+    cv = canon[tri_v]  # (T, 3)
+
+    # local edges (i0, i1, i2) in the same order as the reference: occurrence = ti * 3 + k
+    loc = np.array([(0, 1, 2), (1, 2, 0), (2, 0, 1)], dtype=np.int64)
+    e0 = cv[:, loc[:, 0]].reshape(-1)
+    e1 = cv[:, loc[:, 1]].reshape(-1)
+    n_canon = int(canon.max()) + 1 if canon.size else 1
+    key = np.minimum(e0, e1) * n_canon + np.maximum(e0, e1)
+
+    _, first, inv, counts = np.unique(key, return_index=True, return_inverse=True, return_counts=True)
+    grouped = np.argsort(inv.reshape(-1), kind="stable")
+    starts = np.cumsum(counts) - counts
+    two = counts == 2  # boundary or non-manifold edges are skipped
+    occ0 = grouped[starts[two]]
+    occ1 = grouped[starts[two] + 1]
+    order = np.argsort(first[two], kind="stable")
+    occ0, occ1 = occ0[order], occ1[order]
+
+    def side(occ: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        ti = occ // 3
+        lk = loc[occ % 3]
+        vt = tri_vt[ti[:, None], lk]
+        if np.any(vt < 0):
+            raise ValueError("OBJ 面缺少 vt 索引，无法 seam-aware 修复。")
+        # reorder to canonical endpoint order (smaller canonical id first)
+        swap = cv[ti, lk[:, 0]] > cv[ti, lk[:, 1]]
+        uv0 = uvs[vt[:, 0]]
+        uv1 = uvs[vt[:, 1]]
+        u0 = np.where(swap[:, None], uv1, uv0)
+        u1 = np.where(swap[:, None], uv0, uv1)
+        return u0, u1, uvs[vt[:, 2]]
+
+    a0, a1, a2 = side(occ0)
+    b0, b1, b2 = side(occ1)
+    same = (np.max(np.abs(a0 - b0), axis=1) <= 1e-6) & (np.max(np.abs(a1 - b1), axis=1) <= 1e-6)
+    keep = ~same
+    tris = np.stack([occ0 // 3, occ1 // 3], axis=1)
+    return _SeamTable(a0[keep], a1[keep], a2[keep], b0[keep], b1[keep], b2[keep]), tris[keep], tris[same]
+
+
+@dataclass(frozen=True)
+class UVCharts:
+    """UV islands: connected components of triangles joined by UV-continuous shared edges."""
+
+    tri_chart: np.ndarray  # (T,) chart id of every triangle
+    seam_chart: np.ndarray  # (S, 2) chart of side A / side B of every seam table row
+
+    @property
+    def count(self) -> int:
+        return int(self.tri_chart.max()) + 1 if self.tri_chart.size else 0
+
+
+def _connected_components(n: int, edges: np.ndarray) -> np.ndarray:
+    """Component labels (0..C-1, by smallest member) of n nodes joined by E x 2 edges."""
+    parent = np.arange(n, dtype=np.int64)
+    u, v = edges[:, 0], edges[:, 1]
+    while True:
+        # hook every root onto the smallest root it touches, then flatten the trees
+        pu, pv = parent[u], parent[v]
+        diff = pu != pv
+        if not np.any(diff):
+            break
+        np.minimum.at(parent, np.maximum(pu, pv)[diff], np.minimum(pu, pv)[diff])
+        while True:
+            pp = parent[parent]
+            if np.array_equal(pp, parent):
+                break
+            parent = pp
+    return np.unique(parent, return_inverse=True)[1].reshape(-1)
+
+
+def _build_uv_charts(mesh: MeshData) -> UVCharts:
+    _table, seam_tris, joined = _seam_edges(mesh)
+    labels = _connected_components(len(mesh.tri_v), joined)
+    return UVCharts(labels, labels[seam_tris])
+
+
+@dataclass(frozen=True)
+class TexelMap:
+    """
+    UV layout rasterized at one texture resolution: the triangle under every texel
+    centre, so per-texel questions become array lookups instead of geometry tests.
+    """
+
+    tri: np.ndarray  # (H, W) int32 triangle index, -1 where no triangle covers the texel
+    bary: np.ndarray  # (H, W, 2) float32 barycentric weights of the triangle's 2nd / 3rd corner
+    v_flip: bool
+
+    @property
+    def covered(self) -> np.ndarray:
+        return self.tri >= 0
+
+    def chart_map(self, charts: UVCharts) -> np.ndarray:
+        """(H, W) int32 chart id of every texel, -1 outside the UV islands."""
+        out = np.full(self.tri.shape, -1, dtype=np.int32)
+        cov = self.tri >= 0
+        out[cov] = charts.tri_chart[self.tri[cov]]
+        return out
+
+
+def rasterize_uvs(mesh: MeshData, w: int, h: int, *, v_flip: bool = True) -> TexelMap:
+    """
+    Texel -> triangle map of the mesh's UVs for a W x H texture (texel centres at the
+    same pixel positions the seam sampling uses). Where UV triangles overlap
+    (stacked / mirrored islands), the later triangle wins.
+    """
+    w, h = int(w), int(h)
+    tri_map = np.full((h, w), -1, dtype=np.int32)
+    bary = np.zeros((h, w, 2), dtype=np.float32)
+    tri_vt = np.asarray(mesh.tri_vt, dtype=np.int64)
+    tids = np.nonzero(np.all(tri_vt >= 0, axis=1))[0]
+    if tids.size == 0 or w < 1 or h < 1:
+        return TexelMap(tri_map, bary, v_flip)
+    uv = np.asarray(mesh.uvs, dtype=np.float32)[tri_vt[tids]].reshape(-1, 2)
+    x, y = _uv_to_xy_vec(uv, w, h, v_flip=v_flip)
+    x, y = x.reshape(-1, 3), y.reshape(-1, 3)
+    ex1, ey1 = x[:, 1] - x[:, 0], y[:, 1] - y[:, 0]
+    ex2, ey2 = x[:, 2] - x[:, 0], y[:, 2] - y[:, 0]
+    det = ex1 * ey2 - ex2 * ey1
+    x0 = np.maximum(np.ceil(x.min(axis=1)), 0).astype(np.int64)
+    x1 = np.minimum(np.floor(x.max(axis=1)), w - 1).astype(np.int64) + 1
+    y0 = np.maximum(np.ceil(y.min(axis=1)), 0).astype(np.int64)
+    y1 = np.minimum(np.floor(y.max(axis=1)), h - 1).astype(np.int64) + 1
+    ok = (np.abs(det) > 1e-12) & (x1 > x0) & (y1 > y0)
+    sel = np.nonzero(ok)[0]
+    if sel.size == 0:
+        return TexelMap(tri_map, bary, v_flip)
+
+    # bboxes are cut into row slabs of at most ~_SAMPLE_BATCH texels, so one huge
+    # triangle does not blow up a batch; slabs keep the triangle order
+    bw = x1[sel] - x0[sel]
+    rows = np.maximum(1, _SAMPLE_BATCH // bw)
+    n = -(-(y1[sel] - y0[sel]) // rows)
+    pt = np.repeat(sel, n)
+    k = np.arange(pt.size) - np.repeat(np.cumsum(n) - n, n)
+    py0 = y0[pt] + k * np.repeat(rows, n)
+    py1 = np.minimum(py0 + np.repeat(rows, n), y1[pt])
+    pw = np.repeat(bw, n)
+    counts = pw * (py1 - py0)
+
+    ends = np.cumsum(counts)
+    i0 = 0
+    while i0 < pt.size:
+        base = int(ends[i0 - 1]) if i0 > 0 else 0
+        i1 = max(int(np.searchsorted(ends, base + _SAMPLE_BATCH, side="right")), i0 + 1)
+        c = counts[i0:i1]
+        pid = np.repeat(np.arange(i0, i1), c)
+        local = np.arange(pid.size) - np.repeat(np.cumsum(c) - c, c)
+        ys = py0[pid] + local // pw[pid]
+        xs = x0[pt[pid]] + local % pw[pid]
+        t = pt[pid]
+        rx = xs - x[t, 0]
+        ry = ys - y[t, 0]
+        b1 = (rx * ey2[t] - ex2[t] * ry) / det[t]
+        b2 = (ex1[t] * ry - rx * ey1[t]) / det[t]
+        inside = (b1 >= -1e-9) & (b2 >= -1e-9) & (b1 + b2 <= 1.0 + 1e-9)
+        ys, xs = ys[inside], xs[inside]
+        tri_map[ys, xs] = tids[t[inside]]
+        bary[ys, xs, 0] = b1[inside]
+        bary[ys, xs, 1] = b2[inside]
+        i0 = i1
+    return TexelMap(tri_map, bary, v_flip)
+
+
+@dataclass(frozen=True)
+class _SeamChains:
+    """
+    Seams of a _SeamTable linked into polylines. Chain c is seam[starts[c]:starts[c+1]]
+    in walking order; flip marks seams walked from end 1 to end 0, swap marks seams
+    whose A/B sides are exchanged so that chain side 0 stays in one UV chart.
+    """
+
+    seam: np.ndarray  # (S,) table indices
+    flip: np.ndarray  # (S,) bool
+    swap: np.ndarray  # (S,) bool
+    starts: np.ndarray  # (C + 1,) offsets into seam
+    closed: np.ndarray  # (C,) bool, last seam links back to the first
+
+    @property
+    def count(self) -> int:
+        return int(self.starts.size - 1)
+
+    def restrict(self, sel: np.ndarray) -> _SeamChains:
+        """Chains over table.take(sel); dropped seams split their chains (and open loops)."""
+        pos = np.full(self.seam.size, -1, dtype=np.int64)
+        pos[sel] = np.arange(sel.size)
+        new = pos[self.seam]
+        kept = new >= 0
+        chain = np.repeat(np.arange(self.count), np.diff(self.starts))
+        first = np.zeros(self.seam.size, dtype=bool)
+        first[self.starts[:-1]] = True
+        whole = np.add.reduceat(kept, self.starts[:-1]) == np.diff(self.starts) if self.count else np.zeros(0, bool)
+        head = kept & (first | ~np.roll(kept, 1))
+        head_at = np.nonzero(head[kept])[0]
+        return _SeamChains(
+            new[kept],
+            self.flip[kept],
+            self.swap[kept],
+            np.append(head_at, np.count_nonzero(kept)).astype(np.int64),
+            (self.closed & whole)[chain[head]],
+        )
+
+
+def _build_seam_chains(table: _SeamTable, eps: float = 1e-6) -> _SeamChains:
+    """
+    Link seams into chains: two seam ends are joined where both the A and the B UVs
+    coincide (the seam continues in the same two charts) and no other seam ends there.
+    """
+    s = table.count
+    if s == 0:
+        z = np.zeros(0, dtype=np.int64)
+        return _SeamChains(z, z.astype(bool), z.astype(bool), np.zeros(1, np.int64), z.astype(bool))
+    scale = 1.0 / float(eps)
+    # one row per seam end (2 * seam + end): quantized UV on side A, then side B
+    qa = np.rint(np.stack([table.a0, table.a1], axis=1).reshape(-1, 2).astype(np.float64) * scale).astype(np.int64)
+    qb = np.rint(np.stack([table.b0, table.b1], axis=1).reshape(-1, 2).astype(np.float64) * scale).astype(np.int64)
+    a_first = (qa[:, 0] < qb[:, 0]) | ((qa[:, 0] == qb[:, 0]) & (qa[:, 1] <= qb[:, 1]))
+    key = np.where(a_first[:, None], np.concatenate([qa, qb], 1), np.concatenate([qb, qa], 1))
+    # group equal keys (lexsort: much faster than np.unique over rows)
+    order = np.lexsort(key.T[::-1])
+    sk = key[order]
+    group = np.concatenate([[0], np.cumsum(np.any(sk[1:] != sk[:-1], axis=1))])
+    counts = np.bincount(group)
+
+    partner = np.full(2 * s, -1, dtype=np.int64)
+    pairs = order[counts[group] == 2].reshape(-1, 2)
+    pairs = pairs[(pairs[:, 0] >> 1) != (pairs[:, 1] >> 1)]  # zero-length seams link to nothing
+    partner[pairs[:, 0]] = pairs[:, 1]
+    partner[pairs[:, 1]] = pairs[:, 0]
+
+    # seams linked at neither end are chains of their own; only the rest is walked
+    alone = np.nonzero((partner[0::2] < 0) & (partner[1::2] < 0))[0]
+    link = partner.tolist()
+    a_first_l = a_first.tolist()
+    seen = bytearray(s)
+    for e in alone.tolist():
+        seen[e] = 1
+    seam: list[int] = []
+    flip: list[bool] = []
+    swap: list[bool] = []
+    starts = [0]
+    closed: list[bool] = []
+
+    def walk(e: int, end_in: int) -> bool:
+        sw = False
+        while True:
+            seen[e] = 1
+            seam.append(e)
+            flip.append(end_in == 1)
+            swap.append(sw)
+            x = 2 * e + 1 - end_in
+            y = link[x]
+            # keep chain side 0 on the side whose UVs match across the shared end
+            nsw = (a_first_l[y] != a_first_l[x]) != sw if y >= 0 else False
+            if y < 0 or seen[y >> 1]:
+                return y >= 0 and not nsw
+            e, end_in, sw = y >> 1, y & 1, nsw
+
+    for x in np.nonzero(partner < 0)[0].tolist():
+        if not seen[x >> 1]:
+            walk(x >> 1, x & 1)
+            starts.append(len(seam))
+            closed.append(False)
+    for e in range(s):
+        if not seen[e]:
+            # what is left are loops
+            closed.append(walk(e, 0))
+            starts.append(len(seam))
+    k = alone.size
+    return _SeamChains(
+        np.concatenate([alone, np.asarray(seam, dtype=np.int64)]),
+        np.concatenate([np.zeros(k, bool), np.asarray(flip, dtype=bool)]),
+        np.concatenate([np.zeros(k, bool), np.asarray(swap, dtype=bool)]),
+        np.concatenate([np.arange(k, dtype=np.int64), k + np.asarray(starts, dtype=np.int64)]),
+        np.concatenate([np.zeros(k, bool), np.asarray(closed, dtype=bool)]),
+    )
+
+
+class MeshSeams:
+    """
+    Seam topology of one mesh, built once and reused for every texture of that mesh
+    (pass as seams=... to repair_texture_seams / repair_texture_file).
+    """
+
+    def __init__(self, mesh: MeshData) -> None:
+        self.mesh = mesh
+        self._table: _SeamTable | None = None
+        self._index: SeamIndex | None = None
+        self._chains: _SeamChains | None = None
+        self._charts: UVCharts | None = None
+        self._texel_map: TexelMap | None = None
+        self._pairs: list[SeamPair] | None = None
+
+    @property
+    def table(self) -> _SeamTable:
+        if self._table is None:
+            self._table = _build_seam_table(self.mesh)
+        return self._table
+
+    @property
+    def index(self) -> SeamIndex:
+        """Spatial index over the seam table (built on first use)."""
+        if self._index is None:
+            self._index = SeamIndex(self.table)
+        return self._index
+
+    @property
+    def charts(self) -> UVCharts:
+        """UV islands of the mesh, with the chart on each side of every seam (built on first use)."""
+        if self._charts is None:
+            self._charts = _build_uv_charts(self.mesh)
+        return self._charts
+
+    def texel_map(self, w: int, h: int, *, v_flip: bool = True) -> TexelMap:
+        """
+        rasterize_uvs at W x H, kept for the next call: the textures of one mesh
+        usually share a resolution (only the last size is cached).
+        """
+        tm = self._texel_map
+        if tm is None or tm.tri.shape != (int(h), int(w)) or tm.v_flip != v_flip:
+            tm = self._texel_map = rasterize_uvs(self.mesh, w, h, v_flip=v_flip)
+        return tm
+
+    @property
+    def chains(self) -> _SeamChains:
+        """Seam table linked into polylines (built on first use)."""
+        if self._chains is None:
+            self._chains = _build_seam_chains(self.table)
+        return self._chains
+
+    def pairs(self) -> list[SeamPair]:
+        """Seams as built by the reference engine."""
+        if self._pairs is None:
+            self._pairs = _build_seam_pairs(*_mesh_to_lists(self.mesh))
+        return self._pairs
+
+
+class SeamIndex:
+    """
+    Uniform grid over UV space holding the edge segments of both sides of every seam,
+    so "which seams touch this UV rectangle / mask" is answered from a few grid cells
+    instead of a scan over all seams. Queries are conservative: they may return seams
+    slightly outside the query, never miss one inside it.
+    """
+
+    def __init__(self, table: _SeamTable, cells: int | None = None) -> None:
+        s = table.count
+        p0 = np.concatenate([table.a0, table.b0]).astype(np.float64)
+        p1 = np.concatenate([table.a1, table.b1]).astype(np.float64)
+        self.count = s
+        self.lo = np.minimum(p0, p1)  # (2S, 2) segment bboxes; segment k belongs to seam k % S
+        self.hi = np.maximum(p0, p1)
+        if s:
+            self.origin = self.lo.min(axis=0)
+            extent = self.hi.max(axis=0) - self.origin
+        else:
+            self.origin = np.zeros(2)
+            extent = np.ones(2)
+        # ~4 segments per cell on average
+        self.n = int(cells) if cells else int(np.clip(np.ceil(np.sqrt(2 * s / 4.0)), 1, 512))
+        self.cell = np.maximum(extent, 1e-9) / self.n
+
+        c0, c1 = self._cell(self.lo), self._cell(self.hi)
+        nx = c1[:, 0] - c0[:, 0] + 1
+        ny = c1[:, 1] - c0[:, 1] + 1
+        cnt = nx * ny
+        seg = np.repeat(np.arange(2 * s), cnt)
+        k = np.arange(seg.size) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        cell_id = (c0[seg, 1] + k // nx[seg]) * self.n + (c0[seg, 0] + k % nx[seg])
+        order = np.argsort(cell_id, kind="stable")
+        self._items = seg[order].astype(np.int32)
+        self._start = np.searchsorted(cell_id[order], np.arange(self.n * self.n + 1))
+
+    def _cell(self, uv: np.ndarray) -> np.ndarray:
+        c = np.floor((uv - self.origin) / self.cell)
+        return np.clip(c, 0, self.n - 1).astype(np.int64)
+
+    def _segments_in_cells(self, cells: np.ndarray) -> np.ndarray:
+        """Segment ids registered in the given flat cell ids (may repeat)."""
+        lo, hi = self._start[cells], self._start[cells + 1]
+        cnt = hi - lo
+        k = np.arange(int(cnt.sum())) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        return self._items[np.repeat(lo, cnt) + k]
+
+    def query_uv(self, u0: float, v0: float, u1: float, v1: float, pad: float = 0.0) -> np.ndarray:
+        """Sorted ids of seams with a side whose edge bbox meets [u0, u1] x [v0, v1] (+ pad)."""
+        lo = np.array([min(u0, u1) - pad, min(v0, v1) - pad])
+        hi = np.array([max(u0, u1) + pad, max(v0, v1) + pad])
+        if self.count == 0 or np.any(hi < self.origin) or np.any(lo > self.origin + self.cell * self.n):
+            return np.zeros(0, dtype=np.intp)
+        (cx0, cy0), (cx1, cy1) = self._cell(lo), self._cell(hi)
+        cy, cx = np.mgrid[cy0 : cy1 + 1, cx0 : cx1 + 1]
+        seg = np.unique(self._segments_in_cells((cy * self.n + cx).ravel()))
+        meets = np.all(self.lo[seg] <= hi, axis=1) & np.all(self.hi[seg] >= lo, axis=1)
+        return np.unique(seg[meets] % self.count)
+
+    def query_pixels(self, y0: int, y1: int, x0: int, x1: int, w: int, h: int, *, v_flip: bool, pad_px: float = 0.0) -> np.ndarray:
+        """query_uv for the texel rectangle [y0, y1) x [x0, x1) of a W x H texture."""
+        sx, sy = 1.0 / max(w - 1, 1), 1.0 / max(h - 1, 1)
+        u0, u1 = (x0 - 0.5 - pad_px) * sx, (x1 - 0.5 + pad_px) * sx
+        ya, yb = (y0 - 0.5 - pad_px) * sy, (y1 - 0.5 + pad_px) * sy
+        v0, v1 = (1.0 - yb, 1.0 - ya) if v_flip else (ya, yb)
+        return self.query_uv(u0, v0, u1, v1)
+
+    def query_mask(self, mask: PackedMask, *, v_flip: bool) -> np.ndarray:
+        """
+        Sorted ids of seams with a side passing within ~1 texel of a set mask texel
+        (HxW mask covering UV [0, 1]^2).
+        """
+        h, w = mask.shape
+        if self.count == 0 or w <= 1 or h <= 1:
+            return np.zeros(0, dtype=np.intp)
+        n = self.n
+        # grid cell of every texel column / row (texel centres); -1 = far outside the grid
+        cx = (np.arange(w) / (w - 1) - self.origin[0]) / self.cell[0]
+        v = np.arange(h) / (h - 1)
+        cy = ((1.0 - v if v_flip else v) - self.origin[1]) / self.cell[1]
+        cx = np.where((cx >= -1.0) & (cx < n + 1.0), np.clip(np.floor(cx), 0, n - 1), -1).astype(np.int64)
+        cy = np.where((cy >= -1.0) & (cy < n + 1.0), np.clip(np.floor(cy), 0, n - 1), -1).astype(np.int64)
+
+        occupied = np.zeros((n, n), dtype=bool)
+        rows = np.flatnonzero(mask.row_any() & (cy >= 0))
+        if rows.size == 0:
+            return np.zeros(0, dtype=np.intp)
+        # any() per (cell row, cell column) via reduceat over runs of equal cell index:
+        # rows are OR-ed while packed, so at most n unpacked rows exist at once
+        rows = rows[np.argsort(cy[rows], kind="stable")]
+        r_start = np.flatnonzero(np.diff(cy[rows], prepend=-2))
+        packed = np.bitwise_or.reduceat(mask.bits[rows], r_start, axis=0)
+        band = np.unpackbits(packed, axis=1, count=w).astype(bool)
+        cols = np.flatnonzero(band.any(axis=0) & (cx >= 0))
+        if cols.size == 0:
+            return np.zeros(0, dtype=np.intp)
+        cols = cols[np.argsort(cx[cols], kind="stable")]
+        c_start = np.flatnonzero(np.diff(cx[cols], prepend=-2))
+        occupied[np.ix_(cy[rows[r_start]], cx[cols[c_start]])] = np.logical_or.reduceat(band[:, cols], c_start, axis=1)
+
+        # grow by the cells a ~1 texel offset can cross
+        texel = np.array([1.0 / (w - 1), 1.0 / (h - 1)])
+        r = int(np.ceil(np.max(texel / self.cell))) + 1
+        occupied = _binary_dilate_fast(occupied, radius=r) if r < n else np.ones_like(occupied)
+        seg = np.unique(self._segments_in_cells(np.flatnonzero(occupied)))
+        return np.unique(seg % self.count)
+
+
+def load_seams(file: BinaryIO, mesh_format: str = "auto", *, workers: int = 1) -> MeshSeams:
+    """Parse a mesh and build its seam table (see load_mesh for formats)."""
+    seams = MeshSeams(load_mesh(file, mesh_format, workers=workers))
+    seams.table  # build now, so the cost is paid (and cached) once per mesh
+    return seams
+
+
+def _mask_from_image(mask_img: Image.Image | PackedMask, w: int, h: int, threshold: int = 16) -> PackedMask:
+    if isinstance(mask_img, PackedMask):
+        # thresholded by the caller (e.g. ComputePool ships packed bits)
+        if mask_img.shape != (h, w):
+            raise ValueError("seam mask 尺寸与贴图不一致。")
+        return mask_img
+    return PackedMask.from_image(mask_img, w, h, threshold)
 
 
 def _binary_dilate(mask: np.ndarray, radius: int) -> np.ndarray:
@@ -273,6 +793,79 @@ def _binary_dilate(mask: np.ndarray, radius: int) -> np.ndarray:
     return m
 
 
+def _or_shift(m: np.ndarray, step: int, axis: int) -> np.ndarray:
+    out = m.copy()
+    if axis == 0:
+        out[step:] |= m[:-step]
+        out[:-step] |= m[step:]
+    else:
+        out[:, step:] |= m[:, :-step]
+        out[:, :-step] |= m[:, step:]
+    return out
+
+
+def _binary_dilate_fast(mask: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Same result as _binary_dilate ((2r+1) square window), computed separably with
+    doubling shifts: O(log r) full-image passes per axis instead of r 9-tap passes.
+    """
+    if radius <= 0:
+        return mask
+    m = mask.copy()
+    for axis in (0, 1):
+        cover = 0
+        while cover < radius:
+            # at most cover + 1: a run clipped by the image border only spans [0, cover]
+            step = min(cover + 1, radius - cover)
+            m = _or_shift(m, step, axis)
+            cover += step
+    return m
+
+
+def _nearest_source(src: np.ndarray, radius: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (ty, tx, sy, sx): every texel outside src within radius (Euclidean) of it, and its
+    nearest src texel. Exact separable distance transform (nearest src per row, then a
+    column pass over +-radius rows) rather than radius rounds of dilation.
+    """
+    h, w = src.shape
+    r = int(radius)
+    cols = np.arange(w, dtype=np.int32)
+    far = w + r + 2
+    left = np.maximum.accumulate(np.where(src, cols, -far), axis=1)
+    right = np.minimum.accumulate(np.where(src, cols, far)[:, ::-1], axis=1)[:, ::-1]
+    nx = np.where(cols - left <= right - cols, left, right)
+    dx2 = np.minimum(np.abs(cols - nx), r + 1).astype(np.int64) ** 2
+    del left, right
+
+    ty, tx = np.nonzero(_binary_dilate_fast(src, r) & ~src)
+    best = dx2[ty, tx]
+    sy = ty.copy()
+    for dy in range(1, r + 1):
+        for yy in (ty - dy, ty + dy):
+            ok = (yy >= 0) & (yy < h)
+            d = np.where(ok, dx2[np.clip(yy, 0, h - 1), tx] + dy * dy, np.iinfo(np.int64).max)
+            better = d < best
+            best = np.where(better, d, best)
+            sy = np.where(better, yy, sy)
+    keep = best <= r * r
+    ty, tx, sy = ty[keep], tx[keep], sy[keep]
+    return ty, tx, sy, nx[sy, tx].astype(np.int64)
+
+
+def _fill_uv_gutter(arr: np.ndarray, covered: np.ndarray, gutter_px: int) -> None:
+    """
+    Bleed island colours gutter_px texels into empty UV space (in place, RGB only), so
+    mip levels do not pull in the background. Texels next to a covered one are kept:
+    bilinear lookups inside the island read them.
+    """
+    src = _binary_dilate_fast(covered, 1)
+    if gutter_px <= 0 or not src.any():
+        return
+    ty, tx, sy, sx = _nearest_source(src, gutter_px)
+    arr[ty, tx, :3] = arr[sy, sx, :3]
+
+
 def _binary_erode(mask: np.ndarray, radius: int) -> np.ndarray:
     if radius <= 0:
         return mask
@@ -293,21 +886,33 @@ def _binary_erode(mask: np.ndarray, radius: int) -> np.ndarray:
     return m
 
 
-def _compute_alpha_distance(hit: np.ndarray, feather_px: int) -> np.ndarray:
+def _hit_bbox(hit: np.ndarray) -> tuple[int, int, int, int]:
+    """(y0, y1, x0, x1) half-open bounding box of a non-empty bool mask."""
+    ys, xs = np.where(hit)
+    return int(ys.min()), int(ys.max()) + 1, int(xs.min()), int(xs.max()) + 1
+
+
+def _compute_alpha_distance(
+    hit: np.ndarray,
+    feather_px: int,
+    hit_bbox: tuple[int, int, int, int] | None = None,
+) -> np.ndarray:
     """
     Compute alpha inside hit region based on (approx) distance to boundary.
     alpha=0 at boundary, alpha=1 deeper than feather_px.
     Uses iterative erosion up to feather_px, clipped for speed.
+    hit_bbox: bbox of the whole hit set in hit's coordinates when hit is a window
+    of a larger image (the ROI it implies decides where alpha defaults to 1).
     """
     if feather_px <= 0 or not np.any(hit):
         return hit.astype(np.float32)
 
     # ROI crop for performance
-    ys, xs = np.where(hit)
-    y0 = max(int(ys.min()) - feather_px - 2, 0)
-    y1 = min(int(ys.max()) + feather_px + 3, hit.shape[0])
-    x0 = max(int(xs.min()) - feather_px - 2, 0)
-    x1 = min(int(xs.max()) + feather_px + 3, hit.shape[1])
+    by0, by1, bx0, bx1 = _hit_bbox(hit) if hit_bbox is None else hit_bbox
+    y0 = min(max(by0 - feather_px - 2, 0), hit.shape[0])
+    y1 = max(min(by1 + feather_px + 2, hit.shape[0]), y0)
+    x0 = min(max(bx0 - feather_px - 2, 0), hit.shape[1])
+    x1 = max(min(bx1 + feather_px + 2, hit.shape[1]), x0)
 
     roi = hit[y0:y1, x0:x1]
     dist = np.full(roi.shape, feather_px, dtype=np.int16)
@@ -494,63 +1099,254 @@ def _splat_bilinear(
         wacc[y1, x1] += w11
 
 
-def repair_texture_seams(
-    obj_file: BinaryIO,
-    texture_img: Image.Image,
-    seam_mask_img: Image.Image | None = None,
-    *,
-    texture_kind: str = "basecolor",  # basecolor | data | normal
-    band_px: int = 8,
-    sample_step_px: float = 2.0,
-    mode: str = "average",  # average | a_to_b | b_to_a
-    mask_threshold: int = 16,
-    only_masked_seams: bool = True,
-    v_flip: bool = True,
-    feather_px: int = 12,
-    alpha_method: str = "distance",  # distance | wacc
-    alpha_edge_aware: bool = True,
-    guided_eps: float = 1e-4,
-    color_match: str = "meanvar",  # none | meanvar | meanvar_edge
-    poisson_iters: int = 0,
-) -> Image.Image:
+def _uv_to_xy_vec(uv: np.ndarray, w: int, h: int, *, v_flip: bool) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized _uv_to_xyf. uv: Nx2 -> (x, y) float64 arrays of shape (N,)."""
+    u = uv[:, 0].astype(np.float64)
+    v = uv[:, 1].astype(np.float64)
+    x = u * float(w - 1)
+    y = ((1.0 - v) if v_flip else v) * float(h - 1)
+    return x, y
+
+
+def _sample_bilinear_vec(img: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
     """
-    Seam-aware texture repair:
-    - Detect UV seam edges from OBJ (shared 3D edges with discontinuous UVs).
-    - For selected seams, synchronize a narrow band of pixels across the seam by 3D adjacency mapping.
+    Vectorized _sample_bilinear (requires W>1 and H>1).
+    img: HxWxC float32, x/y: (N,) -> NxC float32
+    """
+    h, w, _c = img.shape
+    x = np.clip(x, 0.0, float(w - 1))
+    y = np.clip(y, 0.0, float(h - 1))
+    x0 = np.floor(x).astype(np.intp)
+    y0 = np.floor(y).astype(np.intp)
+    x1 = np.minimum(x0 + 1, w - 1)
+    y1 = np.minimum(y0 + 1, h - 1)
+    tx = (x - x0)[:, None]
+    ty = (y - y0)[:, None]
+    c0 = img[y0, x0] * (1.0 - tx) + img[y0, x1] * tx
+    c1 = img[y1, x0] * (1.0 - tx) + img[y1, x1] * tx
+    return (c0 * (1.0 - ty) + c1 * ty).astype(np.float32)
+
+
+def _splat_bilinear_vec(
+    sink: _ArraySink | _TileSink | _WindowSink,
+    mask: PackedMask | None,
+    x: np.ndarray,
+    y: np.ndarray,
+    col: np.ndarray,
+    w: float | np.ndarray,
+) -> None:
+    """
+    Vectorized _splat_bilinear: N samples (x, y, col Nx3) with a shared weight w
+    (or one per sample). mask=None means every pixel may be written.
+    """
+    if x.size == 0:
+        return
+    h, wimg = sink.shape
+    x = np.clip(x, 0.0, float(wimg - 1))
+    y = np.clip(y, 0.0, float(h - 1))
+    x0 = np.floor(x).astype(np.intp)
+    y0 = np.floor(y).astype(np.intp)
+    x1 = np.minimum(x0 + 1, wimg - 1)
+    y1 = np.minimum(y0 + 1, h - 1)
+    tx = x - x0
+    ty = y - y0
+
+    ys = np.concatenate([y0, y0, y1, y1])
+    xs = np.concatenate([x0, x1, x0, x1])
+    ws = np.concatenate([(1.0 - tx) * (1.0 - ty), tx * (1.0 - ty), (1.0 - tx) * ty, tx * ty])
+    ws = ws * (np.tile(w, 4) if isinstance(w, np.ndarray) else w)
+    keep = ws > 0.0
+    if mask is not None:
+        keep &= mask[ys, xs]
+    if not np.any(keep):
+        return
+    ws = ws[keep].astype(np.float32)
+    cols = np.concatenate([col, col, col, col])[keep]
+    sink.add(ys[keep], xs[keep], ws, cols * ws[:, None])
+
+
+class _ArraySink:
+    """Splat target backed by full-resolution acc (HxWx3) / wacc (HxW) arrays."""
+
+    def __init__(self, acc: np.ndarray, wacc: np.ndarray) -> None:
+        self.acc = acc
+        self.wacc = wacc
+        self.shape = wacc.shape
+
+    def add(self, ys: np.ndarray, xs: np.ndarray, ws: np.ndarray, wcols: np.ndarray) -> None:
+        flat = ys * self.shape[1] + xs
+        np.add.at(self.wacc.reshape(-1), flat, ws)
+        np.add.at(self.acc.reshape(-1, self.acc.shape[-1]), flat, wcols)
+
+
+class _WindowSink:
+    """
+    Splat target covering only the texel rectangle rect = (y0, y1, x0, x1) of an HxW
+    image; splats outside it are dropped (region-restricted repair).
     """
-    if band_px <= 0:
-        return texture_img.copy()
 
-    verts, uvs, tris = _parse_obj(obj_file)
-    seams = _build_seam_pairs(verts, uvs, tris)
+    def __init__(self, h: int, w: int, rect: tuple[int, int, int, int]) -> None:
+        self.shape = (h, w)
+        self.y0, y1, self.x0, x1 = rect
+        self.acc = np.zeros((y1 - self.y0, x1 - self.x0, 3), dtype=np.float32)
+        self.wacc = np.zeros((y1 - self.y0, x1 - self.x0), dtype=np.float32)
 
-    tex = texture_img.convert("RGBA")
-    w, h = tex.size
-    tex_arr = np.asarray(tex, dtype=np.uint8)
-    src_rgba = tex_arr.astype(np.float32) / 255.0
-    src_rgb = src_rgba[..., :3].astype(np.float32)
-    src_a = src_rgba[..., 3:4].astype(np.float32)
+    def add(self, ys: np.ndarray, xs: np.ndarray, ws: np.ndarray, wcols: np.ndarray) -> None:
+        ys, xs = ys - self.y0, xs - self.x0
+        inside = (ys >= 0) & (ys < self.wacc.shape[0]) & (xs >= 0) & (xs < self.wacc.shape[1])
+        if not np.all(inside):
+            ys, xs, ws, wcols = ys[inside], xs[inside], ws[inside], wcols[inside]
+        flat = ys * self.wacc.shape[1] + xs
+        np.add.at(self.wacc.reshape(-1), flat, ws)
+        np.add.at(self.acc.reshape(-1, 3), flat, wcols)
 
-    if texture_kind == "basecolor":
-        work_rgb = _srgb_to_linear(src_rgb)
-    elif texture_kind == "data":
-        work_rgb = src_rgb
-    elif texture_kind == "normal":
-        work_rgb = _normal_rgb_to_vec(src_rgb)
-    else:
-        raise ValueError("texture_kind 必须是 basecolor | data | normal")
 
-    if seam_mask_img is not None:
-        base_mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold)
-        mask = _binary_dilate(base_mask, radius=band_px)
-    else:
-        mask = np.ones((h, w), dtype=bool)
+class _TileSink:
+    """
+    Sparse splat target: acc/wacc buffers exist only for the tile_px x tile_px tiles
+    that receive splats, so memory follows the seam bands, not the texture size.
+    """
 
-    acc = np.zeros_like(work_rgb, dtype=np.float32)
-    wacc = np.zeros((h, w), dtype=np.float32)
+    def __init__(self, h: int, w: int, tile_px: int) -> None:
+        self.shape = (h, w)
+        self.tile_px = int(tile_px)
+        self.nty = -(-h // self.tile_px)
+        self.ntx = -(-w // self.tile_px)
+        self.tiles: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+    def _tile(self, ty: int, tx: int) -> tuple[np.ndarray, np.ndarray]:
+        t = self.tiles.get((ty, tx))
+        if t is None:
+            th = min(self.tile_px, self.shape[0] - ty * self.tile_px)
+            tw = min(self.tile_px, self.shape[1] - tx * self.tile_px)
+            t = (np.zeros((th, tw, 3), dtype=np.float32), np.zeros((th, tw), dtype=np.float32))
+            self.tiles[(ty, tx)] = t
+        return t
+
+    def add(self, ys: np.ndarray, xs: np.ndarray, ws: np.ndarray, wcols: np.ndarray) -> None:
+        tp = self.tile_px
+        tid = (ys // tp) * self.ntx + (xs // tp)
+        order = np.argsort(tid, kind="stable")
+        tid = tid[order]
+        cuts = np.flatnonzero(np.diff(tid)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, tid.size]):
+            sel = order[lo:hi]
+            ty, tx = divmod(int(tid[lo]), self.ntx)
+            acc, wacc = self._tile(ty, tx)
+            flat = (ys[sel] - ty * tp) * acc.shape[1] + (xs[sel] - tx * tp)
+            np.add.at(wacc.reshape(-1), flat, ws[sel])
+            np.add.at(acc.reshape(-1, 3), flat, wcols[sel])
+
+    def window(self, y0: int, y1: int, x0: int, x1: int) -> tuple[np.ndarray, np.ndarray]:
+        """Assemble acc/wacc for an arbitrary pixel rectangle (zeros where no tile exists)."""
+        tp = self.tile_px
+        acc = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.float32)
+        wacc = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+        for ty in range(y0 // tp, (y1 - 1) // tp + 1):
+            for tx in range(x0 // tp, (x1 - 1) // tp + 1):
+                t = self.tiles.get((ty, tx))
+                if t is None:
+                    continue
+                ty0, tx0 = ty * tp, tx * tp
+                sy0, sy1 = max(y0, ty0), min(y1, ty0 + t[1].shape[0])
+                sx0, sx1 = max(x0, tx0), min(x1, tx0 + t[1].shape[1])
+                acc[sy0 - y0 : sy1 - y0, sx0 - x0 : sx1 - x0] = t[0][sy0 - ty0 : sy1 - ty0, sx0 - tx0 : sx1 - tx0]
+                wacc[sy0 - y0 : sy1 - y0, sx0 - x0 : sx1 - x0] = t[1][sy0 - ty0 : sy1 - ty0, sx0 - tx0 : sx1 - tx0]
+        return acc, wacc
+
+    def hit_bbox(self, rect: tuple[int, int, int, int] | None = None) -> tuple[int, int, int, int] | None:
+        """(y0, y1, x0, x1) bbox of texels with wacc > 0 (inside rect, default everywhere), or None."""
+        tp = self.tile_px
+        ry0, ry1, rx0, rx1 = rect if rect is not None else (0, self.shape[0], 0, self.shape[1])
+        boxes = []
+        for (ty, tx), (_acc, wacc) in self.tiles.items():
+            oy, ox = ty * tp, tx * tp
+            sub = wacc[max(ry0 - oy, 0) : max(ry1 - oy, 0), max(rx0 - ox, 0) : max(rx1 - ox, 0)]
+            hit = sub > 0.0
+            if np.any(hit):
+                y0, y1, x0, x1 = _hit_bbox(hit)
+                oy, ox = max(oy, ry0), max(ox, rx0)
+                boxes.append((oy + y0, oy + y1, ox + x0, ox + x1))
+        if not boxes:
+            return None
+        b = np.array(boxes)
+        return int(b[:, 0].min()), int(b[:, 1].max()), int(b[:, 2].min()), int(b[:, 3].max())
+
+
+def _roi_mask(
+    roi: Sequence[Sequence[float]], w: int, h: int, *, v_flip: bool
+) -> tuple[np.ndarray, tuple[int, int, int, int]] | None:
+    """
+    Texel mask (HxW bool) of a region of interest in UV space: a list of rectangles
+    [(u0, v0, u1, v1), ...] or one polygon [(u, v), ...] (>= 3 points, even-odd rule).
+    A texel belongs to the region when its centre does. Returns (mask, (y0, y1, x0, x1)
+    bbox of the region), or None when the region holds no texel centre.
+    """
+    items = [tuple(float(v) for v in item) for item in roi]
+    if items and all(len(it) == 4 for it in items):
+        polygon = None
+    elif len(items) >= 3 and all(len(it) == 2 for it in items):
+        polygon = np.array(items, dtype=np.float64)
+    else:
+        raise ValueError("roi 需要是矩形列表 [[u0, v0, u1, v1], ...] 或多边形 [[u, v], ...]（至少 3 个点）")
+
+    def to_px(u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        x = u * (w - 1)
+        y = (1.0 - v) * (h - 1) if v_flip else v * (h - 1)
+        return x, y
+
+    mask = np.zeros((h, w), dtype=bool)
+    if polygon is None:
+        for u0, v0, u1, v1 in items:
+            xs, ys = to_px(np.array([u0, u1]), np.array([v0, v1]))
+            x0, x1 = max(int(np.ceil(xs.min())), 0), min(int(np.floor(xs.max())), w - 1) + 1
+            y0, y1 = max(int(np.ceil(ys.min())), 0), min(int(np.floor(ys.max())), h - 1) + 1
+            if x0 < x1 and y0 < y1:
+                mask[y0:y1, x0:x1] = True
+    else:
+        px, py = to_px(polygon[:, 0], polygon[:, 1])
+        x0, x1 = max(int(np.ceil(px.min())), 0), min(int(np.floor(px.max())), w - 1) + 1
+        y0, y1 = max(int(np.ceil(py.min())), 0), min(int(np.floor(py.max())), h - 1) + 1
+        if x0 < x1 and y0 < y1:
+            gy, gx = np.mgrid[y0:y1, x0:x1].astype(np.float64)
+            inside = np.zeros(gx.shape, dtype=bool)
+            for (xa, ya), (xb, yb) in zip(zip(px, py), zip(np.roll(px, -1), np.roll(py, -1))):
+                if ya == yb:
+                    continue
+                crosses = (ya > gy) != (yb > gy)
+                inside ^= crosses & (gx < xa + (gy - ya) * (xb - xa) / (yb - ya))
+            mask[y0:y1, x0:x1] = inside
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask[rows[0] : rows[-1] + 1].any(axis=0))
+    return mask, (int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1)
+
+
+def _accumulate_reference(
+    seams: list[SeamPair],
+    work_rgb: np.ndarray,
+    mask: np.ndarray,
+    acc: np.ndarray,
+    wacc: np.ndarray,
+    *,
+    has_mask: bool,
+    texture_kind: str,
+    band_px: int,
+    sample_step_px: float,
+    mode: str,
+    only_masked_seams: bool,
+    v_flip: bool,
+    color_match: str,
+) -> None:
+    """
+    Reference engine: the original per-sample Python loops (kept bit-for-bit as the golden path).
+    Fills acc (HxWx3) / wacc (HxW) in place.
+    """
+    h, w = wacc.shape
 
     def seam_is_selected(pair: SeamPair) -> bool:
-        if seam_mask_img is None or not only_masked_seams:
+        if not has_mask or not only_masked_seams:
             return True
         # Probe a few points on both sides along the edge at d=0 to decide.
         for t in (0.1, 0.3, 0.5, 0.7, 0.9):
@@ -717,13 +1513,754 @@ def repair_texture_seams(
                 else:
                     raise ValueError("mode 必须是 average | a_to_b | b_to_a")
 
+
+ENGINES = ("numpy", "reference")
+# splat: bilinear point samples along each edge (original pattern);
+# raster: each band scan-converted in texel space, one sample per covered texel;
+# chain: points spaced by arc length along linked seam polylines (_SeamChains).
+SAMPLINGS = ("splat", "raster", "chain")
+
+# Per-seam sample count / band depth: fixed (sample_step_px, band_px) or adaptive.
+DENSITIES = ("fixed", "adaptive")
+
+# Splat loop implementation of the numpy engine: "numpy" (vectorized, default) or
+# "numba" (seam_kernels; the NumPy path is used when Numba is not installed).
+KERNELS = ("numpy", "numba")
+
+# density="adaptive": seams whose texture changes by less than this per texel (8-bit
+# levels of the working values, degrees for normal maps) are sampled up to 2x sparser.
+_ADAPTIVE_DETAIL = 4.0
+# Samples kept around a roi= region when the blend parameters are not known up front
+# (accumulate_seams on its own): _blend_halo_px(20, True, "basecolor").
+ROI_HALO_PX = 64
+
+# Upper bound on edge samples processed per vectorized batch (bounds temporary memory).
+_SAMPLE_BATCH = 1 << 18
+
+
+def _inward_dir_vec(uv0: np.ndarray, uv1: np.ndarray, uv2: np.ndarray) -> np.ndarray:
+    """Vectorized _compute_inward_dir over Sx2 arrays."""
+    e = uv1 - uv0
+    n = np.stack([-e[:, 1], e[:, 0]], axis=1).astype(np.float32)
+    mid = (uv0 + uv1) * 0.5
+    to2 = uv2 - mid
+    flip = np.sum(n * to2, axis=1) < 0.0
+    n[flip] = -n[flip]
+    ln = np.linalg.norm(n, axis=1)
+    degen = ln < 1e-12
+    if np.any(degen):
+        # Degenerate UVs; fallback to direction to uv2
+        n[degen] = to2[degen]
+        ln[degen] = np.linalg.norm(to2[degen], axis=1)
+    out = np.zeros_like(n)
+    ok = ln >= 1e-12
+    out[ok] = n[ok] / ln[ok, None]
+    return out.astype(np.float32)
+
+
+def _dir_px_vec(dir_uv: np.ndarray, scale_px: np.ndarray) -> np.ndarray:
+    """UV-space direction -> unit pixel-space direction (rows with ~0 length are left as-is)."""
+    d = (dir_uv * scale_px).astype(np.float32)
+    ln = np.linalg.norm(d, axis=1)
+    ok = ln > 1e-9
+    d[ok] = d[ok] / ln[ok, None]
+    return d
+
+
+def _select_seams_vec(
+    table: _SeamTable, mask: PackedMask, w: int, h: int, *, v_flip: bool, index: SeamIndex | None = None
+) -> np.ndarray:
+    """
+    Vectorized seam_is_selected: indices of seams with a probe point on the mask.
+    With an index only the seams near set mask texels are probed.
+    """
+    if index is not None:
+        cand = index.query_mask(mask, v_flip=v_flip)
+        return cand[_select_seams_vec(table.take(cand), mask, w, h, v_flip=v_flip)]
+    selected = np.zeros((table.count,), dtype=bool)
+    for t in (0.1, 0.3, 0.5, 0.7, 0.9):
+        for p0, p1 in ((table.a0, table.a1), (table.b0, table.b1)):
+            x, y = _uv_to_xy_vec(p0 * (1.0 - t) + p1 * t, w, h, v_flip=v_flip)
+            ix = np.rint(x).astype(np.intp)
+            iy = np.rint(y).astype(np.intp)
+            inside = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+            hit = np.zeros_like(inside)
+            hit[inside] = mask[iy[inside], ix[inside]]
+            selected |= hit
+    return np.nonzero(selected)[0]
+
+
+def _band_probe_colors(
+    work_rgb: np.ndarray,
+    p0: np.ndarray,
+    p1: np.ndarray,
+    dir_px: np.ndarray,
+    scale_px: np.ndarray,
+    ns: int,
+    max_d: int,
+    *,
+    v_flip: bool,
+) -> np.ndarray:
+    """Colors at ns mid-points x (max_d+1) depths per seam side: S x (ns*(max_d+1)) x 3."""
+    h, w, _ = work_rgb.shape
+    t = ((np.arange(ns, dtype=np.float32) + 0.5) / float(ns))[None, :, None, None]
+    d = np.arange(max_d + 1, dtype=np.float32)[None, None, :, None]
+    edge = p0[:, None, None, :] * (1.0 - t) + p1[:, None, None, :] * t
+    uv = edge + (dir_px[:, None, None, :] * d) / scale_px
+    s = p0.shape[0]
+    x, y = _uv_to_xy_vec(uv.reshape(-1, 2), w, h, v_flip=v_flip)
+    return _sample_bilinear_vec(work_rgb, x, y).reshape(s, ns * (max_d + 1), -1)
+
+
+def _seam_steps(
+    table: _SeamTable,
+    texels: np.ndarray | _WorkTexels,
+    dir_a_px: np.ndarray,
+    dir_b_px: np.ndarray,
+    n_samples: np.ndarray,
+    *,
+    normal: bool,
+    v_flip: bool,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per seam (mean step, max step, mean inward change): the difference between the
+    texels one pixel inside side A and side B at n_samples + 1 points along the seam,
+    and how much each side changes over its next pixel inwards. In 8-bit levels of
+    the texel values, or degrees between normals when normal.
+    """
+    h, w, _ = texels.shape
+    n = table.count
+    scale_px = np.array([w - 1, h - 1], dtype=np.float32)
+
+    def probe(edge: np.ndarray, d: np.ndarray, depth: float) -> np.ndarray:
+        x, y = _uv_to_xy_vec(edge + (d * depth) / scale_px, w, h, v_flip=v_flip)
+        return _sample_bilinear_vec(texels, x, y)
+
+    def dist(c0: np.ndarray, c1: np.ndarray) -> np.ndarray:
+        if not normal:
+            return np.linalg.norm(c0 - c1, axis=1) * 255.0
+        c0 = c0 / np.maximum(np.linalg.norm(c0, axis=1, keepdims=True), 1e-12)
+        c1 = c1 / np.maximum(np.linalg.norm(c1, axis=1, keepdims=True), 1e-12)
+        return np.degrees(np.arccos(np.clip(np.sum(c0 * c1, axis=1), -1.0, 1.0)))
+
+    err_sum = np.zeros(n)
+    err_max = np.zeros(n)
+    grad_sum = np.zeros(n)
+    count = np.zeros(n)
+    for sid, edge_a, edge_b, da, db in _edge_samples(table, dir_a_px, dir_b_px, n_samples):
+        a1, b1 = probe(edge_a, da, 1.0), probe(edge_b, db, 1.0)
+        e = dist(a1, b1)
+        g = (dist(a1, probe(edge_a, da, 2.0)) + dist(b1, probe(edge_b, db, 2.0))) * 0.5
+        err_sum += np.bincount(sid, e, minlength=n)
+        grad_sum += np.bincount(sid, g, minlength=n)
+        count += np.bincount(sid, minlength=n)
+        # batches hold whole seams, sorted by seam
+        starts = np.flatnonzero(np.r_[True, sid[1:] != sid[:-1]])
+        err_max[sid[starts]] = np.maximum.reduceat(e, starts)
+    count = np.maximum(count, 1.0)
+    return err_sum / count, err_max, grad_sum / count
+
+
+def _step_band_px(step: np.ndarray, grad: np.ndarray, max_band_px: int) -> np.ndarray:
+    """
+    Band (texels) over which a seam's step changes no faster per texel than the texture
+    already does next to it; at least one level (degree) per texel, so flat textures do
+    not ask for huge bands.
+    """
+    lo = min(2, max(1, int(max_band_px)))
+    return np.clip(np.ceil(step / np.maximum(grad, 1.0)), lo, max(lo, int(max_band_px))).astype(np.int64)
+
+
+def _color_match_numpy(
+    table: _SeamTable,
+    work_rgb: np.ndarray,
+    dir_a_px: np.ndarray,
+    dir_b_px: np.ndarray,
+    scale_px: np.ndarray,
+    *,
+    per_edge: bool,
+    band_px: int,
+    v_flip: bool,
+    charts: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized meanvar / meanvar_edge statistics (same probes as the reference engine).
+    Returns per-seam (mean_a, mean_b, scale), each Sx3 float32, mapping B -> A.
+    charts (S x 2 chart ids of side A / B) gives meanvar_chart: meanvar probes, pooled
+    per pair of charts instead of over all seams.
+    """
+    s = table.count
+    ns, max_d = (24, min(3, max(0, band_px - 1))) if per_edge else (18, min(2, max(0, band_px - 1)))
+    per_seam = ns * (max_d + 1)
+    step = max(1, _SAMPLE_BATCH // per_seam)
+
+    mean_a = np.zeros((s, 3), dtype=np.float32)
+    mean_b = np.zeros((s, 3), dtype=np.float32)
+    scale = np.ones((s, 3), dtype=np.float32)
+    # global accumulators: count, sum, sum of squares (float64)
+    tot = np.zeros((2, 3, 3), dtype=np.float64)
+    if charts is not None:
+        # per seam and side: sum, sum of squares
+        part = np.zeros((2, 2, s, 3), dtype=np.float64)
+
+    for s0 in range(0, s, step):
+        sl = slice(s0, min(s0 + step, s))
+        ca = _band_probe_colors(
+            work_rgb, table.a0[sl], table.a1[sl], dir_a_px[sl], scale_px, ns, max_d, v_flip=v_flip
+        ).astype(np.float64)
+        cb = _band_probe_colors(
+            work_rgb, table.b0[sl], table.b1[sl], dir_b_px[sl], scale_px, ns, max_d, v_flip=v_flip
+        ).astype(np.float64)
+        if per_edge:
+            ddof = 1 if per_seam > 1 else 0
+            mean_a[sl] = ca.mean(axis=1)
+            mean_b[sl] = cb.mean(axis=1)
+            std_a = ca.std(axis=1, ddof=ddof) if per_seam > 1 else np.zeros_like(mean_a[sl])
+            std_b = cb.std(axis=1, ddof=ddof) if per_seam > 1 else np.zeros_like(mean_b[sl])
+            scale[sl] = std_a / (std_b + 1e-6)
+        elif charts is not None:
+            for k, c in enumerate((ca, cb)):
+                part[k, 0, sl] = c.sum(axis=1)
+                part[k, 1, sl] = np.square(c).sum(axis=1)
+        else:
+            for k, c in enumerate((ca, cb)):
+                flat = c.reshape(-1, 3)
+                tot[k, 0] += flat.shape[0]
+                tot[k, 1] += flat.sum(axis=0)
+                tot[k, 2] += np.square(flat).sum(axis=0)
+
+    if charts is not None:
+        # pool by unordered chart pair; slot 0 holds the lower chart id (side A if equal)
+        lo, hi = charts.min(axis=1), charts.max(axis=1)
+        _, pair = np.unique(lo * (int(hi.max()) + 1) + hi, return_inverse=True)
+        pair = pair.reshape(-1)
+        slot_a = (charts[:, 0] > charts[:, 1]).astype(np.int64)
+        slot_b = 1 - slot_a
+        sums = np.zeros((int(pair.max()) + 1, 2, 2, 3), dtype=np.float64)  # pair, slot, (sum, sq)
+        cnt = np.zeros(sums.shape[:2], dtype=np.float64)
+        for k, slot in enumerate((slot_a, slot_b)):
+            np.add.at(sums, (pair, slot), part[k].transpose(1, 0, 2))
+            np.add.at(cnt, (pair, slot), float(per_seam))
+        m = sums[:, :, 0] / np.maximum(cnt, 1.0)[..., None]
+        var = (sums[:, :, 1] - cnt[..., None] * m * m) / np.maximum(cnt - 1.0, 1.0)[..., None]
+        std = np.sqrt(np.maximum(var, 0.0))
+        mean_a[:] = m[pair, slot_a]
+        mean_b[:] = m[pair, slot_b]
+        scale[:] = std[pair, slot_a] / (std[pair, slot_b] + 1e-6)
+    elif not per_edge:
+        stats = []
+        for k in range(2):
+            n = tot[k, 0]
+            m = tot[k, 1] / np.maximum(n, 1.0)
+            var = (tot[k, 2] - n * m * m) / np.maximum(n - 1.0, 1.0) if n[0] > 1 else np.zeros((3,))
+            stats.append((m, np.sqrt(np.maximum(var, 0.0))))
+        (ga, sa), (gb, sb) = stats
+        mean_a[:] = ga
+        mean_b[:] = gb
+        scale[:] = sa / (sb + 1e-6)
+    return mean_a, mean_b, scale
+
+
+def _band_pixels(
+    p0: np.ndarray,
+    p1: np.ndarray,
+    dir_xy: np.ndarray,
+    band_px: int,
+    bounds: np.ndarray,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Scan-convert band quads: edge p0 -> p1 (Sx2 pixel-space x, y) swept band_px pixels
+    along dir_xy. Yields batches (seam, y, x, t, d) of the texel centres inside each
+    quad, every texel once per quad. The quad is grown by one texel outwards and at the
+    edge ends (t and d then fall slightly outside [0, 1] / [0, band_px)), so it holds
+    every texel a bilinear lookup inside the band reads, as the splats do.
+    bounds (S x 4: x_lo, x_hi, y_lo, y_hi) limits the texels of each quad.
+    """
+    e = p1 - p0
+    det = e[:, 0] * dir_xy[:, 1] - e[:, 1] * dir_xy[:, 0]
+    length = np.linalg.norm(e, axis=1)
+    ok = (np.abs(det) > 1e-9) & (length > 1e-6)
+    sids = np.nonzero(ok)[0]
+    if sids.size == 0:
+        return
+    # Long edges are cut into pieces ~band_px long so the bboxes stay close to the band
+    # area; piece k owns t in [k/n, (k+1)/n), so no texel is visited twice.
+    n = np.maximum(1, np.ceil(length[sids] / max(2.0, float(band_px)))).astype(np.int64)
+    sid = np.repeat(sids, n)
+    k = np.arange(sid.size) - np.repeat(np.cumsum(n) - n, n)
+    n = np.repeat(n, n)
+    slack = 1.0 / length[sid]
+    t_lo = np.where(k == 0, -slack, k / n)
+    t_hi = np.where(k == n - 1, 1.0 + slack, (k + 1) / n)
+
+    a = p0[sid] + e[sid] * t_lo[:, None]
+    b = p0[sid] + e[sid] * t_hi[:, None]
+    near, far = -dir_xy[sid], dir_xy[sid] * float(band_px)
+    corners = np.stack([a + near, b + near, a + far, b + far], axis=1)
+    lo, hi = corners.min(axis=1), corners.max(axis=1)
+    bd = bounds[sid]
+    x0 = np.maximum(np.ceil(lo[:, 0]), np.ceil(bd[:, 0])).astype(np.int64)
+    x1 = np.minimum(np.floor(hi[:, 0]), np.floor(bd[:, 1])).astype(np.int64) + 1
+    y0 = np.maximum(np.ceil(lo[:, 1]), np.ceil(bd[:, 2])).astype(np.int64)
+    y1 = np.minimum(np.floor(hi[:, 1]), np.floor(bd[:, 3])).astype(np.int64) + 1
+    bw = np.maximum(x1 - x0, 0)
+    counts = bw * np.maximum(y1 - y0, 0)
+
+    ends = np.cumsum(counts)
+    i0 = 0
+    while i0 < sid.size:
+        base = int(ends[i0 - 1]) if i0 > 0 else 0
+        i1 = max(int(np.searchsorted(ends, base + _SAMPLE_BATCH, side="right")), i0 + 1)
+        c = counts[i0:i1]
+        pid = np.repeat(np.arange(i0, i1), c)
+        local = np.arange(pid.size) - np.repeat(np.cumsum(c) - c, c)
+        ys = y0[pid] + local // bw[pid]
+        xs = x0[pid] + local % bw[pid]
+        s = sid[pid]
+        rx = xs - p0[s, 0]
+        ry = ys - p0[s, 1]
+        t = (rx * dir_xy[s, 1] - ry * dir_xy[s, 0]) / det[s]
+        d = (e[s, 0] * ry - e[s, 1] * rx) / det[s]
+        keep = (t >= t_lo[pid]) & (d > -1.0) & (d < band_px)
+        keep &= np.where(k[pid] == n[pid] - 1, t <= t_hi[pid], t < t_hi[pid])
+        yield s[keep], ys[keep], xs[keep], t[keep], d[keep]
+        i0 = i1
+
+
+def _accumulate_raster(
+    table: _SeamTable,
+    work_rgb: np.ndarray | _WorkTexels,
+    mask: PackedMask | None,
+    sink: _ArraySink | _TileSink | _WindowSink,
+    dir_a_px: np.ndarray,
+    dir_b_px: np.ndarray,
+    match: tuple[np.ndarray, np.ndarray, np.ndarray] | None,
+    *,
+    band_px: int,
+    mode: str,
+    v_flip: bool,
+    side_bounds: np.ndarray | None,
+) -> None:
+    """
+    sampling="raster": each seam side's band is scan-converted as a quad in texel space
+    and every covered texel gets exactly one sample (weight falling off with depth like
+    the splats), mapped to the same (t, depth) on the opposite side and read there
+    bilinearly. The cost follows the band area, with no gaps on thin or skewed edges.
+    """
+    h, w = sink.shape
+    image = np.array([0.0, w - 1, 0.0, h - 1], dtype=np.float64)
+    ends = []
+    for p0, p1, d_px, side in ((table.a0, table.a1, dir_a_px, 0), (table.b0, table.b1, dir_b_px, 1)):
+        x0, y0 = _uv_to_xy_vec(p0, w, h, v_flip=v_flip)
+        x1, y1 = _uv_to_xy_vec(p1, w, h, v_flip=v_flip)
+        dy = -d_px[:, 1] if v_flip else d_px[:, 1]
+        bounds = np.broadcast_to(image, (table.count, 4)) if side_bounds is None else side_bounds[side]
+        ends.append((np.stack([x0, y0], 1), np.stack([x1, y1], 1), np.stack([d_px[:, 0], dy], 1).astype(np.float64), bounds))
+
+    # (destination side, source side): texels of dst take colours sampled on src
+    passes = {"average": ((0, 1), (1, 0)), "a_to_b": ((1, 0),), "b_to_a": ((0, 1),)}[mode]
+    for dst, src in passes:
+        p0, p1, dir_xy, bounds = ends[dst]
+        q0, q1, dir_q, q_bounds = ends[src]
+        for sid, ys, xs, t, d in _band_pixels(p0, p1, dir_xy, band_px, bounds):
+            if mask is not None:
+                m = mask[ys, xs]
+                sid, ys, xs, t, d = sid[m], ys[m], xs[m], t[m], d[m]
+            if sid.size == 0:
+                continue
+            tc = np.clip(t, 0.0, 1.0)[:, None]
+            dc = np.maximum(d, 0.0)
+            q = q0[sid] * (1.0 - tc) + q1[sid] * tc + dir_q[sid] * dc[:, None]
+            qb = q_bounds[sid]
+            qx = np.clip(q[:, 0], qb[:, 0], qb[:, 1])
+            qy = np.clip(q[:, 1], qb[:, 2], qb[:, 3])
+            col_own = work_rgb[ys, xs].astype(np.float32)
+            col_other = _sample_bilinear_vec(work_rgb, qx, qy)
+            col_a, col_b = (col_own, col_other) if dst == 0 else (col_other, col_own)
+            if match is not None:
+                # Map B into A's color distribution before blending
+                mean_a, mean_b, scale = match
+                col_b = (col_b - mean_b[sid]) * scale[sid] + mean_a[sid]
+            if mode == "average":
+                col = (col_a + col_b) * 0.5
+            else:
+                col = col_a if dst == 1 else col_b
+            ws = ((band_px - dc) / float(band_px)).astype(np.float32)
+            sink.add(ys, xs, ws, col * ws[:, None])
+
+
+def _edge_samples(
+    table: _SeamTable, dir_a_px: np.ndarray, dir_b_px: np.ndarray, n_samples: np.ndarray
+) -> Iterator[tuple[np.ndarray, ...]]:
+    """
+    n_samples + 1 evenly spaced points on every seam edge, in batches of whole seams:
+    (seam index, edge point A, edge point B, inward dir A, inward dir B).
+    """
+    counts = n_samples + 1
+    ends = np.cumsum(counts)
+    s0 = 0
+    while s0 < table.count:
+        # batch of whole seams with at most ~_SAMPLE_BATCH samples
+        base = int(ends[s0 - 1]) if s0 > 0 else 0
+        s1 = int(np.searchsorted(ends, base + _SAMPLE_BATCH, side="right"))
+        s1 = max(s1, s0 + 1)
+        c = counts[s0:s1]
+        sid = np.repeat(np.arange(s0, s1), c)
+        si = np.arange(sid.size) - np.repeat(np.cumsum(c) - c, c)
+        t = (si / n_samples[sid]).astype(np.float32)[:, None]
+        edge_a = table.a0[sid] * (1.0 - t) + table.a1[sid] * t
+        edge_b = table.b0[sid] * (1.0 - t) + table.b1[sid] * t
+        yield sid, edge_a, edge_b, dir_a_px[sid], dir_b_px[sid]
+        s0 = s1
+
+
+def _chain_samples(
+    table: _SeamTable,
+    chains: _SeamChains,
+    dir_a_px: np.ndarray,
+    dir_b_px: np.ndarray,
+    edge_len_px: np.ndarray,
+    step_px: float,
+) -> Iterator[tuple[np.ndarray, ...]]:
+    """
+    Same batches as _edge_samples, spaced by arc length along each chain instead of per
+    edge: shared vertices are sampled once, and the inward direction is averaged at
+    chain vertices and interpolated along the edges, so neighbouring bands meet without
+    overlapping corners.
+    """
+    e, sw = chains.seam, chains.swap[:, None]
+    fl = chains.flip[:, None]
+    # chain side 0 / 1 endpoints in walking order
+    a0, a1 = np.where(fl, table.a1[e], table.a0[e]), np.where(fl, table.a0[e], table.a1[e])
+    b0, b1 = np.where(fl, table.b1[e], table.b0[e]), np.where(fl, table.b0[e], table.b1[e])
+    p0, p1 = np.where(sw, b0, a0), np.where(sw, b1, a1)
+    q0, q1 = np.where(sw, a0, b0), np.where(sw, a1, b1)
+    dp = np.where(sw, dir_b_px[e], dir_a_px[e])
+    dq = np.where(sw, dir_a_px[e], dir_b_px[e])
+
+    # neighbours within the chain (loops wrap around, open ends point to themselves)
+    n = e.size
+    idx = np.arange(n)
+    first, last = chains.starts[:-1], chains.starts[1:] - 1
+    prev, nxt = idx - 1, idx + 1
+    prev[first] = np.where(chains.closed, last, first)
+    nxt[last] = np.where(chains.closed, first, last)
+
+    def vertex_dirs(d: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        def avg(other: np.ndarray) -> np.ndarray:
+            m = d + d[other]
+            ln = np.linalg.norm(m, axis=1)
+            ok = ln > 1e-6
+            m[ok] /= ln[ok, None]
+            m[~ok] = d[~ok]
+            return m
+
+        return avg(prev), avg(nxt)
+
+    dp0, dp1 = vertex_dirs(dp)
+    dq0, dq1 = vertex_dirs(dq)
+
+    seg = edge_len_px[e]
+    cum = np.cumsum(seg)
+    seg_start = cum - seg
+    length = cum[last] - seg_start[first]
+    n_samples = np.maximum(8, (length / max(0.5, step_px)).astype(np.int64))
+    counts = np.where(chains.closed, n_samples, n_samples + 1)  # a loop's end is its start
+
+    ends = np.cumsum(counts)
+    c0 = 0
+    while c0 < chains.count:
+        # batch of whole chains with at most ~_SAMPLE_BATCH samples
+        base = int(ends[c0 - 1]) if c0 > 0 else 0
+        c1 = max(int(np.searchsorted(ends, base + _SAMPLE_BATCH, side="right")), c0 + 1)
+        c = counts[c0:c1]
+        cid = np.repeat(np.arange(c0, c1), c)
+        si = np.arange(cid.size) - np.repeat(np.cumsum(c) - c, c)
+        s = seg_start[first[cid]] + si * (length[cid] / n_samples[cid])
+        j = np.clip(np.searchsorted(cum, s, side="right"), first[cid], last[cid])
+        t = np.clip((s - seg_start[j]) / np.maximum(seg[j], 1e-12), 0.0, 1.0).astype(np.float32)[:, None]
+
+        pp = p0[j] * (1.0 - t) + p1[j] * t
+        pq = q0[j] * (1.0 - t) + q1[j] * t
+        ddp = _dir_px_vec(dp0[j] * (1.0 - t) + dp1[j] * t, np.ones(2, np.float32))
+        ddq = _dir_px_vec(dq0[j] * (1.0 - t) + dq1[j] * t, np.ones(2, np.float32))
+        # back to the seam's own A / B sides (colour matching and modes refer to those)
+        w = sw[j]
+        yield e[j], np.where(w, pq, pp), np.where(w, pp, pq), np.where(w, ddq, ddp), np.where(w, ddp, ddq)
+        c0 = c1
+
+
+def _adaptive_density(
+    table: _SeamTable,
+    work_rgb: np.ndarray | _WorkTexels,
+    dir_a_px: np.ndarray,
+    dir_b_px: np.ndarray,
+    edge_len_px: np.ndarray,
+    *,
+    normal: bool,
+    band_px: int,
+    sample_step_px: float,
+    sample_budget: int,
+    v_flip: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (n_samples, band depth) per seam for density="adaptive". A coarse probe measures
+    each seam's step and the texture's own change per texel (_seam_steps): the band is
+    just wide enough to spread the step (up to band_px), and the spacing along the seam,
+    in texels of its denser side (edge_len_px), grows up to 2x where there is little
+    detail. sample_budget > 0 caps sum((n + 1) * band) (at least 2 samples per seam).
+    """
+    probes = np.clip(edge_len_px / 8.0, 2, 16).astype(np.int64)
+    step, _, grad = _seam_steps(table, work_rgb, dir_a_px, dir_b_px, probes, normal=normal, v_flip=v_flip)
+    band = _step_band_px(step, grad, band_px)
+    detail = grad + step / band
+    spacing = max(0.5, float(sample_step_px)) * np.clip(_ADAPTIVE_DETAIL / np.maximum(detail, 1e-6), 1.0, 2.0)
+    n = np.maximum(2, np.ceil(edge_len_px / spacing)).astype(np.int64)
+    if sample_budget > 0:
+        cost = float(np.sum((n + 1) * band))
+        if cost > sample_budget:
+            n = np.maximum(2, np.floor(n * (sample_budget / cost))).astype(np.int64)
+    return n, band
+
+
+def _splat_kernel(kernel: str) -> Callable[..., None] | None:
+    if kernel == "numpy":
+        return None
+    # Numba (when installed) is imported on first use only
+    from seam_kernels import splat_kernel
+
+    return splat_kernel(kernel)
+
+
+def _accumulate_numpy(
+    seams: _SeamTable,
+    work_rgb: np.ndarray | _WorkTexels,
+    mask: PackedMask | None,
+    sink: _ArraySink | _TileSink | _WindowSink,
+    *,
+    has_mask: bool,
+    texture_kind: str,
+    band_px: int,
+    sample_step_px: float,
+    mode: str,
+    only_masked_seams: bool,
+    v_flip: bool,
+    color_match: str,
+    side_bounds: np.ndarray | None = None,
+    index: SeamIndex | None = None,
+    sampling: str = "splat",
+    density: str = "fixed",
+    sample_budget: int = 0,
+    kernel: str = "numpy",
+    chains: _SeamChains | None = None,
+    seam_charts: np.ndarray | None = None,
+) -> None:
+    """
+    Vectorized engine: same sampling pattern as _accumulate_reference, but every
+    (seam, sample) pair of a batch is gathered/splatted at once per band depth.
+    work_rgb may be a full array or a lazy _WorkTexels view; splats go to sink.
+    side_bounds (2 x S x 4: x_lo, x_hi, y_lo, y_hi per side A/B) replaces the image
+    rectangle as the valid / clamping area of each seam side (UDIM mosaics).
+    index (a SeamIndex over seams) speeds up only_masked_seams selection.
+    sampling="raster" replaces the point samples with _accumulate_raster; sampling="chain"
+    spaces them along seam chains (chains: _SeamChains of seams, built when missing).
+    density="adaptive" (splat only) picks samples and band depth per seam
+    (_adaptive_density), capped by sample_budget.
+    kernel="numba" runs the splat loop compiled (seam_kernels) when splatting into
+    _ArraySink / _WindowSink without side_bounds (lazy normal-map texels excepted);
+    otherwise, or without Numba, the NumPy loop below runs.
+    seam_charts (S x 2, UVCharts.seam_chart rows of seams) is needed for
+    color_match="meanvar_chart".
+    Requires W > 1 and H > 1.
+    """
+    if mode not in ("average", "a_to_b", "b_to_a"):
+        raise ValueError("mode 必须是 average | a_to_b | b_to_a")
+    if sampling not in SAMPLINGS:
+        raise ValueError("sampling 必须是 " + " | ".join(SAMPLINGS))
+    if density not in DENSITIES:
+        raise ValueError("density 必须是 " + " | ".join(DENSITIES))
+    if density == "adaptive" and sampling != "splat":
+        raise ValueError("density=adaptive 仅支持 sampling=splat")
+    h, w = sink.shape
+
+    table = seams
+    sel = None
+    if has_mask and only_masked_seams and table.count:
+        sel = _select_seams_vec(table, mask, w, h, v_flip=v_flip, index=index)
+        table = table.take(sel)
+        if side_bounds is not None:
+            side_bounds = side_bounds[:, sel]
+        if seam_charts is not None:
+            seam_charts = seam_charts[sel]
+    if table.count == 0:
+        return
+
+    scale_px = np.array([w - 1, h - 1], dtype=np.float32)
+    dir_a_px = _dir_px_vec(_inward_dir_vec(table.a0, table.a1, table.a2), scale_px)
+    dir_b_px = _dir_px_vec(_inward_dir_vec(table.b0, table.b1, table.b2), scale_px)
+
+    if color_match == "meanvar_chart" and seam_charts is None:
+        raise ValueError("color_match=meanvar_chart 需要 UV chart 信息（seam_charts）")
+    do_match = color_match in ("meanvar", "meanvar_edge", "meanvar_chart") and texture_kind != "normal"
+    if do_match:
+        mean_a, mean_b, scale = _color_match_numpy(
+            table,
+            work_rgb,
+            dir_a_px,
+            dir_b_px,
+            scale_px,
+            per_edge=color_match == "meanvar_edge",
+            band_px=band_px,
+            v_flip=v_flip,
+            charts=seam_charts if color_match == "meanvar_chart" else None,
+        )
+    if sampling == "raster":
+        _accumulate_raster(
+            table,
+            work_rgb,
+            mask,
+            sink,
+            dir_a_px,
+            dir_b_px,
+            (mean_a, mean_b, scale) if do_match else None,
+            band_px=band_px,
+            mode=mode,
+            v_flip=v_flip,
+            side_bounds=side_bounds,
+        )
+        return
+
+    # Estimate edge length in pixels (use max of both sides)
+    len_a = np.linalg.norm((table.a1 - table.a0) * scale_px, axis=1)
+    len_b = np.linalg.norm((table.b1 - table.b0) * scale_px, axis=1)
+    edge_len_px = np.maximum(len_a, len_b).astype(np.float64)
+    n_samples = np.maximum(8, (edge_len_px / max(0.5, float(sample_step_px))).astype(np.int64))
+    seam_band = None
+    if density == "adaptive":
+        n_samples, seam_band = _adaptive_density(
+            table,
+            work_rgb,
+            dir_a_px,
+            dir_b_px,
+            edge_len_px,
+            normal=texture_kind == "normal",
+            band_px=band_px,
+            sample_step_px=sample_step_px,
+            sample_budget=int(sample_budget),
+            v_flip=v_flip,
+        )
+
+    if sampling == "chain":
+        if chains is None:
+            chains = _build_seam_chains(table)
+        elif sel is not None:
+            chains = chains.restrict(sel)
+        samples = _chain_samples(table, chains, dir_a_px, dir_b_px, edge_len_px, float(sample_step_px))
+    else:
+        samples = _edge_samples(table, dir_a_px, dir_b_px, n_samples)
+    splat = _splat_kernel(kernel)
+    texels, lut = work_rgb, None
+    if isinstance(work_rgb, _WorkTexels):
+        # the compiled gather converts uint8 texels through the same LUT (not normal maps)
+        texels, lut = np.asarray(work_rgb.src), work_rgb._lut
+        if lut is None:
+            splat = None
+    if isinstance(sink, _TileSink) or side_bounds is not None:
+        splat = None
+    origin = (sink.y0, sink.x0) if isinstance(sink, _WindowSink) else (0, 0)
+    for sid, edge_a, edge_b, da, db in samples:
+        if splat is not None:
+            splat(
+                texels,
+                sink.acc,
+                sink.wacc,
+                mask,
+                (sid, edge_a, edge_b, da, db),
+                scale_px,
+                band_px=band_px,
+                seam_band=seam_band,
+                mode=mode,
+                v_flip=v_flip,
+                match=(mean_a, mean_b, scale) if do_match else None,
+                lut=lut,
+                origin=origin,
+            )
+            continue
+        depth = band_px if seam_band is None else int(seam_band[sid].max())
+        for d in range(depth):
+            # distance weight: closer to seam = stronger
+            ww = (band_px - d) / float(band_px)
+            xa, ya = _uv_to_xy_vec(edge_a + (da * float(d)) / scale_px, w, h, v_flip=v_flip)
+            xb, yb = _uv_to_xy_vec(edge_b + (db * float(d)) / scale_px, w, h, v_flip=v_flip)
+            if side_bounds is None:
+                a_in = (xa >= 0.0) & (xa <= float(w - 1)) & (ya >= 0.0) & (ya <= float(h - 1))
+                b_in = (xb >= 0.0) & (xb <= float(w - 1)) & (yb >= 0.0) & (yb <= float(h - 1))
+            else:
+                ba, bb = side_bounds[0][sid], side_bounds[1][sid]
+                a_in = (xa >= ba[:, 0]) & (xa <= ba[:, 1]) & (ya >= ba[:, 2]) & (ya <= ba[:, 3])
+                b_in = (xb >= bb[:, 0]) & (xb <= bb[:, 1]) & (yb >= bb[:, 2]) & (yb <= bb[:, 3])
+            keep = a_in | b_in
+            if seam_band is not None:
+                keep &= seam_band[sid] > d
+            if not np.any(keep):
+                continue
+            xa, ya, xb, yb = xa[keep], ya[keep], xb[keep], yb[keep]
+            a_in, b_in = a_in[keep], b_in[keep]
+            wa = wb = ww
+            if seam_band is not None:
+                sb = seam_band[sid[keep]]
+                wv = (sb - d) / sb.astype(np.float64)
+                wa, wb = wv[a_in], wv[b_in]
+            if side_bounds is not None:
+                # clamp reads to the side's own tile, like the image border does
+                ba, bb = ba[keep], bb[keep]
+                xa, ya = np.clip(xa, ba[:, 0], ba[:, 1]), np.clip(ya, ba[:, 2], ba[:, 3])
+                xb, yb = np.clip(xb, bb[:, 0], bb[:, 1]), np.clip(yb, bb[:, 2], bb[:, 3])
+
+            col_a = _sample_bilinear_vec(work_rgb, xa, ya)
+            col_b = _sample_bilinear_vec(work_rgb, xb, yb)
+            if do_match:
+                k = sid[keep]
+                # Map B into A's color distribution before blending
+                col_b = (col_b - mean_b[k]) * scale[k] + mean_a[k]
+
+            if mode == "average":
+                col = (col_a + col_b) * 0.5
+                _splat_bilinear_vec(sink, mask, xa[a_in], ya[a_in], col[a_in], wa)
+                _splat_bilinear_vec(sink, mask, xb[b_in], yb[b_in], col[b_in], wb)
+            elif mode == "a_to_b":
+                _splat_bilinear_vec(sink, mask, xb[b_in], yb[b_in], col_a[b_in], wb)
+            else:  # b_to_a
+                _splat_bilinear_vec(sink, mask, xa[a_in], ya[a_in], col_b[a_in], wa)
+
+
+def _blend_window(
+    work_rgb: np.ndarray,
+    acc: np.ndarray,
+    wacc: np.ndarray,
+    *,
+    texture_kind: str,
+    feather_px: int,
+    alpha_method: str,
+    alpha_edge_aware: bool,
+    guided_eps: float,
+    poisson_iters: int,
+    hit_bbox: tuple[int, int, int, int] | None = None,
+) -> np.ndarray:
+    """
+    Resolve accumulated samples and blend them into work_rgb (feather / guided alpha /
+    optional Poisson). Works on the full image or on any window that carries enough halo;
+    windows pass the image-wide hit bbox (window coordinates) as hit_bbox.
+    """
+    h, w = wacc.shape
     repaired = work_rgb.copy()
+    # window-sized bool (not a PackedMask): next to the float32 window arrays it is small
     hit = wacc > 0.0
     repaired[hit] = acc[hit] / wacc[hit, None]
 
     if feather_px and feather_px > 0 and np.any(hit):
         if alpha_method == "distance":
-            alpha = _compute_alpha_distance(hit, int(feather_px))
+            alpha = _compute_alpha_distance(hit, int(feather_px), hit_bbox)
         elif alpha_method == "wacc":
             alpha = np.clip((wacc / (wacc + 0.25)).astype(np.float32), 0.0, 1.0)
         else:
@@ -741,26 +2278,1143 @@ def repair_texture_seams(
 
     if poisson_iters and poisson_iters > 0 and np.any(hit) and texture_kind != "normal":
         # Simple Jacobi Poisson blending on a small ROI (no wrap-around).
-        ys, xs = np.where(hit)
+        by0, by1, bx0, bx1 = _hit_bbox(hit) if hit_bbox is None else hit_bbox
         pad = int(max(2, feather_px + 2))
-        y0 = max(int(ys.min()) - pad, 0)
-        y1 = min(int(ys.max()) + pad + 1, h)
-        x0 = max(int(xs.min()) - pad, 0)
-        x1 = min(int(xs.max()) + pad + 1, w)
+        y0 = min(max(by0 - pad, 0), h)
+        y1 = max(min(by1 + pad, h), y0)
+        x0 = min(max(bx0 - pad, 0), w)
+        x1 = max(min(bx1 + pad, w), x0)
         m = hit[y0:y1, x0:x1]
         if np.any(m):
             src_roi = work_rgb[y0:y1, x0:x1]
             guide_roi = out_work[y0:y1, x0:x1]
             out_work[y0:y1, x0:x1] = _poisson_blend_roi(src_roi, guide_roi, m, int(poisson_iters))
+    return out_work
 
-    if texture_kind == "basecolor":
-        out_rgb = _linear_to_srgb(out_work)
-    elif texture_kind == "data":
-        out_rgb = out_work
-    else:  # normal
-        out_rgb = _normal_vec_to_rgb(out_work)
 
-    out_rgba = np.concatenate([out_rgb, src_a], axis=-1)
-    out_u8 = np.clip(out_rgba * 255.0 + 0.5, 0, 255).astype(np.uint8)
+@dataclass
+class RepairState:
+    """
+    Accumulated seam samples of one texture, stored sparsely (texels with wacc > 0).
+    Everything after accumulation (feather / guided alpha / Poisson) only needs this,
+    so parameter tweaks can rerun finish_repair without resampling the seams.
+    """
+
+    texture: np.ndarray  # HxWx4 uint8 input texture
+    texture_kind: str
+    hit_idx: np.ndarray  # flat indices (y * W + x) of texels with samples
+    acc: np.ndarray  # Nx3 float32 weighted colour sums (work space)
+    wacc: np.ndarray  # N float32 weight sums
+    passthrough: bool = False  # band_px <= 0: output is the input, untouched
+    roi: tuple[int, int, int, int] | None = None  # (y0, y1, x0, x1) bbox of the roi= region
+    roi_mask: np.ndarray | None = None  # bool mask of the region over that bbox
+
+    @property
+    def nbytes(self) -> int:
+        n = self.texture.nbytes + self.hit_idx.nbytes + self.acc.nbytes + self.wacc.nbytes
+        return int(n + (self.roi_mask.nbytes if self.roi_mask is not None else 0))
+
+
+def accumulate_seams(
+    obj_file: BinaryIO | None,
+    texture_img: Image.Image,
+    seam_mask_img: Image.Image | PackedMask | None = None,
+    *,
+    texture_kind: str = "basecolor",  # basecolor | data | normal
+    band_px: int = 8,
+    sample_step_px: float = 2.0,
+    mode: str = "average",  # average | a_to_b | b_to_a
+    mask_threshold: int = 16,
+    only_masked_seams: bool = True,
+    v_flip: bool = True,
+    color_match: str = "meanvar",  # none | meanvar | meanvar_edge | meanvar_chart
+    sampling: str = "splat",  # splat | raster | chain
+    density: str = "fixed",  # fixed | adaptive
+    sample_budget: int = 0,
+    engine: str = "numpy",  # numpy | reference
+    kernel: str = "numpy",  # numpy | numba
+    mesh_format: str = "auto",  # auto | obj | ply | glb | npz
+    seams: MeshSeams | None = None,
+    roi: Sequence[Sequence[float]] | None = None,
+    roi_halo_px: int | None = None,
+) -> RepairState:
+    """
+    Parse the mesh, build seams and sample the seam bands (first half of repair_texture_seams).
+    seam_mask_img may also be a PackedMask already thresholded at the texture size.
+    roi_halo_px: texels sampled around roi, normally _blend_halo_px of the finish
+    parameters (None: ROI_HALO_PX).
+    """
+    if engine not in ENGINES:
+        raise ValueError("engine 必须是 " + " | ".join(ENGINES))
+    if kernel not in KERNELS:
+        raise ValueError("kernel 必须是 " + " | ".join(KERNELS))
+    if roi is not None and engine != "numpy":
+        raise ValueError("roi 仅支持 engine=numpy")
+    if sampling != "splat" and engine != "numpy":
+        raise ValueError(f"sampling={sampling} 仅支持 engine=numpy")
+    if density != "fixed" and engine != "numpy":
+        raise ValueError(f"density={density} 仅支持 engine=numpy")
+    if color_match == "meanvar_chart" and engine != "numpy":
+        raise ValueError("color_match=meanvar_chart 仅支持 engine=numpy")
+    tex_arr = rgba_array(texture_img)
+    if band_px <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return RepairState(
+            tex_arr, texture_kind, empty, np.zeros((0, 3), np.float32), np.zeros(0, np.float32), passthrough=True
+        )
+
+    if seams is None:
+        seams = MeshSeams(load_mesh(obj_file, mesh_format))
+
+    h, w = tex_arr.shape[:2]
+    if roi is not None:
+        return _accumulate_roi(
+            seams,
+            tex_arr,
+            seam_mask_img,
+            roi,
+            texture_kind=texture_kind,
+            band_px=band_px,
+            sample_step_px=sample_step_px,
+            mode=mode,
+            mask_threshold=mask_threshold,
+            only_masked_seams=only_masked_seams,
+            v_flip=v_flip,
+            color_match=color_match,
+            sampling=sampling,
+            density=density,
+            sample_budget=sample_budget,
+            kernel=kernel,
+            halo_px=ROI_HALO_PX if roi_halo_px is None else int(roi_halo_px),
+        )
+    work_rgb = _WorkTexels(tex_arr, texture_kind)[:, :]
+
+    # The reference loops (and 1-pixel images) keep the original scalar path.
+    use_reference = engine == "reference" or w <= 1 or h <= 1
+
+    if seam_mask_img is not None:
+        base_mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold)
+        mask: PackedMask | np.ndarray | None
+        if use_reference:
+            mask = _binary_dilate(base_mask.unpack(), radius=band_px)
+        else:
+            mask = base_mask.dilate(band_px)
+    elif use_reference:
+        mask = np.ones((h, w), dtype=bool)
+    else:
+        mask = None
+
+    acc = np.zeros_like(work_rgb, dtype=np.float32)
+    wacc = np.zeros((h, w), dtype=np.float32)
+    params = dict(
+        has_mask=seam_mask_img is not None,
+        texture_kind=texture_kind,
+        band_px=band_px,
+        sample_step_px=sample_step_px,
+        mode=mode,
+        only_masked_seams=only_masked_seams,
+        v_flip=v_flip,
+        color_match=color_match,
+    )
+    if use_reference:
+        _accumulate_reference(seams.pairs(), work_rgb, mask, acc, wacc, **params)
+    else:
+        index = seams.index if seam_mask_img is not None and only_masked_seams else None
+        _accumulate_numpy(
+            seams.table,
+            work_rgb,
+            mask,
+            _ArraySink(acc, wacc),
+            index=index,
+            sampling=sampling,
+            density=density,
+            sample_budget=sample_budget,
+            chains=seams.chains if sampling == "chain" else None,
+            seam_charts=seams.charts.seam_chart if color_match == "meanvar_chart" else None,
+            kernel=kernel,
+            **params,
+        )
+
+    hit_idx = np.flatnonzero(wacc > 0.0)
+    return RepairState(tex_arr, texture_kind, hit_idx, acc.reshape(-1, 3)[hit_idx], wacc.reshape(-1)[hit_idx])
+
+
+def _accumulate_roi(
+    seams: MeshSeams,
+    tex_arr: np.ndarray,
+    seam_mask_img: Image.Image | PackedMask | None,
+    roi: Sequence[Sequence[float]],
+    *,
+    texture_kind: str,
+    band_px: int,
+    sample_step_px: float,
+    mode: str,
+    mask_threshold: int,
+    only_masked_seams: bool,
+    v_flip: bool,
+    color_match: str,
+    sampling: str,
+    density: str,
+    sample_budget: int,
+    kernel: str,
+    halo_px: int,
+) -> RepairState:
+    """
+    accumulate_seams restricted to a UV region: only seams near the region (spatial
+    index) are sampled, and samples are kept for its bbox plus halo_px only.
+    """
+    h, w = tex_arr.shape[:2]
+    if w <= 1 or h <= 1:
+        raise ValueError("贴图尺寸过小。")
+    empty = RepairState(tex_arr, texture_kind, np.zeros(0, np.int64), np.zeros((0, 3), np.float32), np.zeros(0, np.float32))
+    found = _roi_mask(roi, w, h, v_flip=v_flip)
+    if found is None:
+        return empty
+    region, (y0, y1, x0, x1) = found
+    mask = None
+    if seam_mask_img is not None:
+        mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold).dilate(band_px)
+
+    # samples sit within band_px of their seam edge; splats reach one more texel
+    near = seams.index.query_pixels(y0, y1, x0, x1, w, h, v_flip=v_flip, pad_px=halo_px + band_px + 1)
+    wy0, wy1 = max(y0 - halo_px, 0), min(y1 + halo_px, h)
+    wx0, wx1 = max(x0 - halo_px, 0), min(x1 + halo_px, w)
+    sink = _WindowSink(h, w, (wy0, wy1, wx0, wx1))
+    _accumulate_numpy(
+        seams.table.take(near),
+        _WorkTexels(tex_arr, texture_kind),
+        mask,
+        sink,
+        has_mask=seam_mask_img is not None,
+        texture_kind=texture_kind,
+        band_px=band_px,
+        sample_step_px=sample_step_px,
+        mode=mode,
+        only_masked_seams=only_masked_seams,
+        v_flip=v_flip,
+        color_match=color_match,
+        sampling=sampling,
+        density=density,
+        sample_budget=sample_budget,
+        chains=seams.chains.restrict(near) if sampling == "chain" else None,
+        seam_charts=seams.charts.seam_chart[near] if color_match == "meanvar_chart" else None,
+        kernel=kernel,
+    )
+    hy, hx = np.nonzero(sink.wacc > 0.0)
+    if hy.size == 0:
+        return empty
+    hit_idx = (hy + wy0).astype(np.int64) * w + (hx + wx0)
+    return RepairState(
+        tex_arr,
+        texture_kind,
+        hit_idx,
+        sink.acc[hy, hx],
+        sink.wacc[hy, hx],
+        roi=(y0, y1, x0, x1),
+        roi_mask=region[y0:y1, x0:x1].copy(),
+    )
+
+
+def _finish_roi(
+    state: RepairState,
+    *,
+    feather_px: int,
+    alpha_method: str,
+    alpha_edge_aware: bool,
+    guided_eps: float,
+    poisson_iters: int,
+) -> np.ndarray:
+    """_finish_u8 for region-restricted states: blends a window around the samples and
+    writes only sampled texels inside the region, so nothing outside it changes."""
+    out_u8 = state.texture.copy()
+    h, w = out_u8.shape[:2]
+    hy, hx = np.divmod(state.hit_idx, w)
+    halo = _blend_halo_px(feather_px, alpha_edge_aware, state.texture_kind)
+    by0, by1, bx0, bx1 = int(hy.min()), int(hy.max()) + 1, int(hx.min()), int(hx.max()) + 1
+    wy0, wy1 = max(by0 - halo, 0), min(by1 + halo, h)
+    wx0, wx1 = max(bx0 - halo, 0), min(bx1 + halo, w)
+    hy, hx = hy - wy0, hx - wx0
+    acc = np.zeros((wy1 - wy0, wx1 - wx0, 3), dtype=np.float32)
+    wacc = np.zeros((wy1 - wy0, wx1 - wx0), dtype=np.float32)
+    acc[hy, hx] = state.acc
+    wacc[hy, hx] = state.wacc
+    out = _blend_window(
+        _WorkTexels(state.texture, state.texture_kind)[wy0:wy1, wx0:wx1],
+        acc,
+        wacc,
+        texture_kind=state.texture_kind,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+        hit_bbox=(by0 - wy0, by1 - wy0, bx0 - wx0, bx1 - wx0),
+    )
+    hy, hx = hy + wy0, hx + wx0
+    ry0, ry1, rx0, rx1 = state.roi
+    keep = (hy >= ry0) & (hy < ry1) & (hx >= rx0) & (hx < rx1)
+    keep[keep] = state.roi_mask[hy[keep] - ry0, hx[keep] - rx0]
+    hy, hx = hy[keep], hx[keep]
+    out_u8[hy, hx, :3] = _work_to_u8(out[hy - wy0, hx - wx0], state.texture_kind)
+    return out_u8
+
+
+def _finish_u8(
+    state: RepairState,
+    *,
+    feather_px: int,
+    alpha_method: str,
+    alpha_edge_aware: bool,
+    guided_eps: float,
+    poisson_iters: int,
+) -> np.ndarray:
+    if state.passthrough or (state.roi is not None and state.hit_idx.size == 0):
+        return state.texture.copy()
+    if state.roi is not None:
+        return _finish_roi(
+            state,
+            feather_px=feather_px,
+            alpha_method=alpha_method,
+            alpha_edge_aware=alpha_edge_aware,
+            guided_eps=guided_eps,
+            poisson_iters=poisson_iters,
+        )
+    h, w = state.texture.shape[:2]
+    work_rgb = _WorkTexels(state.texture, state.texture_kind)[:, :]
+    acc = np.zeros((h * w, 3), dtype=np.float32)
+    wacc = np.zeros(h * w, dtype=np.float32)
+    acc[state.hit_idx] = state.acc
+    wacc[state.hit_idx] = state.wacc
+
+    out_work = _blend_window(
+        work_rgb,
+        acc.reshape(h, w, 3),
+        wacc.reshape(h, w),
+        texture_kind=state.texture_kind,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+    )
+
+    out_u8 = state.texture.copy()
+    out_u8[..., :3] = _work_to_u8(out_work, state.texture_kind)
+    return out_u8
+
+
+def finish_repair(
+    state: RepairState,
+    *,
+    feather_px: int = 12,
+    alpha_method: str = "distance",  # distance | wacc
+    alpha_edge_aware: bool = True,
+    guided_eps: float = 1e-4,
+    poisson_iters: int = 0,
+) -> Image.Image:
+    """Blend accumulated samples into the texture (second half of repair_texture_seams)."""
+    out_u8 = _finish_u8(
+        state,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+    )
     return Image.fromarray(out_u8, mode="RGBA")
 
+
+def finish_repair_delta(
+    state: RepairState,
+    *,
+    feather_px: int = 12,
+    alpha_method: str = "distance",  # distance | wacc
+    alpha_edge_aware: bool = True,
+    guided_eps: float = 1e-4,
+    poisson_iters: int = 0,
+) -> bytes:
+    """finish_repair, returned as a texture delta against the input (see encode_texture_delta)."""
+    out_u8 = _finish_u8(
+        state,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+    )
+    return encode_texture_delta(state.texture, out_u8)
+
+
+# Texture delta: only the pixels that differ from the input.
+#   b"SDLT" | u8 version | u8 channels | u16 0 | u32 width | u32 height | u32 count
+#   | zlib( u32 index gaps[count] | u8 values[count * channels] )
+# Indices are flat (y * width + x), stored as gaps to the previous index (the first
+# one absolute), all little-endian.
+DELTA_MAGIC = b"SDLT"
+DELTA_VERSION = 1
+_DELTA_HEADER = struct.Struct("<4sBBHIII")
+
+
+def encode_texture_delta(original: np.ndarray, repaired: np.ndarray) -> bytes:
+    """Delta blob of the pixels where repaired (HxWxC uint8) differs from original."""
+    if original.shape != repaired.shape or original.ndim != 3:
+        raise ValueError(f"delta 需要相同尺寸的 HxWxC 贴图：{original.shape} vs {repaired.shape}")
+    h, w, c = repaired.shape
+    idx = np.flatnonzero(np.any(original != repaired, axis=-1))
+    gaps = np.diff(idx, prepend=0).astype("<u4")
+    vals = repaired.reshape(-1, c)[idx]
+    header = _DELTA_HEADER.pack(DELTA_MAGIC, DELTA_VERSION, c, 0, w, h, idx.size)
+    return header + zlib.compress(gaps.tobytes() + vals.tobytes(), 6)
+
+
+def decode_texture_delta(blob: bytes) -> tuple[tuple[int, int, int], np.ndarray, np.ndarray]:
+    """((H, W, C), flat indices, NxC uint8 values) of a delta blob."""
+    if len(blob) < _DELTA_HEADER.size:
+        raise ValueError("delta 数据不完整。")
+    magic, version, c, _pad, w, h, n = _DELTA_HEADER.unpack_from(blob)
+    if magic != DELTA_MAGIC or version != DELTA_VERSION:
+        raise ValueError("不是可识别的 delta 数据（SDLT v1）。")
+    payload = zlib.decompress(blob[_DELTA_HEADER.size :])
+    if len(payload) != n * (4 + c):
+        raise ValueError("delta 数据长度不符。")
+    idx = np.cumsum(np.frombuffer(payload, dtype="<u4", count=n), dtype=np.int64)
+    vals = np.frombuffer(payload, dtype=np.uint8, offset=n * 4).reshape(n, c)
+    if n and int(idx[-1]) >= w * h:
+        raise ValueError("delta 索引越界。")
+    return (h, w, c), idx, vals
+
+
+def apply_texture_delta(texture: Image.Image | np.ndarray, blob: bytes) -> Image.Image:
+    """Patch the original texture with a delta blob; returns the repaired RGBA (or RGB) image."""
+    (h, w, c), idx, vals = decode_texture_delta(blob)
+    if isinstance(texture, Image.Image):
+        arr = rgba_array(texture) if c == 4 else np.asarray(texture.convert("RGB"))
+    else:
+        arr = np.asarray(texture, dtype=np.uint8)
+    if arr.shape != (h, w, c):
+        raise ValueError(f"delta 尺寸 {w}x{h}x{c} 与贴图 {arr.shape} 不一致。")
+    out = arr.copy()
+    out.reshape(-1, c)[idx] = vals
+    return Image.fromarray(out, mode="RGBA" if c == 4 else "RGB")
+
+
+# Parameters measured in texels; rescaled together with the texture for previews.
+_PIXEL_PARAMS = ("band_px", "feather_px", "roi_halo_px")
+
+
+def preview_texture(texture_img: Image.Image, max_px: int) -> tuple[Image.Image, float]:
+    """
+    Box-downscale texture_img so its longer side is at most max_px.
+    Returns (image, scale); scale is 1.0 (and the image untouched) if it already fits.
+    """
+    w, h = texture_img.size
+    scale = min(1.0, float(max_px) / float(max(w, h, 1)))
+    if scale >= 1.0:
+        return texture_img, 1.0
+    size = (max(2, int(round(w * scale))), max(2, int(round(h * scale))))
+    return texture_img.convert("RGBA").resize(size, Image.BOX), scale
+
+
+def scale_pixel_params(params: dict, scale: float) -> dict:
+    """
+    Rescale texel-sized parameters (band_px, feather_px) for a texture resized by scale.
+    Seams live in UV space, so the seam table itself needs no scaling; sample_step_px
+    stays in texels, which also thins the samples along each seam.
+    """
+    out = dict(params)
+    for name in _PIXEL_PARAMS:
+        if name in out and int(out[name]) > 0:
+            out[name] = max(1, int(round(int(out[name]) * scale)))
+    return out
+
+
+def repair_texture_seams(
+    obj_file: BinaryIO | None,
+    texture_img: Image.Image,
+    seam_mask_img: Image.Image | None = None,
+    *,
+    texture_kind: str = "basecolor",  # basecolor | data | normal
+    band_px: int = 8,
+    sample_step_px: float = 2.0,
+    mode: str = "average",  # average | a_to_b | b_to_a
+    mask_threshold: int = 16,
+    only_masked_seams: bool = True,
+    v_flip: bool = True,
+    feather_px: int = 12,
+    alpha_method: str = "distance",  # distance | wacc
+    alpha_edge_aware: bool = True,
+    guided_eps: float = 1e-4,
+    color_match: str = "meanvar",  # none | meanvar | meanvar_edge | meanvar_chart
+    sampling: str = "splat",  # splat | raster | chain
+    density: str = "fixed",  # fixed | adaptive
+    sample_budget: int = 0,
+    poisson_iters: int = 0,
+    engine: str = "numpy",  # numpy | reference
+    kernel: str = "numpy",  # numpy | numba
+    mesh_format: str = "auto",  # auto | obj | ply | glb | npz
+    seams: MeshSeams | None = None,
+    tile_px: int | None = None,
+    roi: Sequence[Sequence[float]] | None = None,
+    gutter_px: int = 0,
+) -> Image.Image:
+    """
+    Seam-aware texture repair:
+    - Detect UV seam edges from the mesh (shared 3D edges with discontinuous UVs).
+      obj_file may hold OBJ, binary PLY, GLB or NPZ data (see load_mesh).
+    - For selected seams, synchronize a narrow band of pixels across the seam by 3D adjacency mapping.
+
+    engine="reference" runs the original pure-Python loops; it is the golden output
+    that faster engines are checked against (see regression.py).
+    seams: precomputed topology (load_seams); obj_file is then ignored.
+    Equivalent to finish_repair(accumulate_seams(...)).
+
+    tile_px: process tile by tile (numpy engine): samples are binned per destination
+    tile and each touched tile is blended in a window with just enough halo, so the
+    float32 working set is bounded by the tile size instead of the texture size.
+    Poisson blending is then solved per tile (approximation).
+
+    roi: repair only a UV region, given as rectangles [(u0, v0, u1, v1), ...] or a
+    polygon [(u, v), ...]. Only seams near it are sampled, only texels inside it change,
+    and the cost follows the region size (tile_px is not needed and ignored). Colour
+    matching statistics then come from those seams only.
+
+    sampling="raster" (numpy engine) scan-converts each seam band instead of splatting
+    points along it: every band texel is sampled exactly once and sample_step_px is
+    unused. sampling="chain" links seam edges into polylines (MeshSeams.chains) and
+    spaces the points by arc length along each, with inward directions averaged at
+    shared vertices.
+
+    density="adaptive" (numpy engine, splat sampling) sizes each seam's samples and
+    band depth from its texel length and how much the texture changes around it (flat
+    seams get shorter bands and up to 2x sparser samples); sample_budget > 0 caps the
+    total samples x depth of the request.
+
+    kernel="numba" runs the splat loop as a parallel compiled kernel (optional Numba
+    dependency, seam_kernels) in the full-image numpy path; same samples and order,
+    results match up to float rounding. Without Numba, and for tile_px / roi, the
+    NumPy loop runs.
+
+    gutter_px: after the repair, fill texels up to gutter_px outside the UV islands
+    (MeshSeams.texel_map) with their nearest island colour, so mipmaps do not bleed in
+    the background. Not combinable with roi.
+    """
+    if engine not in ENGINES:
+        raise ValueError("engine 必须是 " + " | ".join(ENGINES))
+    if kernel not in KERNELS:
+        raise ValueError("kernel 必须是 " + " | ".join(KERNELS))
+    if gutter_px > 0 and roi is not None:
+        raise ValueError("gutter_px 不能与 roi 同时使用")
+    if band_px <= 0 and gutter_px <= 0:
+        return texture_img.copy()
+    if gutter_px > 0 and seams is None:
+        seams = load_seams(obj_file, mesh_format)
+    if band_px <= 0:
+        arr = rgba_array(texture_img).copy()
+    elif tile_px is not None and roi is None:
+        if engine != "numpy":
+            raise ValueError("tile_px 分块处理仅支持 engine=numpy")
+        if tile_px <= 0:
+            raise ValueError("tile_px 必须大于 0")
+        if seams is None:
+            seams = load_seams(obj_file, mesh_format)
+        arr = rgba_array(texture_img).copy()
+        h, w = arr.shape[:2]
+        mask = None
+        if seam_mask_img is not None:
+            mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold).dilate(band_px)
+        _repair_tiled(
+            seams.table,
+            arr,
+            arr,
+            mask,
+            tile_px=int(tile_px),
+            defer_writes=True,
+            has_mask=seam_mask_img is not None,
+            texture_kind=texture_kind,
+            band_px=band_px,
+            sample_step_px=sample_step_px,
+            mode=mode,
+            only_masked_seams=only_masked_seams,
+            v_flip=v_flip,
+            color_match=color_match,
+            sampling=sampling,
+            density=density,
+            sample_budget=sample_budget,
+            feather_px=feather_px,
+            alpha_method=alpha_method,
+            alpha_edge_aware=alpha_edge_aware,
+            guided_eps=guided_eps,
+            poisson_iters=poisson_iters,
+            renormalize_all=texture_kind == "normal",
+            index=seams.index if mask is not None and only_masked_seams else None,
+            chains=seams.chains if sampling == "chain" else None,
+            seam_charts=seams.charts.seam_chart if color_match == "meanvar_chart" else None,
+        )
+    else:
+        state = accumulate_seams(
+            obj_file,
+            texture_img,
+            seam_mask_img,
+            texture_kind=texture_kind,
+            band_px=band_px,
+            sample_step_px=sample_step_px,
+            mode=mode,
+            mask_threshold=mask_threshold,
+            only_masked_seams=only_masked_seams,
+            v_flip=v_flip,
+            color_match=color_match,
+            sampling=sampling,
+            density=density,
+            sample_budget=sample_budget,
+            engine=engine,
+            kernel=kernel,
+            mesh_format=mesh_format,
+            seams=seams,
+            roi=roi,
+            roi_halo_px=_blend_halo_px(feather_px, alpha_edge_aware, texture_kind),
+        )
+        arr = _finish_u8(
+            state,
+            feather_px=feather_px,
+            alpha_method=alpha_method,
+            alpha_edge_aware=alpha_edge_aware,
+            guided_eps=guided_eps,
+            poisson_iters=poisson_iters,
+        )
+        del state
+    if gutter_px > 0:
+        h, w = arr.shape[:2]
+        _fill_uv_gutter(arr, seams.texel_map(w, h, v_flip=v_flip).covered, int(gutter_px))
+    return Image.fromarray(arr, mode="RGBA")
+
+
+# Seams whose mean step is at most this (8-bit levels, degrees for normal maps) are
+# clean in analyze_seams.
+CLEAN_THRESHOLD = 3.0
+
+
+def analyze_seams(
+    obj_file: BinaryIO | None,
+    texture: Image.Image | np.ndarray,
+    seam_mask_img: Image.Image | None = None,
+    *,
+    texture_kind: str = "basecolor",  # basecolor | data | normal
+    sample_step_px: float = 2.0,
+    mask_threshold: int = 16,
+    only_masked_seams: bool = True,
+    v_flip: bool = True,
+    mesh_format: str = "auto",
+    seams: MeshSeams | None = None,
+    clean_threshold: float = CLEAN_THRESHOLD,
+    max_band_px: int = 32,
+    worst: int = 10,
+    per_seam: bool = False,
+) -> dict:
+    """
+    Measure the discontinuity across the seams without repairing anything: the texels
+    one pixel inside side A and side B are compared at points along every seam, in
+    8-bit levels of the stored encoding (angle in degrees for normal maps).
+
+    Returns a JSON-ready report: length-weighted mean / p95 / max error, the worst
+    seams, clean (no seam above clean_threshold) and suggested_band_px, the band over
+    which the step changes no faster per texel than the texture already does next to
+    the seam (90th percentile over the dirty seams, 0 when clean).
+    texture: PIL image or HxWxC uint8 array (e.g. open_texture_memmap).
+    per_seam adds per-seam lists (seam = row of MeshSeams.table).
+    """
+    if texture_kind not in ("basecolor", "data", "normal"):
+        raise ValueError("texture_kind 必须是 basecolor | data | normal")
+    tex = rgba_array(texture) if isinstance(texture, Image.Image) else texture
+    h, w = int(tex.shape[0]), int(tex.shape[1])
+    if w <= 1 or h <= 1:
+        raise ValueError("贴图尺寸过小。")
+    if seams is None:
+        seams = MeshSeams(load_mesh(obj_file, mesh_format))
+    normal = texture_kind == "normal"
+    texels = _WorkTexels(tex, "normal" if normal else "data")
+
+    table = seams.table
+    ids = np.arange(table.count)
+    if seam_mask_img is not None and only_masked_seams and table.count:
+        # small slack: masks are painted roughly along the seam
+        mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold).dilate(2)
+        ids = _select_seams_vec(table, mask, w, h, v_flip=v_flip, index=seams.index)
+        table = table.take(ids)
+    n = table.count
+
+    scale_px = np.array([w - 1, h - 1], dtype=np.float32)
+    dir_a_px = _dir_px_vec(_inward_dir_vec(table.a0, table.a1, table.a2), scale_px)
+    dir_b_px = _dir_px_vec(_inward_dir_vec(table.b0, table.b1, table.b2), scale_px)
+    len_a = np.linalg.norm((table.a1 - table.a0) * scale_px, axis=1)
+    len_b = np.linalg.norm((table.b1 - table.b0) * scale_px, axis=1)
+    length = np.maximum(len_a, len_b).astype(np.float64)
+    n_samples = np.maximum(8, (length / max(0.5, float(sample_step_px))).astype(np.int64))
+    mean, err_max, grad = _seam_steps(table, texels, dir_a_px, dir_b_px, n_samples, normal=normal, v_flip=v_flip)
+    need = _step_band_px(mean, grad, max(2, int(max_band_px)))
+    dirty = mean > float(clean_threshold)
+    suggested = 0
+    if np.any(dirty):
+        order = np.argsort(need[dirty], kind="stable")
+        cum = np.cumsum(length[dirty][order] + 1e-9)
+        suggested = int(need[dirty][order][np.searchsorted(cum, 0.9 * cum[-1])])
+
+    def r3(x: float) -> float:
+        return round(float(x), 3)
+
+    report: dict = {
+        "texture_kind": texture_kind,
+        "unit": "degrees" if normal else "levels",
+        "width": w,
+        "height": h,
+        "seams": seams.table.count,
+        "measured": n,
+        "mean_error": r3(np.sum(mean * length) / max(float(np.sum(length)), 1e-9)),
+        "p95_error": r3(np.percentile(mean, 95)) if n else 0.0,
+        "max_error": r3(err_max.max()) if n else 0.0,
+        "dirty_seams": int(np.count_nonzero(dirty)),
+        "clean_threshold": float(clean_threshold),
+        "clean": not bool(np.any(dirty)),
+        "suggested_band_px": suggested,
+        "worst": [
+            {
+                "seam": int(ids[i]),
+                "mean_error": r3(mean[i]),
+                "max_error": r3(err_max[i]),
+                "length_px": r3(length[i]),
+                "band_px": int(need[i]),
+                "uv_a": [table.a0[i].tolist(), table.a1[i].tolist()],
+                "uv_b": [table.b0[i].tolist(), table.b1[i].tolist()],
+            }
+            for i in np.argsort(-mean, kind="stable")[: max(0, int(worst))]
+        ],
+    }
+    if per_seam:
+        report["per_seam"] = {
+            "seam": ids.tolist(),
+            "mean_error": np.round(mean, 3).tolist(),
+            "max_error": np.round(err_max, 3).tolist(),
+            "length_px": np.round(length, 3).tolist(),
+        }
+    return report
+
+
+def _blend_halo_px(feather_px: int, alpha_edge_aware: bool, texture_kind: str) -> int:
+    """Halo a window needs so its core blends exactly as in a full-image pass."""
+    halo = max(0, int(feather_px)) + 2
+    if feather_px > 0 and alpha_edge_aware and texture_kind != "normal":
+        # guided filter: two box filters of radius r over alpha
+        halo += 2 * max(1, int(feather_px)) + 2
+    return halo
+
+
+def roi_halo_px(feather_px: int, alpha_edge_aware: bool, texture_kind: str) -> int:
+    """accumulate_seams(roi_halo_px=...) for a state finished with these parameters."""
+    return _blend_halo_px(feather_px, alpha_edge_aware, texture_kind)
+
+
+def _repair_tiled(
+    seams: _SeamTable,
+    src: np.ndarray,
+    dst: np.ndarray,
+    mask: PackedMask | None,
+    *,
+    tile_px: int,
+    defer_writes: bool,
+    has_mask: bool,
+    texture_kind: str,
+    band_px: int,
+    sample_step_px: float,
+    mode: str,
+    only_masked_seams: bool,
+    v_flip: bool,
+    color_match: str,
+    sampling: str,
+    density: str,
+    sample_budget: int,
+    feather_px: int,
+    alpha_method: str,
+    alpha_edge_aware: bool,
+    guided_eps: float,
+    poisson_iters: int,
+    renormalize_all: bool = False,
+    side_bounds: np.ndarray | None = None,
+    regions: list[tuple[int, int, int, int]] | None = None,
+    index: SeamIndex | None = None,
+    chains: _SeamChains | None = None,
+    seam_charts: np.ndarray | None = None,
+) -> dict[str, int]:
+    """
+    Sparse repair of a uint8 HxWxC texture: texels are read (and converted) only where
+    sampled or inside a processed tile window, splats land in per-tile buffers, and only
+    pixels whose value changes are written to dst. Untouched tiles are never read.
+
+    Poisson blending, when enabled, is solved per tile window (approximation).
+    defer_writes must be set when dst aliases src, so later windows still read the input.
+    renormalize_all also re-encodes untouched texels (tile by tile), matching the
+    full-image pass for normal maps, which re-normalizes every texel.
+    regions: (y0, y1, x0, x1) rectangles blended as independent images (UDIM tiles of a
+    mosaic); texels outside them are left alone. Default: the whole texture.
+    chains: seam chains of seams for sampling="chain" (built here when missing);
+    seam_charts: chart ids of seams for color_match="meanvar_chart".
+    """
+    h, w = int(src.shape[0]), int(src.shape[1])
+    if w <= 1 or h <= 1:
+        raise ValueError("贴图尺寸过小。")
+    texels = _WorkTexels(src, texture_kind)
+    sink = _TileSink(h, w, tile_px)
+    _accumulate_numpy(
+        seams,
+        texels,
+        mask,
+        sink,
+        has_mask=has_mask,
+        texture_kind=texture_kind,
+        band_px=band_px,
+        sample_step_px=sample_step_px,
+        mode=mode,
+        only_masked_seams=only_masked_seams,
+        v_flip=v_flip,
+        color_match=color_match,
+        sampling=sampling,
+        density=density,
+        sample_budget=sample_budget,
+        side_bounds=side_bounds,
+        index=index,
+        chains=chains,
+        seam_charts=seam_charts,
+    )
+
+    halo = _blend_halo_px(feather_px, alpha_edge_aware, texture_kind)
+    reach = -(-halo // sink.tile_px)
+    todo: set[tuple[int, int]] = set()
+    for ty, tx in sink.tiles:
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                if 0 <= ty + dy < sink.nty and 0 <= tx + dx < sink.ntx:
+                    todo.add((ty + dy, tx + dx))
+
+    tp = sink.tile_px
+    pending: list[tuple[int, int, np.ndarray, np.ndarray]] = []
+    n_tiles = 0
+    n_written = 0
+    for ry0, ry1, rx0, rx1 in regions or [(0, h, 0, w)]:
+        bbox = sink.hit_bbox((ry0, ry1, rx0, rx1))
+        for ty in range(ry0 // tp, (ry1 - 1) // tp + 1):
+            for tx in range(rx0 // tp, (rx1 - 1) // tp + 1):
+                if not renormalize_all and (ty, tx) not in todo:
+                    continue
+                # core = this sink tile clipped to the region; windows never leave the region
+                y0, y1 = max(ty * tp, ry0), min((ty + 1) * tp, ry1)
+                x0, x1 = max(tx * tp, rx0), min((tx + 1) * tp, rx1)
+                out_core = None
+                if bbox is not None and (ty, tx) in todo:
+                    wy0, wy1 = max(y0 - halo, ry0), min(y1 + halo, ry1)
+                    wx0, wx1 = max(x0 - halo, rx0), min(x1 + halo, rx1)
+                    acc, wacc = sink.window(wy0, wy1, wx0, wx1)
+                    if np.any(wacc > 0.0):
+                        n_tiles += 1
+                        work = texels[wy0:wy1, wx0:wx1]
+                        out = _blend_window(
+                            work,
+                            acc,
+                            wacc,
+                            texture_kind=texture_kind,
+                            feather_px=feather_px,
+                            alpha_method=alpha_method,
+                            alpha_edge_aware=alpha_edge_aware,
+                            guided_eps=guided_eps,
+                            poisson_iters=poisson_iters,
+                            hit_bbox=(bbox[0] - wy0, bbox[1] - wy0, bbox[2] - wx0, bbox[3] - wx0),
+                        )
+                        core = (slice(y0 - wy0, y1 - wy0), slice(x0 - wx0, x1 - wx0))
+                        out_core, work_core = out[core], work[core]
+                if renormalize_all:
+                    u8 = _work_to_u8(texels[y0:y1, x0:x1] if out_core is None else out_core, texture_kind)
+                    changed = np.any(u8 != src[y0:y1, x0:x1, :3], axis=-1)
+                    vals = u8[changed]
+                elif out_core is not None:
+                    changed = np.any(out_core != work_core, axis=-1)
+                    vals = _work_to_u8(out_core[changed], texture_kind)
+                else:
+                    continue
+                if not np.any(changed):
+                    continue
+                n_written += int(vals.shape[0])
+                if defer_writes:
+                    pending.append((y0, x0, changed, vals))
+                else:
+                    dst[y0:y1, x0:x1, :3][changed] = vals
+
+    for y0, x0, changed, vals in pending:
+        dst[y0 : y0 + changed.shape[0], x0 : x0 + changed.shape[1], :3][changed] = vals
+    return {"seams": seams.count, "tiles": n_tiles, "pixels_written": n_written}
+
+
+def repair_texture_file(
+    obj_file: BinaryIO | None,
+    texture_path: str | Path,
+    output_path: str | Path | None = None,
+    seam_mask_img: Image.Image | None = None,
+    *,
+    raw_shape: tuple[int, int, int] | None = None,
+    tile_px: int = 1024,
+    texture_kind: str = "basecolor",  # basecolor | data | normal
+    band_px: int = 8,
+    sample_step_px: float = 2.0,
+    mode: str = "average",  # average | a_to_b | b_to_a
+    mask_threshold: int = 16,
+    only_masked_seams: bool = True,
+    v_flip: bool = True,
+    feather_px: int = 12,
+    alpha_method: str = "distance",  # distance | wacc
+    alpha_edge_aware: bool = True,
+    guided_eps: float = 1e-4,
+    color_match: str = "meanvar",  # none | meanvar | meanvar_edge | meanvar_chart
+    sampling: str = "splat",  # splat | raster | chain
+    density: str = "fixed",  # fixed | adaptive
+    sample_budget: int = 0,
+    poisson_iters: int = 0,
+    mesh_format: str = "auto",  # auto | obj | ply | glb | npz
+    seams: MeshSeams | None = None,
+) -> dict[str, int]:
+    """
+    Memory-mapped seam repair for huge atlases stored uncompressed (.npy, .raw/.bin with
+    raw_shape=(H, W, C), or uncompressed TIFF). The input is mapped with np.memmap, the
+    seam ROIs are processed tile by tile, and changed pixels are written through a
+    memory-mapped output (a copy of the input file, or the input itself when
+    output_path is None). Same options as repair_texture_seams (numpy engine).
+    """
+    if mode not in ("average", "a_to_b", "b_to_a"):
+        raise ValueError("mode 必须是 average | a_to_b | b_to_a")
+    if alpha_method not in ("distance", "wacc"):
+        raise ValueError("alpha_method 必须是 distance | wacc")
+    src = open_texture_memmap(texture_path, "r", raw_shape=raw_shape)
+    if band_px <= 0:
+        if output_path is not None:
+            open_output_memmap(texture_path, output_path, raw_shape=raw_shape)
+        return {"seams": 0, "tiles": 0, "pixels_written": 0}
+
+    if seams is None:
+        seams = load_seams(obj_file, mesh_format)
+    h, w = int(src.shape[0]), int(src.shape[1])
+    mask = None
+    if seam_mask_img is not None:
+        mask = _mask_from_image(seam_mask_img, w, h, threshold=mask_threshold).dilate(band_px)
+
+    in_place = output_path is None or Path(output_path).resolve() == Path(texture_path).resolve()
+    dst = open_output_memmap(texture_path, output_path, raw_shape=raw_shape)
+    if in_place:
+        src = dst
+    stats = _repair_tiled(
+        seams.table,
+        src,
+        dst,
+        mask,
+        tile_px=tile_px,
+        defer_writes=in_place,
+        has_mask=seam_mask_img is not None,
+        texture_kind=texture_kind,
+        band_px=band_px,
+        sample_step_px=sample_step_px,
+        mode=mode,
+        only_masked_seams=only_masked_seams,
+        v_flip=v_flip,
+        color_match=color_match,
+        sampling=sampling,
+        density=density,
+        sample_budget=sample_budget,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+        index=seams.index if mask is not None and only_masked_seams else None,
+        chains=seams.chains if sampling == "chain" else None,
+        seam_charts=seams.charts.seam_chart if color_match == "meanvar_chart" else None,
+    )
+    if isinstance(dst, np.memmap):
+        dst.flush()
+    return stats
+
+
+def udim_tiles(uv: np.ndarray) -> np.ndarray:
+    """UDIM tile number (1001 + u_tile + 10 * v_tile) of Nx2 UV points."""
+    t = np.floor(np.asarray(uv, dtype=np.float64)).astype(np.int64)
+    if np.any((t[:, 0] < 0) | (t[:, 0] > 9) | (t[:, 1] < 0)):
+        raise ValueError("UV 超出 UDIM 范围（需要 0 <= u < 10，v >= 0）。")
+    return 1001 + t[:, 0] + 10 * t[:, 1]
+
+
+@dataclass(frozen=True)
+class _UdimLayout:
+    """
+    Virtual mosaic of the touched UDIM tiles (all w x h), each framed by a gutter of
+    edge-replicated texels so reads and blend windows never cross into another tile.
+    """
+
+    tiles: tuple[int, ...]
+    w: int
+    h: int
+    gutter: int
+    ncol: int
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        nrow = -(-len(self.tiles) // self.ncol)
+        return nrow * (self.h + 2 * self.gutter), self.ncol * (self.w + 2 * self.gutter)
+
+    def origin(self, tile: int) -> tuple[int, int]:
+        """(y, x) of the tile's first texel in the mosaic."""
+        r, c = divmod(self.tiles.index(tile), self.ncol)
+        return r * (self.h + 2 * self.gutter) + self.gutter, c * (self.w + 2 * self.gutter) + self.gutter
+
+    def to_mosaic_uv(self, uv: np.ndarray, tile: np.ndarray, *, v_flip: bool) -> np.ndarray:
+        """Tile UVs (Nx2, with their UDIM numbers) -> UVs of the same texels in the mosaic."""
+        mh, mw = self.shape
+        oy = np.zeros(len(tile), dtype=np.float64)
+        ox = np.zeros(len(tile), dtype=np.float64)
+        for t in np.unique(tile):
+            sel = tile == t
+            oy[sel], ox[sel] = self.origin(int(t))
+        local = np.asarray(uv, dtype=np.float64) - np.stack([(tile - 1001) % 10, (tile - 1001) // 10], axis=1)
+        x = ox + local[:, 0] * float(self.w - 1)
+        y = oy + ((1.0 - local[:, 1]) if v_flip else local[:, 1]) * float(self.h - 1)
+        u2 = x / float(mw - 1)
+        v2 = y / float(mh - 1)
+        return np.stack([u2, (1.0 - v2) if v_flip else v2], axis=1).astype(np.float32)
+
+
+def _open_tile(src: str | Path | Image.Image) -> Image.Image:
+    return src if isinstance(src, Image.Image) else Image.open(src)
+
+
+def repair_udim_textures(
+    obj_file: BinaryIO | None,
+    textures: Mapping[int, str | Path | Image.Image],
+    seam_masks: Mapping[int, str | Path | Image.Image] | None = None,
+    *,
+    tile_px: int = 1024,
+    texture_kind: str = "basecolor",  # basecolor | data | normal
+    band_px: int = 8,
+    sample_step_px: float = 2.0,
+    mode: str = "average",  # average | a_to_b | b_to_a
+    mask_threshold: int = 16,
+    only_masked_seams: bool = True,
+    v_flip: bool = True,
+    feather_px: int = 12,
+    alpha_method: str = "distance",  # distance | wacc
+    alpha_edge_aware: bool = True,
+    guided_eps: float = 1e-4,
+    color_match: str = "meanvar",  # none | meanvar | meanvar_edge | meanvar_chart
+    sampling: str = "splat",  # splat | raster | chain
+    density: str = "fixed",  # fixed | adaptive
+    sample_budget: int = 0,
+    poisson_iters: int = 0,
+    mesh_format: str = "auto",  # auto | obj | ply | glb | npz
+    seams: MeshSeams | None = None,
+    stats: dict[str, Any] | None = None,
+) -> dict[int, Image.Image]:
+    """
+    Seam repair for UDIM texture sets: textures maps tile numbers (1001...) to images
+    or paths. Each seam side is routed to the tile its triangle lies in (centroid, so an
+    edge on the tile border u=1 / v=1 stays in its tile), so seams between tiles read
+    from one tile and write into the other. Only tiles touched by a seam are opened; the
+    result holds just those tiles (others are unchanged).
+    Seams with a side in a tile without a texture are skipped with a warning; stats, when
+    given, receives dropped_seams and missing_tiles.
+    Runs the tiled numpy pipeline (see repair_texture_seams tile_px).
+    """
+    if mode not in ("average", "a_to_b", "b_to_a"):
+        raise ValueError("mode 必须是 average | a_to_b | b_to_a")
+    if band_px <= 0:
+        return {}
+    if seams is None:
+        seams = load_seams(obj_file, mesh_format)
+    table = seams.table
+    tile_a = udim_tiles((table.a0 + table.a1 + table.a2) / 3.0)
+    tile_b = udim_tiles((table.b0 + table.b1 + table.b2) / 3.0)
+    # seams into tiles without a texture cannot be repaired
+    keep = np.isin(tile_a, list(textures)) & np.isin(tile_b, list(textures))
+    missing = sorted(int(t) for t in np.setdiff1d(np.concatenate([tile_a, tile_b]), list(textures)))
+    if stats is not None:
+        stats["dropped_seams"] = int(np.count_nonzero(~keep))
+        stats["missing_tiles"] = missing
+    if not np.all(keep):
+        warnings.warn(f"{int(np.count_nonzero(~keep))} 条 seam 落在没有贴图的 UDIM tile {missing}，已跳过。", stacklevel=2)
+    if not np.any(keep):
+        return {}
+    table, tile_a, tile_b = table.take(np.nonzero(keep)[0]), tile_a[keep], tile_b[keep]
+    seam_charts = seams.charts.seam_chart[keep] if color_match == "meanvar_chart" else None
+
+    touched = tuple(int(t) for t in np.unique(np.concatenate([tile_a, tile_b])))
+    images = {t: _open_tile(textures[t]) for t in touched}
+    sizes = {im.size for im in images.values()}
+    if len(sizes) != 1:
+        raise ValueError(f"UDIM 贴图尺寸需要一致：{sorted(sizes)}")
+    (w, h), = sizes
+    # edge-padded gutter wide enough that sampling and blending never see a neighbouring tile
+    gutter = band_px + _blend_halo_px(feather_px, alpha_edge_aware, texture_kind) + 2
+    layout = _UdimLayout(touched, w, h, gutter, ncol=int(np.ceil(np.sqrt(len(touched)))))
+
+    # per-side tile rectangle in mosaic texels (small slack for float32 UV round-off)
+    side_bounds = np.zeros((2, table.count, 4), dtype=np.float64)
+    for k, tiles in enumerate((tile_a, tile_b)):
+        for t in touched:
+            oy, ox = layout.origin(t)
+            side_bounds[k, tiles == t] = (ox - 1e-3, ox + w - 1 + 1e-3, oy - 1e-3, oy + h - 1 + 1e-3)
+
+    sides = ((table.a0, tile_a), (table.a1, tile_a), (table.a2, tile_a), (table.b0, tile_b), (table.b1, tile_b), (table.b2, tile_b))
+    mosaic_table = _SeamTable(*(layout.to_mosaic_uv(uv, tile, v_flip=v_flip) for uv, tile in sides))
+
+    mh, mw = layout.shape
+    pad = ((gutter, gutter), (gutter, gutter))
+    mosaic = np.zeros((mh, mw, 4), dtype=np.uint8)
+    for t, im in images.items():
+        oy, ox = layout.origin(t)
+        tile_arr = rgba_array(im)
+        mosaic[oy - gutter : oy + h + gutter, ox - gutter : ox + w + gutter] = np.pad(tile_arr, pad + ((0, 0),), mode="edge")
+
+    mask = None
+    if seam_masks is not None:
+        mask = PackedMask.zeros(mh, mw)
+        for t in touched:
+            if t in seam_masks:
+                oy, ox = layout.origin(t)
+                m = _mask_from_image(_open_tile(seam_masks[t]), w, h, threshold=mask_threshold)
+                mask.set_block(oy - gutter, ox - gutter, np.pad(m.unpack(), pad, mode="edge"))
+        mask = mask.dilate(band_px)
+
+    _repair_tiled(
+        mosaic_table,
+        mosaic,
+        mosaic,
+        mask,
+        tile_px=int(tile_px),
+        defer_writes=True,
+        has_mask=seam_masks is not None,
+        texture_kind=texture_kind,
+        band_px=band_px,
+        sample_step_px=sample_step_px,
+        mode=mode,
+        only_masked_seams=only_masked_seams,
+        v_flip=v_flip,
+        color_match=color_match,
+        sampling=sampling,
+        density=density,
+        sample_budget=sample_budget,
+        feather_px=feather_px,
+        alpha_method=alpha_method,
+        alpha_edge_aware=alpha_edge_aware,
+        guided_eps=guided_eps,
+        poisson_iters=poisson_iters,
+        renormalize_all=texture_kind == "normal",
+        side_bounds=side_bounds,
+        regions=[(oy, oy + h, ox, ox + w) for oy, ox in map(layout.origin, touched)],
+        seam_charts=seam_charts,
+    )
+
+    out: dict[int, Image.Image] = {}
+    for t in touched:
+        oy, ox = layout.origin(t)
+        out[t] = Image.fromarray(np.ascontiguousarray(mosaic[oy : oy + h, ox : ox + w]), mode="RGBA")
+    return out
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Production launcher: one HTTP process plus N pre-started compute workers
+    (SEAM_COMPUTE_WORKERS, see worker_pool.ComputePool).
+    """
+    ap = argparse.ArgumentParser(description="WebSeamRepair 生产模式启动（HTTP 进程 + 计算进程池）")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8008)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="计算进程数（默认 CPU 核数）")
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args(argv)
+
+    os.environ["SEAM_COMPUTE_WORKERS"] = str(max(1, args.workers))
+    import uvicorn
+
+    uvicorn.run("main:app", host=args.host, port=args.port, log_level=args.log_level)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from seam_repair import RepairState
+
+
+class SessionStore:
+    """
+    Keeps RepairState (accumulated seam samples) per session id, so requests that only
+    change finishing parameters skip parsing and sampling. LRU bounded by max_bytes;
+    sessions idle for longer than ttl_s are dropped.
+    """
+
+    def __init__(self, max_bytes: int, ttl_s: float) -> None:
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = float(ttl_s)
+        self._states: OrderedDict[str, tuple[RepairState, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, sid: str) -> None:
+        state, _t = self._states.pop(sid)
+        self._size -= state.nbytes
+
+    def _expire(self, now: float) -> None:
+        while self._states:
+            sid, (_state, t) = next(iter(self._states.items()))
+            if now - t <= self.ttl_s:
+                break
+            self._drop(sid)
+
+    def get(self, sid: str) -> RepairState | None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            item = self._states.get(sid)
+            if item is None:
+                return None
+            self._states[sid] = (item[0], now)
+            self._states.move_to_end(sid)
+            return item[0]
+
+    def put(self, sid: str, state: RepairState) -> None:
+        if state.nbytes > self.max_bytes:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if sid in self._states:
+                self._drop(sid)
+            self._states[sid] = (state, now)
+            self._size += state.nbytes
+            self._expire(now)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._states)))
+
+    def discard(self, sid: str) -> bool:
+        with self._lock:
+            if sid not in self._states:
+                return False
+            self._drop(sid)
+            return True
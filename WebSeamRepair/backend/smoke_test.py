@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 import io
+import json
+import struct
 
 import numpy as np
 from PIL import Image
 
-from seam_repair import repair_texture_seams
+from mesh_io import MeshData
+from regression import make_cube_obj, make_texture
+from seam_repair import (
+    MeshSeams,
+    accumulate_seams,
+    apply_texture_delta,
+    decode_texture_delta,
+    encode_texture_delta,
+    finish_repair,
+    finish_repair_delta,
+    load_mesh,
+    repair_texture_seams,
+    repair_udim_textures,
+)
 
 
 def main() -> None:
@@ -52,6 +67,169 @@ f 1/5 3/6 4/4
     out.save(out_path)
     print(f"[ok] wrote {out_path}")
 
+    check_texture_delta(obj, tex)
+    check_mesh_formats()
+    check_obj_index_errors()
+    check_udim_tile_border()
+
+
+def check_texture_delta(obj: bytes, tex: Image.Image) -> None:
+    finish = dict(feather_px=4, alpha_method="distance", poisson_iters=0)
+    state = accumulate_seams(io.BytesIO(obj), tex, band_px=6, only_masked_seams=False)
+    blob = finish_repair_delta(state, **finish)
+    full = np.asarray(finish_repair(state, **finish))
+    assert np.array_equal(np.asarray(apply_texture_delta(tex, blob)), full)
+    (h, w, c), idx, _vals = decode_texture_delta(blob)
+    assert (h, w, c) == (tex.size[1], tex.size[0], 4) and idx.size > 0
+
+    # band_px=0 leaves the texture untouched: an empty delta
+    empty = finish_repair_delta(accumulate_seams(io.BytesIO(obj), tex, band_px=0), **finish)
+    assert decode_texture_delta(empty)[1].size == 0
+    assert np.array_equal(np.asarray(apply_texture_delta(tex, empty)), np.asarray(tex))
+
+    # RGB deltas patch RGB images; a channel mismatch is rejected
+    rgb = np.asarray(tex.convert("RGB"))
+    rgb_full = full[..., :3].copy()
+    rgb_blob = encode_texture_delta(rgb, rgb_full)
+    assert decode_texture_delta(rgb_blob)[0][2] == 3
+    out = apply_texture_delta(tex.convert("RGB"), rgb_blob)
+    assert out.mode == "RGB" and np.array_equal(np.asarray(out), rgb_full)
+    assert np.array_equal(np.asarray(apply_texture_delta(rgb, rgb_blob)), rgb_full)
+    for bad_tex, bad_blob in ((rgb, blob), (np.asarray(tex), rgb_blob)):
+        try:
+            apply_texture_delta(bad_tex, bad_blob)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("delta channel mismatch accepted")
+
+    # bad magic / version
+    for bad in (b"XDLT" + blob[4:], blob[:4] + bytes([99]) + blob[5:], blob[:10]):
+        try:
+            decode_texture_delta(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("bad delta header accepted")
+    print("[ok] texture delta round-trips (RGBA, RGB, empty)")
+
+
+def _ply_bytes(mesh: MeshData, bo: str) -> bytes:
+    order = "binary_little_endian" if bo == "<" else "binary_big_endian"
+    header = (
+        f"ply\nformat {order} 1.0\nelement vertex {mesh.positions.shape[0]}\n"
+        "property float x\nproperty float y\nproperty float z\nproperty float s\nproperty float t\n"
+        f"element face {mesh.tri_v.shape[0]}\nproperty list uchar int vertex_indices\nend_header\n"
+    )
+    vert = np.zeros(mesh.positions.shape[0], dtype=[(n, bo + "f4") for n in "xyzst"])
+    for i, n in enumerate("xyz"):
+        vert[n] = mesh.positions[:, i]
+    vert["s"], vert["t"] = mesh.uvs[:, 0], mesh.uvs[:, 1]
+    face = np.zeros(mesh.tri_v.shape[0], dtype=[("n", "u1"), ("idx", bo + "i4", (3,))])
+    face["n"], face["idx"] = 3, mesh.tri_v
+    return header.encode("ascii") + vert.tobytes() + face.tobytes()
+
+
+def _glb_bytes(mesh: MeshData) -> bytes:
+    # glTF UVs start at the top-left: v is flipped on write and back on load
+    uv = np.stack([mesh.uvs[:, 0], 1.0 - mesh.uvs[:, 1]], axis=1)
+    parts = [mesh.positions.astype("<f4"), uv.astype("<f4"), mesh.tri_v.reshape(-1).astype("<u4")]
+    views, accessors, offset = [], [], 0
+    for i, (arr, kind, ct) in enumerate(zip(parts, ("VEC3", "VEC2", "SCALAR"), (5126, 5126, 5125))):
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": arr.nbytes})
+        accessors.append({"bufferView": i, "componentType": ct, "count": arr.shape[0], "type": kind})
+        offset += arr.nbytes
+    doc = {
+        "asset": {"version": "2.0"},
+        "buffers": [{"byteLength": offset}],
+        "bufferViews": views,
+        "accessors": accessors,
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0, "TEXCOORD_0": 1}, "indices": 2}]}],
+    }
+    js = json.dumps(doc).encode("utf-8")
+    js += b" " * (-len(js) % 4)
+    bin_ = b"".join(a.tobytes() for a in parts)
+    bin_ += b"\0" * (-len(bin_) % 4)
+    body = struct.pack("<II", len(js), 0x4E4F534A) + js + struct.pack("<II", len(bin_), 0x004E4942) + bin_
+    return struct.pack("<4sII", b"glTF", 2, 12 + len(body)) + body
+
+
+def check_mesh_formats() -> None:
+    # The regression cube written as binary PLY (both byte orders), GLB and NPZ must
+    # give the same seams and the same repair as the OBJ it came from.
+    obj = make_cube_obj(4)
+    tex = make_texture(96, seed=1)
+    mesh = load_mesh(io.BytesIO(obj))
+    npz = io.BytesIO()
+    np.savez(npz, positions=mesh.positions, uvs=mesh.uvs, indices=mesh.tri_v)
+    files = {
+        "ply_le": _ply_bytes(mesh, "<"),
+        "ply_be": _ply_bytes(mesh, ">"),
+        "glb": _glb_bytes(mesh),
+        "npz": npz.getvalue(),
+    }
+    params = dict(band_px=6, feather_px=4, only_masked_seams=False)
+    ref_count = MeshSeams(mesh).table.count
+    ref = np.asarray(repair_texture_seams(io.BytesIO(obj), tex, **params))
+    assert ref_count > 0
+    for name, data in files.items():
+        count = MeshSeams(load_mesh(io.BytesIO(data))).table.count
+        assert count == ref_count, (name, count, ref_count)
+        out = np.asarray(repair_texture_seams(io.BytesIO(data), tex, **params))
+        assert np.array_equal(out, ref), name
+    print(f"[ok] ply (le/be), glb and npz give the obj's {ref_count} seams and repair")
+
+
+def check_obj_index_errors() -> None:
+    # out-of-range face indices are reported like the binary loaders do, not as IndexError
+    head = "v 0 0 0\nv 1 0 0\nv 1 1 0\nvt 0 0\nvt 1 0\nvt 1 1\n"
+    for face in ("f 2/9 1/1 3/3", "f 5/1 1/1 3/3", "f 1/-9 2/2 3/3"):
+        try:
+            load_mesh(io.BytesIO((head + face + "\n").encode("ascii")))
+        except ValueError as e:
+            assert "越界" in str(e), e
+        else:
+            raise AssertionError(f"{face!r} accepted")
+    # a corner without vt is still loaded (-1); seam building rejects it later
+    assert load_mesh(io.BytesIO((head + "f 1 2 3\n").encode("ascii"))).tri_vt.min() == -1
+    print("[ok] obj face indices out of range raise ValueError")
+
+
+def check_udim_tile_border() -> None:
+    # Torus grid filling UDIM tile 1001 exactly: both wrap seams have one side on the
+    # tile border (u = 1.0 and v = 1.0), which must stay in tile 1001.
+    n = 6
+    lines = []
+    for j in range(n):
+        for i in range(n):
+            a, b = 2 * np.pi * i / n, 2 * np.pi * j / n
+            r = 2.0 + np.cos(b)
+            lines.append(f"v {r * np.cos(a):.6f} {r * np.sin(a):.6f} {np.sin(b):.6f}")
+    for j in range(n + 1):
+        for i in range(n + 1):
+            lines.append(f"vt {i / n:.6f} {j / n:.6f}")
+    for j in range(n):
+        for i in range(n):
+            v = [(jj % n) * n + (ii % n) + 1 for ii, jj in ((i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1))]
+            t = [jj * (n + 1) + ii + 1 for ii, jj in ((i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1))]
+            lines.append("f " + " ".join(f"{a}/{b}" for a, b in zip(v, t)))
+    obj = ("\n".join(lines) + "\n").encode("utf-8")
+
+    w = h = 64
+    arr = np.zeros((h, w, 4), dtype=np.uint8)
+    arr[..., 0] = np.linspace(0, 255, w, dtype=np.uint8)[None, :]
+    arr[..., 1] = np.linspace(0, 255, h, dtype=np.uint8)[:, None]
+    arr[..., 3] = 255
+    tex = Image.fromarray(arr, mode="RGBA")
+
+    stats: dict = {}
+    out = repair_udim_textures(io.BytesIO(obj), {1001: tex}, band_px=4, feather_px=2, only_masked_seams=False, stats=stats)
+    assert stats["dropped_seams"] == 0 and stats["missing_tiles"] == [], stats
+    repaired = np.asarray(out[1001])
+    # the u = 0 / u = 1 seam blends the left and right borders (and v likewise)
+    assert np.any(repaired[:, -1, 0] != arr[:, -1, 0]) and np.any(repaired[0, :, 1] != arr[0, :, 1])
+    print("[ok] udim seams on the tile border stay in tile 1001")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+
+MMAP_SUFFIXES = (".npy", ".raw", ".bin", ".tif", ".tiff")
+
+# UDIM texture sets are named with a <UDIM> token, e.g. body_basecolor.<UDIM>.png
+UDIM_TOKEN = "<UDIM>"
+
+
+def rgba_array(img: Image.Image) -> np.ndarray:
+    """
+    HxWx4 uint8 (read-only) pixels of an image. Same as np.asarray(img.convert("RGBA"))
+    but goes through tobytes, which is several times faster for large images.
+    """
+    rgba = img.convert("RGBA")
+    w, h = rgba.size
+    return np.frombuffer(rgba.tobytes(), dtype=np.uint8).reshape(h, w, 4)
+
+
+def _tiff_pixel_layout(path: Path) -> tuple[int, tuple[int, int, int]]:
+    """
+    (byte offset, (H, W, C)) of an uncompressed, chunky, top-down 8-bit RGB/RGBA TIFF
+    whose strips are stored back to back. Only the header is read.
+    """
+    with Image.open(path) as im:
+        if im.format != "TIFF" or im.mode not in ("RGB", "RGBA"):
+            raise ValueError("TIFF 需要是 8-bit RGB / RGBA。")
+        w, h = im.size
+        c = len(im.mode)
+        tiles = sorted(im.tile, key=lambda t: t[1][1])
+        if not tiles:
+            raise ValueError("TIFF 没有像素数据。")
+        off0 = int(tiles[0][2])
+        for t in tiles:
+            codec, (x0, y0, x1, _y1), off, args = t[0], t[1], int(t[2]), t[3]
+            rawmode = args[0] if isinstance(args, tuple) else args
+            if codec != "raw" or rawmode != im.mode:
+                raise ValueError("仅支持未压缩（compression=none）的 TIFF。")
+            if x0 != 0 or x1 != w or off != off0 + y0 * w * c:
+                raise ValueError("TIFF 像素数据不连续（分块 / 带间隙的 strip），无法内存映射。")
+    return off0, (h, w, c)
+
+
+def open_texture_memmap(
+    path: str | Path,
+    mode: str = "r",
+    *,
+    raw_shape: tuple[int, int, int] | None = None,
+) -> np.ndarray:
+    """
+    HxWxC uint8 view (np.memmap) of an uncompressed texture file: .npy, .raw/.bin
+    (needs raw_shape) or uncompressed TIFF. Nothing is decoded; pages load on access.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".npy":
+        arr = np.load(path, mmap_mode=mode)
+    elif suffix in (".raw", ".bin"):
+        if raw_shape is None:
+            raise ValueError("raw 贴图需要提供 raw_shape=(H, W, C)。")
+        arr = np.memmap(path, dtype=np.uint8, mode=mode, shape=tuple(int(v) for v in raw_shape))
+    elif suffix in (".tif", ".tiff"):
+        off, shape = _tiff_pixel_layout(path)
+        arr = np.memmap(path, dtype=np.uint8, mode=mode, offset=off, shape=shape)
+    else:
+        raise ValueError("内存映射仅支持 " + " / ".join(MMAP_SUFFIXES))
+    if arr.dtype != np.uint8 or arr.ndim != 3 or arr.shape[2] not in (3, 4):
+        raise ValueError(f"需要 HxWx3 或 HxWx4 的 uint8 贴图，实际为 {arr.dtype} {arr.shape}。")
+    return arr
+
+
+def open_output_memmap(
+    src_path: str | Path,
+    out_path: str | Path | None,
+    *,
+    raw_shape: tuple[int, int, int] | None = None,
+) -> np.ndarray:
+    """
+    Writable memmap for the repaired texture, in the same format as the input.
+    out_path=None (or the input path) edits the input in place; otherwise the file is
+    copied first (shutil.copyfile uses kernel-side copies, so pixels stay out of RAM).
+    """
+    src_path = Path(src_path)
+    if out_path is not None and Path(out_path).resolve() != src_path.resolve():
+        shutil.copyfile(src_path, out_path)
+        src_path = Path(out_path)
+    return open_texture_memmap(src_path, "r+", raw_shape=raw_shape)
+
+
+def find_udim_textures(pattern: str | Path) -> dict[int, Path]:
+    """Existing files of a UDIM pattern ("name.<UDIM>.png"), keyed by tile number (1001...)."""
+    pattern = Path(pattern)
+    if UDIM_TOKEN not in pattern.name:
+        raise ValueError(f"UDIM 路径需要包含 {UDIM_TOKEN}：{pattern}")
+    head, _, tail = pattern.name.partition(UDIM_TOKEN)
+    rx = re.compile(re.escape(head) + r"(1\d{3})" + re.escape(tail) + "$")
+    tiles: dict[int, Path] = {}
+    if pattern.parent.is_dir():
+        for p in pattern.parent.iterdir():
+            m = rx.match(p.name)
+            if m and p.is_file():
+                tiles[int(m.group(1))] = p
+    return dict(sorted(tiles.items()))
+
+
+def udim_path(pattern: str | Path, tile: int) -> Path:
+    pattern = Path(pattern)
+    return pattern.with_name(pattern.name.replace(UDIM_TOKEN, str(int(tile))))
@@ -1,12 +1,39 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
+import os
 import re
+import sys
 import urllib.request
 from pathlib import Path
 
 
 THREE_VER = "0.161.0"
 
+# Vendored files: name -> (path inside the three package, sha256 of the file as served,
+# i.e. after patch_import). A file on disk is valid only if its hash matches.
+THREE_FILES = {
+    "three.module.min.js": (
+        "build/three.module.min.js",
+        "8da856fd9ddfe38fdb286da04bc1d85f3bf108bf083e0eac71cd276ec6674030",
+    ),
+    "OrbitControls.js": (
+        "examples/jsm/controls/OrbitControls.js",
+        "01fadcdaf71410da242b112115325b8320f8709442518d0acdf3236cf53a91c9",
+    ),
+    "OBJLoader.js": (
+        "examples/jsm/loaders/OBJLoader.js",
+        "c6e0ca05f835004ee63f5c2a008bfac03426fb3b91687e1037e10f1503c9dc3c",
+    ),
+}
+
+CDNS = [
+    f"https://unpkg.com/three@{THREE_VER}",
+    f"https://cdn.jsdelivr.net/npm/three@{THREE_VER}",
+    f"https://fastly.jsdelivr.net/npm/three@{THREE_VER}",
+]
+
 
 def _download_bytes(url: str, *, timeout_sec: float = 20.0) -> bytes:
     req = urllib.request.Request(
@@ -19,17 +46,49 @@ def _download_bytes(url: str, *, timeout_sec: float = 20.0) -> bytes:
         return resp.read()
 
 
-def _ensure_file(dst: Path, urls: list[str]) -> None:
-    if dst.exists() and dst.stat().st_size > 1024:
-        return
-    dst.parent.mkdir(parents=True, exist_ok=True)
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def patch_import(data: bytes) -> bytes:
+    """
+    Patch bare-module import "three" to a local relative file.
+    This avoids needing import maps in the browser.
+    """
+    s = data.decode("utf-8", errors="ignore")
+    s2 = re.sub(r'from\s+[\'"]three[\'"]', 'from "./three.module.min.js"', s)
+    return s2.encode("utf-8") if s2 != s else data
+
+
+def vendor_dir(static_dir: Path) -> Path:
+    return (static_dir / "vendor" / "three").resolve()
+
+
+def missing_three_vendor(static_dir: Path) -> list[str]:
+    """Names of vendored files that are absent or do not match THREE_FILES (no network)."""
+    d = vendor_dir(static_dir)
+    missing = []
+    for name, (_rel, sha) in THREE_FILES.items():
+        try:
+            ok = _sha256((d / name).read_bytes()) == sha
+        except OSError:
+            ok = False
+        if not ok:
+            missing.append(name)
+    return missing
+
+
+def _fetch_file(dst: Path, rel: str, sha: str) -> None:
     last_err: Exception | None = None
-    for url in urls:
+    for base in CDNS:
+        url = f"{base}/{rel}"
         try:
-            data = _download_bytes(url)
-            if len(data) < 1024:
-                raise RuntimeError(f"下载内容太小：{url}")
-            dst.write_bytes(data)
+            data = patch_import(_download_bytes(url))
+            if _sha256(data) != sha:
+                raise RuntimeError(f"文件哈希不符：{url}")
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, dst)
             return
         except Exception as e:
             last_err = e
@@ -42,43 +101,38 @@ def ensure_three_vendor(static_dir: Path) -> Path:
     Ensure three.js vendor files exist under:
       <static_dir>/vendor/three/
     This avoids browser-side CDN restrictions by serving scripts from localhost.
+    Files already matching THREE_FILES are kept; only the others are downloaded.
     """
-    vendor_dir = (static_dir / "vendor" / "three").resolve()
-    vendor_dir.mkdir(parents=True, exist_ok=True)
-
-    cdns = [
-        f"https://unpkg.com/three@{THREE_VER}",
-        f"https://cdn.jsdelivr.net/npm/three@{THREE_VER}",
-        f"https://fastly.jsdelivr.net/npm/three@{THREE_VER}",
-    ]
-
-    three_mod = vendor_dir / "three.module.min.js"
-    orbit = vendor_dir / "OrbitControls.js"
-    obj = vendor_dir / "OBJLoader.js"
-
-    _ensure_file(
-        three_mod,
-        [f"{b}/build/three.module.min.js" for b in cdns],
-    )
-    _ensure_file(
-        orbit,
-        [f"{b}/examples/jsm/controls/OrbitControls.js" for b in cdns],
-    )
-    _ensure_file(
-        obj,
-        [f"{b}/examples/jsm/loaders/OBJLoader.js" for b in cdns],
-    )
-
-    # Patch bare-module import "three" to a local relative file.
-    # This avoids needing import maps in the browser.
-    def patch_import(path: Path) -> None:
-        s = path.read_text(encoding="utf-8", errors="ignore")
-        s2 = re.sub(r'from\s+[\'"]three[\'"]', 'from "./three.module.min.js"', s)
-        if s2 != s:
-            path.write_text(s2, encoding="utf-8")
-
-    patch_import(orbit)
-    patch_import(obj)
-
-    return vendor_dir
-
+    d = vendor_dir(static_dir)
+    missing = missing_three_vendor(static_dir)
+    if missing:
+        d.mkdir(parents=True, exist_ok=True)
+        for name in missing:
+            rel, sha = THREE_FILES[name]
+            _fetch_file(d / name, rel, sha)
+    return d
+
+
+def main(argv: list[str] | None = None) -> int:
+    default_static = Path(__file__).resolve().parent.parent / "frontend" / "static"
+    ap = argparse.ArgumentParser(description="下载 / 校验前端用的 three.js vendor 文件")
+    ap.add_argument("--static-dir", type=Path, default=default_static)
+    ap.add_argument("--check", action="store_true", help="只校验，不下载（缺失时返回 1）")
+    args = ap.parse_args(argv)
+
+    if args.check:
+        missing = missing_three_vendor(args.static_dir)
+        for name in missing:
+            print(f"[missing] {name}")
+        return 1 if missing else 0
+    try:
+        d = ensure_three_vendor(args.static_dir)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"[ok] {d}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
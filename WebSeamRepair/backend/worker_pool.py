@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import io
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, Iterator
+
+import numpy as np
+from PIL import Image
+
+from bitmask import PackedMask
+from seam_repair import RepairState, accumulate_seams, finish_repair, finish_repair_delta
+from texture_io import rgba_array
+
+
+@dataclass(frozen=True)
+class ShmArrays:
+    """Picklable handle of numpy arrays packed into one shared memory block."""
+
+    name: str
+    fields: tuple[tuple[str, tuple[int, ...], str, int], ...]  # (key, shape, dtype, offset)
+
+    def views(self, shm: shared_memory.SharedMemory) -> dict[str, np.ndarray]:
+        return {
+            key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=off)
+            for key, shape, dtype, off in self.fields
+        }
+
+
+def alloc_arrays(
+    spec: dict[str, tuple[tuple[int, ...], Any]]
+) -> tuple[shared_memory.SharedMemory, ShmArrays]:
+    """Create one shared memory block laid out for spec ({key: (shape, dtype)})."""
+    fields = []
+    off = 0
+    for key, (shape, dtype) in spec.items():
+        dt = np.dtype(dtype)
+        off = -(-off // 64) * 64
+        fields.append((key, tuple(int(v) for v in shape), dt.str, off))
+        off += int(np.prod(shape, dtype=np.int64)) * dt.itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(off, 1))
+    return shm, ShmArrays(shm.name, tuple(fields))
+
+
+def put_arrays(arrays: dict[str, np.ndarray]) -> tuple[shared_memory.SharedMemory, ShmArrays]:
+    shm, handle = alloc_arrays({k: (a.shape, a.dtype) for k, a in arrays.items()})
+    views = handle.views(shm)
+    for k, a in arrays.items():
+        views[k][...] = a
+    del views
+    return shm, handle
+
+
+@contextmanager
+def attach(handle: ShmArrays) -> Iterator[dict[str, np.ndarray]]:
+    """Map a block by handle; the views must not be kept past the with-block."""
+    shm = shared_memory.SharedMemory(name=handle.name)
+    views = handle.views(shm)
+    try:
+        yield views
+    finally:
+        views.clear()
+        _close(shm)
+
+
+def _close(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        # views still referenced (error path): unmapped once they are collected
+        pass
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    _close(shm)
+    shm.unlink()
+
+
+# ---------- worker side ----------
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def _accumulate_task(inputs: ShmArrays, params: dict[str, Any]) -> tuple[ShmArrays, dict[str, Any]]:
+    with attach(inputs) as a:
+        # copies: the block is unmapped when the with-block ends
+        tex = Image.fromarray(a["texture"], mode="RGBA").copy()
+        mask = PackedMask(a["mask"].copy(), tex.size[0]) if "mask" in a else None
+        mesh = io.BytesIO(a["mesh"].tobytes()) if "mesh" in a else None
+    state = accumulate_seams(mesh, tex, mask, **params)
+    del tex
+    out = {"hit_idx": state.hit_idx, "acc": state.acc, "wacc": state.wacc}
+    if state.roi_mask is not None:
+        out["roi_mask"] = state.roi_mask
+    # The block outlives this call: the parent copies it out and unlinks it.
+    shm, handle = put_arrays(out)
+    shm.close()
+    return handle, {"passthrough": state.passthrough, "roi": state.roi}
+
+
+def _finish_task(inputs: ShmArrays, meta: dict[str, Any], finish: dict[str, Any], output: str) -> ShmArrays:
+    with attach(inputs) as a:
+        state = RepairState(
+            texture=a["texture"],
+            texture_kind=meta["texture_kind"],
+            hit_idx=a["hit_idx"],
+            acc=a["acc"],
+            wacc=a["wacc"],
+            passthrough=meta["passthrough"],
+            roi=meta["roi"],
+            roi_mask=a.get("roi_mask"),
+        )
+        if output == "delta":
+            data = finish_repair_delta(state, **finish)
+        else:
+            buf = io.BytesIO()
+            finish_repair(state, **finish).save(buf, format="PNG")
+            data = buf.getbuffer()
+        del state
+    shm, handle = put_arrays({"data": np.frombuffer(data, dtype=np.uint8)})
+    shm.close()
+    return handle
+
+
+# ---------- parent side ----------
+
+
+def _read_into(f: BinaryIO, buf: memoryview) -> None:
+    """Fill buf from f without an intermediate bytes copy where readinto is available."""
+    pos = 0
+    while pos < len(buf):
+        if hasattr(f, "readinto"):
+            n = f.readinto(buf[pos:])
+        else:
+            chunk = f.read(min(len(buf) - pos, 1 << 20))
+            n = len(chunk)
+            buf[pos : pos + n] = chunk
+        if not n:
+            raise ValueError("模型文件读取不完整。")
+        pos += n
+
+
+class ComputePool:
+    """
+    N worker processes started up front, with numpy / PIL / seam_repair already
+    imported (forkserver preload on POSIX, imported on start elsewhere). Textures,
+    accumulated samples and encoded results travel through shared memory; only small
+    handles and parameters are pickled.
+    """
+
+    def __init__(self, workers: int) -> None:
+        if os.name == "nt":
+            # result blocks are created by workers and must outlive them until the parent unlinks
+            raise ValueError("进程池模式需要 Linux / macOS（POSIX 共享内存）。")
+        self.workers = int(workers)
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        if "forkserver" in mp.get_all_start_methods():
+            ctx = mp.get_context("forkserver")
+            ctx.set_forkserver_preload(["seam_repair"])
+        else:
+            ctx = mp.get_context("spawn")
+        ex = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx, initializer=_import_seam_repair)
+        # start every worker now instead of on the first requests
+        for f in [ex.submit(_warm) for _ in range(self.workers)]:
+            f.result()
+        return ex
+
+    def _run(self, fn: Any, *args: Any) -> Any:
+        ex = self._executor
+        try:
+            return ex.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # a worker died (e.g. out of memory): replace the pool for later requests
+            with self._lock:
+                if self._executor is ex:
+                    ex.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._start()
+            raise
+
+    def accumulate(
+        self,
+        mesh_file: BinaryIO | None,
+        texture_img: Image.Image,
+        seam_mask_img: Image.Image | None,
+        **params: Any,
+    ) -> RepairState:
+        """accumulate_seams in a worker; the returned state keeps the texture decoded here."""
+        tex = rgba_array(texture_img)
+        spec: dict[str, tuple[tuple[int, ...], Any]] = {"texture": (tex.shape, np.uint8)}
+        mask = None
+        if seam_mask_img is not None:
+            # thresholded here strip by strip: only the packed bits (1 bit / texel) are shipped
+            h, w = tex.shape[:2]
+            mask = PackedMask.from_image(seam_mask_img, w, h, int(params.get("mask_threshold", 16))).bits
+            spec["mask"] = (mask.shape, np.uint8)
+        if mesh_file is not None:
+            start = mesh_file.tell()
+            size = mesh_file.seek(0, os.SEEK_END) - start
+            mesh_file.seek(start)
+            spec["mesh"] = ((size,), np.uint8)
+
+        shm, handle = alloc_arrays(spec)
+        try:
+            views = handle.views(shm)
+            views["texture"][...] = tex
+            if mask is not None:
+                views["mask"][...] = mask
+            if mesh_file is not None:
+                _read_into(mesh_file, memoryview(views["mesh"]))
+            del views
+            out, meta = self._run(_accumulate_task, handle, params)
+        finally:
+            _release(shm)
+
+        res = shared_memory.SharedMemory(name=out.name)
+        try:
+            a = {k: v.copy() for k, v in out.views(res).items()}
+        finally:
+            _release(res)
+        return RepairState(
+            texture=tex,
+            texture_kind=str(params.get("texture_kind", "basecolor")),
+            hit_idx=a["hit_idx"],
+            acc=a["acc"],
+            wacc=a["wacc"],
+            passthrough=meta["passthrough"],
+            roi=meta["roi"],
+            roi_mask=a.get("roi_mask"),
+        )
+
+    def finish(self, state: RepairState, finish: dict[str, Any], output: str) -> bytes:
+        """finish_repair(_delta) in a worker, returned encoded (PNG or texture delta)."""
+        arrays = {"texture": state.texture, "hit_idx": state.hit_idx, "acc": state.acc, "wacc": state.wacc}
+        if state.roi_mask is not None:
+            arrays["roi_mask"] = state.roi_mask
+        shm, handle = put_arrays(arrays)
+        meta = {"texture_kind": state.texture_kind, "passthrough": state.passthrough, "roi": state.roi}
+        try:
+            out = self._run(_finish_task, handle, meta, finish, output)
+        finally:
+            _release(shm)
+        res = shared_memory.SharedMemory(name=out.name)
+        try:
+            views = out.views(res)
+            data = views["data"].tobytes()
+            del views
+        finally:
+            _release(res)
+        return data
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _import_seam_repair() -> None:
+    # no-op after a forkserver preload; does the import under spawn
+    import seam_repair  # noqa: F401
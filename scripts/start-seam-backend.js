@@ -15,7 +15,11 @@ if (!fs.existsSync(path.join(backendDir, 'main.py'))) {
 
 const isWin = process.platform === 'win32';
 const cmd = isWin ? 'python' : 'python3';
-const args = ['-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', '8008'];
+// SEAM_COMPUTE_WORKERS=N：走 serve.py（HTTP 进程 + N 个计算进程，仅 Linux / macOS）
+const workers = parseInt(process.env.SEAM_COMPUTE_WORKERS || '0', 10);
+const args = workers > 0 && !isWin
+  ? ['serve.py', '--host', '127.0.0.1', '--port', '8008', '--workers', String(workers)]
+  : ['-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', '8008'];
 
 console.log('[seam-backend] 启动贴图修缝后端 (http://127.0.0.1:8008) …');
 console.log('[seam-backend] 工作目录:', backendDir);